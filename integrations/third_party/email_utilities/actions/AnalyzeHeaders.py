@@ -18,12 +18,11 @@ import binascii
 import datetime
 import ipaddress
 import json
+import os
 import re
 import socket
 
 import checkdmarc
-import dns.resolver
-import pydnsbl
 import tldextract
 from dateutil.parser import parse
 from ipwhois import IPWhois
@@ -32,7 +31,8 @@ from soar_sdk.SiemplifyAction import SiemplifyAction
 from soar_sdk.SiemplifyUtils import output_handler
 
 from ..core import EmailParserRouting, EmailUtilitiesManager
-from ..core.IpLocation import DbIpCity
+from ..core.HopEnrichment import DEFAULT_LOOKUP_TIMEOUT, HopEnrichment
+from ..core.LookupCache import DEFAULT_CACHE_MAX_AGE, DEFAULT_MAX_WORKERS, LookupCache
 
 
 def ip_in_subnetwork(ip_address, subnetwork):
@@ -165,42 +165,65 @@ def return_domain(email):
     return domain.group(1)
 
 
-def ip_check(ip, domain):
-    spf_record = EmailUtilitiesManager.SpfRecord.from_domain(domain).record.split(" ")
+def ip_check(ip, domain, resolver=None):
+    """Check whether an address is allowed by the SPF record of a domain, or of the domains it
+    includes. The includes of each level of the include tree are queried concurrently.
+    :param ip: {str} the address
+    :param domain: {str} the domain
+    :param resolver: {CachedResolver} the resolver to query the records with
+    :return: {bool} whether the address is allowed
+    """
+    ips = []
+    domains = [domain]
+    seen_domains = {domain}
+    while domains:
+        futures = EmailUtilitiesManager.SpfRecord.from_domains_concurrently(domains, resolver)
+        domains = []
+        for future in futures:
+            spf_record = future.result().record.split(" ")
+            ips.extend([x.split(":")[1] for x in spf_record if x.startswith("ip")])
+            for include_domain in [
+                x.split(":")[1] for x in spf_record if x.startswith("include")
+            ]:
+                if include_domain not in seen_domains:
+                    seen_domains.add(include_domain)
+                    domains.append(include_domain)
 
-    includes = [x.split(":")[1] for x in spf_record if x.startswith("include")]
-    ips = [x.split(":")[1] for x in spf_record if x.startswith("ip")]
-    for include_domain in includes:
-        include_spf = EmailUtilitiesManager.SpfRecord.from_domain(
-            include_domain,
-        ).record.split(" ")
-        includes.extend(
-            [x.split(":")[1] for x in include_spf if x.startswith("include")],
-        )
-        ips.extend([x.split(":")[1] for x in include_spf if x.startswith("ip")])
     for cidr in ips:
         if ip_in_subnetwork(ip, cidr):
             return True
     return False
 
 
-def parseHops(received):
+def parseHops(received, enrichment):
+    """ParseHops parses the Received headers into hops, enriching their hosts.
+    :param received: {list} the Received headers
+    :param enrichment: {HopEnrichment} the lookups of the hosts of the hops
+    :return: {list} the hops, from the first one to the last one
+    """
     previous_hop = {}
     hops = []
-    ip_checker = pydnsbl.DNSBLIpChecker()
-    domain_checker = pydnsbl.DNSBLDomainChecker()
+    parsed_routes = []
     for hop in reversed(received):
+        try:
+            parsed_route = EmailParserRouting.parserouting(hop)
+        except Exception:
+            raise
+        if "date" in parsed_route:
+            parsed_routes.append(parsed_route)
+
+    # The hosts of all the hops are looked up at once
+    enrichment.prefetch(
+        from_hosts=[f for route in parsed_routes for f in route.get("from", [])],
+        by_hosts=[route["by"][0] for route in parsed_routes if "by" in route],
+    )
+
+    for parsed_route in parsed_routes:
         hop_info = {}
         hop_info["blacklist_info"] = []
         hop_info["from_ip_whois"] = {}
         hop_info["by_ip_whois"] = {}
 
-        try:
-            parsed_route = EmailParserRouting.parserouting(hop)
-        except Exception:
-            raise
-        if "date" not in parsed_route:
-            continue
         hop_info["time"] = (
             parsed_route["date"].astimezone(datetime.UTC).replace(tzinfo=None)
         )
@@ -211,37 +234,28 @@ def parseHops(received):
                 hop_info["from"] = f
                 try:
                     test_ip = ipaddress.ip_address(f)
-                    ip_check = ip_checker.check(f)
+                    ip_check = enrichment.dnsbl_ip(f)
                     # hop_info['from'] = f
                     try:
-                        obj = IPWhois(f)
-                        hop_info["from_ip_whois"] = obj.lookup_rdap(depth=1)
-                        response = DbIpCity.get(f, api_key="free")
-                        hop_info["from_geo"] = json.loads(response.to_json())
+                        hop_info["from_ip_whois"] = enrichment.rdap(f)
+                        hop_info["from_geo"] = enrichment.geo(f)
                     except Exception as expe:
                         template = (
                             "An exception of type {0} occurred. Arguments:\n{1!r}"
                         )
                         message = template.format(type(expe).__name__, expe.args)
 
-                    denylist["blacklisted"] = ip_check.blacklisted
-                    denylist["detected_by"] = ip_check.detected_by.copy()
-                    denylist["categories"] = ip_check.categories.copy()
+                    denylist["blacklisted"] = ip_check["blacklisted"]
+                    denylist["detected_by"] = ip_check["detected_by"].copy()
+                    denylist["categories"] = set(ip_check["categories"])
                     hop_info["blacklist_info"].append(denylist)
                 except ValueError:
                     try:
-                        domain_check = domain_checker.check(f)
-                        resolved_ip_answer = dns.resolver.resolve(f)
-                        # for r in resolved_ip_answer:
-                        #    resolved_ip = r
+                        domain_check = enrichment.dnsbl_domain(f)
+                        resolved_ip = enrichment.resolve(f)
                         try:
-                            obj = IPWhois(resolved_ip_answer[0])
-                            ip_whois = obj.lookup_rdap(depth=1)
-                            response = DbIpCity.get(
-                                resolved_ip_answer[0],
-                                api_key="free",
-                            )
-                            hop_info["from_geo"] = json.loads(response.to_json())
+                            ip_whois = enrichment.rdap(resolved_ip)
+                            hop_info["from_geo"] = enrichment.geo(resolved_ip)
                             hop_info["from_ip_whois"] = ip_whois
                         except Exception as exp:
                             template = (
@@ -249,9 +263,9 @@ def parseHops(received):
                             )
                             message = template.format(type(exp).__name__, exp.args)
 
-                        denylist["blacklisted"] = domain_check.blacklisted
-                        denylist["detected_by"] = domain_check.detected_by.copy()
-                        denylist["categories"] = domain_check.categories.copy()
+                        denylist["blacklisted"] = domain_check["blacklisted"]
+                        denylist["detected_by"] = domain_check["detected_by"].copy()
+                        denylist["categories"] = set(domain_check["categories"])
                         hop_info["blacklist_info"].append(denylist)
                     except Exception as e:
                         template = (
@@ -274,21 +288,18 @@ def parseHops(received):
             try:
                 test_ip = ipaddress.ip_address(hop_info["by"])
 
-                obj = IPWhois(hop_info["by"])
+                # Raises for private and reserved addresses, which have no RDAP data
+                IPWhois(hop_info["by"])
 
-                response = DbIpCity.get(hop_info["by"], api_key="free")
-                hop_info["by_geo"] = json.loads(response.to_json())
-                hop_info["by_ip_whois"] = obj.lookup_rdap(depth=1)
+                hop_info["by_geo"] = enrichment.geo(hop_info["by"])
+                hop_info["by_ip_whois"] = enrichment.rdap(hop_info["by"])
 
             except Exception:
                 try:
-                    resolved_ip_answer = dns.resolver.resolve(hop_info["by"])
-                    resolved_ip = resolved_ip_answer[0]
+                    resolved_ip = enrichment.resolve(hop_info["by"])
                     try:
-                        obj = IPWhois(resolved_ip)
-                        hop_info["by_ip_whois"] = obj.lookup_rdap(depth=1)
-                        response = DbIpCity.get(resolved_ip, api_key="free")
-                        hop_info["by_geo"] = json.loads(response.to_json())
+                        hop_info["by_ip_whois"] = enrichment.rdap(resolved_ip)
+                        hop_info["by_geo"] = enrichment.geo(resolved_ip)
                     except Exception as expl:
                         template = (
                             "An exception of type {0} occurred. Arguments:\n{1!r}"
@@ -323,12 +334,17 @@ def coalesce(input_dict, *arg):
     return None
 
 
-def buildResult(header, siemplify):
+def buildResult(header, siemplify, enrichment, resolver=None):
     """Creates the result object after parsing the email.
     :param header:
     :param mail_data:
+    :param enrichment: {HopEnrichment} the lookups of the hosts of the hops
+    :param resolver: {CachedResolver} the resolver of the SPF, DMARC, DKIM and ARC records
     :return:
     """
+    if resolver is None:
+        resolver = EmailUtilitiesManager.CachedResolver()
+
     result = {
         "From": coalesce(header, "from"),
         "To": coalesce(header, "to", "delivered-to"),
@@ -360,6 +376,7 @@ def buildResult(header, siemplify):
     domain_check = checkdmarc.check_domains(
         [result["FromDomain"]],
         include_tag_descriptions=True,
+        resolver=resolver,
     )
     result["SPF"] = domain_check.get("spf")
     result["DMARC"] = domain_check.get("dmarc")
@@ -370,14 +387,16 @@ def buildResult(header, siemplify):
     arc = EmailUtilitiesManager.ARC(logger=siemplify.LOGGER, headers=header)
 
     try:
-        result["DKIMVerify"] = dkim.verify()
+        result["DKIMVerify"] = dkim.verify(dnsfunc=resolver.get_txt)
     except Exception as e:
         result["DKIMVerify"] = "error"
         result["DKIMVerificationError"] = str(e)
 
     arc_res = {}
     try:
-        arc_res["result"], arc_res["details"], arc_res["reason"] = arc.verify()
+        arc_res["result"], arc_res["details"], arc_res["reason"] = arc.verify(
+            dnsfunc=resolver.get_txt,
+        )
         arc_res["result"] = arc_res["result"].decode()
         result["ARCVerify"] = arc_res
     except:
@@ -387,7 +406,7 @@ def buildResult(header, siemplify):
     result["SourceServer"] = ""
 
     try:
-        result["RelayInfo"] = parseHops(header["received"])
+        result["RelayInfo"] = parseHops(header["received"], enrichment)
         for fromserver_str in reversed(header["received"]):
             if "by" in fromserver_str:
                 fromserver = EmailParserRouting.parserouting(fromserver_str)
@@ -400,11 +419,9 @@ def buildResult(header, siemplify):
                     if "by" in fromserver:
                         result["SourceServer"] = fromserver["by"][0]
                         try:
-                            result["SourceServerIP"] = (
-                                EmailUtilitiesManager.Resolver().query(
-                                    result["SourceServer"],
-                                )[0][2]
-                            )
+                            result["SourceServerIP"] = resolver.query_records(
+                                result["SourceServer"],
+                            )[0][2]
                         except:
                             pass
                 continue
@@ -412,12 +429,17 @@ def buildResult(header, siemplify):
         pass
 
     try:
-        result["SPF"]["Auth"] = ip_check(result["SourceServerIP"], result["FromDomain"])
+        result["SPF"]["Auth"] = ip_check(
+            result["SourceServerIP"],
+            result["FromDomain"],
+            resolver,
+        )
     except Exception:
         result["SPF"]["Auth"] = False
     try:
         result["StrongSPF"] = EmailUtilitiesManager.SpfRecord.from_domain(
             result["FromDomain"],
+            resolver,
         ).is_record_strong()
     except:
         result["StrongSPF"] = False
@@ -432,6 +454,24 @@ def main(siemplify):
         default_value="{}",
         print_value=False,
     )
+    max_workers = siemplify.extract_action_param(
+        "Max Concurrent Lookups",
+        print_value=True,
+        default_value=DEFAULT_MAX_WORKERS,
+        input_type=int,
+    )
+    lookup_timeout = siemplify.extract_action_param(
+        "Lookup Timeout (Seconds)",
+        print_value=True,
+        default_value=DEFAULT_LOOKUP_TIMEOUT,
+        input_type=int,
+    )
+    cache_max_age = siemplify.extract_action_param(
+        "Cache Max Age (Seconds)",
+        print_value=True,
+        default_value=DEFAULT_CACHE_MAX_AGE,
+        input_type=int,
+    )
 
     status = EXECUTION_STATE_COMPLETED  # used to flag back to siemplify system, the action final status
     output_message = (
@@ -442,7 +482,14 @@ def main(siemplify):
     )
     h = json.loads(headers_json)
 
-    headers_res = buildResult(h, siemplify)
+    cache = LookupCache(
+        os.path.join(siemplify.run_folder, "lookup_cache.json"),
+        max_age=cache_max_age,
+    )
+    enrichment = HopEnrichment(cache=cache, max_workers=max_workers, timeout=lookup_timeout)
+    resolver = EmailUtilitiesManager.CachedResolver(cache=cache, max_workers=max_workers)
+    headers_res = buildResult(h, siemplify, enrichment, resolver)
+    cache.save()
     # print(json.dumps(headers_res, indent=4, sort_keys=True, default=str))
     siemplify.result.add_result_json(headers_res)
     siemplify.result.add_json("Headers", headers_res)
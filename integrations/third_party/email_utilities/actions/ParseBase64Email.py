@@ -33,7 +33,7 @@ from soar_sdk.SiemplifyAction import SiemplifyAction
 from tld import get_fld
 from urlextract import URLExtract
 
-from ..core import EmailParser, EmailParserRegex, EmailParserRouting
+from ..core import EmailParser, EmailParserDecode, EmailParserRegex, EmailParserRouting
 
 
 def json_serial(obj):
@@ -416,30 +416,43 @@ def parse_msg(msg, denylist, is_allowlist, stop_transport):
     return _cur_json
 
 
-def process_attachment(attachment, denylist, is_allowlist, stop_transport):
-    attached_msg = base64.b64decode(attachment["raw"])
-
-    try:
-        attached_parsed = EmailParser.decode_email_b(
-            attached_msg,
-            include_raw_body=True,
-            include_attachment_data=True,
-            email_force_tld=True,
-        )
-        if len(attached_parsed["header"]["to"]) == 0:
+def decode_eml(fp, max_attachments=None, max_attachment_size=None):
+    return EmailParser.EmlParser(
+        include_raw_body=True,
+        include_attachment_data=True,
+        email_force_tld=True,
+        max_attachments=max_attachments,
+        max_attachment_size=max_attachment_size,
+    ).decode_email_binary_file(fp)
+
+
+def process_attachment(
+    attachment,
+    denylist,
+    is_allowlist,
+    stop_transport,
+    max_attachments=None,
+    max_attachment_size=None,
+):
+    with EmailParserDecode.decode_base64_to_file(attachment["raw"]) as fp:
+        try:
+            attached_parsed = decode_eml(fp, max_attachments, max_attachment_size)
+            if len(attached_parsed["header"]["to"]) == 0:
+                fp.seek(0)
+                attached_parsed = parse_msg(
+                    fp.read(),
+                    denylist,
+                    is_allowlist,
+                    stop_transport,
+                )
+        except:
+            fp.seek(0)
             attached_parsed = parse_msg(
-                attached_msg,
+                fp.read(),
                 denylist,
                 is_allowlist,
                 stop_transport,
             )
-    except:
-        attached_parsed = parse_msg(
-            attached_msg,
-            denylist,
-            is_allowlist,
-            stop_transport,
-        )
     return attached_parsed
 
 
@@ -469,27 +482,33 @@ def main():
     stop_transport = (
         siemplify.parameters.get("Stop Transport At Header", "") or ""
     ).strip() or ""
-    content = base64.b64decode(base64_blob)
-
-    try:
-        if olefile.isOleFile(content):
-            m = parse_msg(content, denylist, is_allowlist, stop_transport)
+    max_attachments = siemplify.extract_action_param(
+        "Max Attachments",
+        print_value=True,
+        input_type=int,
+    )
+    max_attachment_size = siemplify.extract_action_param(
+        "Max Attachment Size (MB)",
+        print_value=True,
+        input_type=int,
+    )
+    if max_attachment_size is not None:
+        max_attachment_size *= 1024 * 1024
+    # The email is decoded into a temporary file and parsed as it's read from it,
+    # so neither the decoded email nor a copy of it is kept in memory as a whole
+    with EmailParserDecode.decode_base64_to_file(base64_blob) as fp:
+        try:
+            if olefile.isOleFile(fp):
+                fp.seek(0)
+                m = parse_msg(fp.read(), denylist, is_allowlist, stop_transport)
 
-        else:
-            m = EmailParser.decode_email_b(
-                content,
-                include_raw_body=True,
-                include_attachment_data=True,
-                email_force_tld=True,
-            )
+            else:
+                fp.seek(0)
+                m = decode_eml(fp, max_attachments, max_attachment_size)
 
-    except Exception:
-        m = EmailParser.decode_email_b(
-            content,
-            include_raw_body=True,
-            include_attachment_data=True,
-            email_force_tld=True,
-        )
+        except Exception:
+            fp.seek(0)
+            m = decode_eml(fp, max_attachments, max_attachment_size)
 
     m["attached_emails"] = []
     m["attachments"] = []
@@ -550,6 +569,8 @@ def main():
                     denylist,
                     is_allowlist,
                     stop_transport,
+                    max_attachments=max_attachments,
+                    max_attachment_size=max_attachment_size,
                 )
                 n_att = []
                 if "attachment" in nested_email:
@@ -568,6 +589,8 @@ def main():
                                 denylist,
                                 is_allowlist,
                                 stop_transport,
+                                max_attachments=max_attachments,
+                                max_attachment_size=max_attachment_size,
                             )
                             nested_attachments_holder = []
                             for nested_nested_attachment in nested_nested_email[
@@ -68,6 +68,18 @@ def main():
     exclude_regex = siemplify.parameters.get("Exclude Entities Regex", None)
     fang_entities = siemplify.parameters["Fang Entities"].lower() == "true"
     custom_regex = siemplify.parameters.get("Custom Entity Regexes", "{}")
+    max_attachments = siemplify.extract_action_param(
+        "Max Attachments",
+        print_value=True,
+        input_type=int,
+    )
+    max_attachment_size = siemplify.extract_action_param(
+        "Max Attachment Size (MB)",
+        print_value=True,
+        input_type=int,
+    )
+    if max_attachment_size is not None:
+        max_attachment_size *= 1024 * 1024
 
     try:
         custom_regex = json.loads(custom_regex)
@@ -81,6 +93,8 @@ def main():
         siemplify=siemplify,
         logger=siemplify.LOGGER,
         custom_regex=custom_regex,
+        max_attachments=max_attachments,
+        max_attachment_size=max_attachment_size,
     )
     attach_mgr = AttachmentsManager(siemplify=siemplify)
     attachments = attach_mgr.get_alert_attachments()
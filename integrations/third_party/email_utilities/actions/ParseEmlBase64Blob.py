@@ -15,14 +15,18 @@
 from __future__ import annotations
 
 import base64
+import io
 import re
-from email import message_from_string
+from email.parser import Parser
 
 from soar_sdk.SiemplifyAction import SiemplifyAction
 from soar_sdk.SiemplifyUtils import output_handler
 
+from ..core.EmailParserDecode import decode_base64_to_file
+
 # CONSTS:
 EMAIL_PATTERN = "(?<=<)(.*?)(?=>)"
+MAX_NESTING_DEPTH = 20
 
 
 def _extract_subject(msg):
@@ -77,9 +81,11 @@ def _is_attachment(mime_part, include_inline=False):
     return False
 
 
-def extract_content(msg):
+def extract_content(msg, depth=0):
     """Extracts content from an e-mail message.
+    Parts nested deeper than MAX_NESTING_DEPTH multipart levels are skipped.
     :param msg: {email.message.Message} An eml object
+    :param depth: {int} The number of multipart levels the message is nested in
     :return: {tuple} Text body, Html body, files dict (file_name: file_hash),
     count of parts of the emails
     """
@@ -88,6 +94,9 @@ def extract_content(msg):
     files = {}
     count = 0
 
+    if depth > MAX_NESTING_DEPTH:
+        return text_body, html_body, count
+
     if not msg.is_multipart():
         # Not an attachment!
         # See where this belong - text_body or html_body
@@ -104,7 +113,10 @@ def extract_content(msg):
     # each part.
     for part_msg in msg.get_payload():
         # part is a new Message object which goes back to extract_content
-        part_text_body, part_html_body, part_count = extract_content(part_msg)
+        part_text_body, part_html_body, part_count = extract_content(
+            part_msg,
+            depth + 1,
+        )
         text_body += part_text_body
         html_body += part_html_body
         count += part_count
@@ -134,23 +146,17 @@ def extract_metadata(msg):
     )
 
 
-@output_handler
-def main():
-    siemplify = SiemplifyAction()
-    output_message = "No EML found"
-    result_value = False
-
-    base64_blob = siemplify.parameters.get("Base64 EML Blob")
-    eml_content = base64.b64decode(base64_blob).decode("utf-8")
-
-    json_result = []
-
-    email = message_from_string(eml_content)
-    sender, to, cc, bcc, subject, date = extract_metadata(email)
-    text_body, html_body, count = extract_content(email)
-    curr_json_result = {
+def email_result(msg, base64_blob):
+    """Build the result of an email message.
+    :param msg: {email.message.Message} An eml object
+    :param base64_blob: {str} The base64 representation of the message
+    :return: {dict} The metadata and content of the message
+    """
+    sender, to, cc, bcc, subject, date = extract_metadata(msg)
+    text_body, html_body, count = extract_content(msg)
+    return {
         "base64_blob": base64_blob,
-        "headers": email._headers,
+        "headers": msg._headers,
         "sender": sender,
         "to": to,
         "cc": cc,
@@ -161,7 +167,17 @@ def main():
         "html_body": html_body,
         "count": count,
     }
-    json_result.append({"Entity": subject, "EntityResult": curr_json_result})
+
+
+def iter_email_results(email, base64_blob):
+    """Build the results of an email message and of the email messages attached to it,
+    one by one.
+    :param email: {email.message.Message} An eml object
+    :param base64_blob: {str} The base64 representation of the message
+    :return: {generator} The results of the messages, as "Entity" and "EntityResult" dicts
+    """
+    curr_json_result = email_result(email, base64_blob)
+    yield {"Entity": curr_json_result["subject"], "EntityResult": curr_json_result}
     for i, item in enumerate(email.get_payload()):
         if item.is_multipart():
             # print("Item {} is multipart".format(i))
@@ -182,32 +198,34 @@ def main():
                         if header[0].lower() == "subject":
                             file_name = header[1]
 
-                    sender, to, cc, bcc, subject, date = extract_metadata(part)
-                    text_body, html_body, count = extract_content(part)
-                    curr_json_result = {
-                        "base64_blob": curr_b64_blob,
-                        "headers": part._headers,
-                        "sender": sender,
-                        "to": to,
-                        "cc": cc,
-                        "bcc": bcc,
-                        "subject": subject,
-                        "date": date,
-                        "text_body": text_body,
-                        "html_body": html_body,
-                        "count": count,
+                    yield {
+                        "Entity": file_name,
+                        "EntityResult": email_result(part, curr_b64_blob),
                     }
-                    json_result.append(
-                        {"Entity": file_name, "EntityResult": curr_json_result},
-                    )
-                    for part2 in part.get_payload():
-                        #  print ("DEBUG PART2: part2 is {}".format(part2.get_content_maintype()))
-                        pass
                 else:
                     pass
                     # print ("DEBUG else: part is {}".format(part.get_content_maintype()))
         else:
             print(f"Item {i} is NOT multipart")
+
+
+@output_handler
+def main():
+    siemplify = SiemplifyAction()
+    output_message = "No EML found"
+    result_value = False
+
+    base64_blob = siemplify.parameters.get("Base64 EML Blob")
+
+    # The EML is decoded into a temporary file and parsed as it's read from it, so
+    # neither the decoded EML nor a copy of it is kept in memory as a whole
+    with (
+        decode_base64_to_file(base64_blob) as fp,
+        io.TextIOWrapper(fp, encoding="utf-8", newline="") as eml_fp,
+    ):
+        email = Parser().parse(eml_fp)
+
+    json_result = list(iter_email_results(email, base64_blob))
     siemplify.result.add_result_json(json_result)
     if json_result:
         output_message = "EML found and returned in json result"
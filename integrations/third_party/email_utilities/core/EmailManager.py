@@ -19,8 +19,10 @@ import binascii
 import datetime
 import email.errors
 import email.header
+import functools
 import hashlib
 import ipaddress
+import itertools
 import json
 import os
 import re
@@ -52,6 +54,7 @@ from tld import get_fld
 from urlextract import URLExtract
 
 from . import EmailParserRouting, OleId
+from .MimeAttachment import MimeAttachment, is_attachment_part, select_attachments
 from soar_sdk.SiemplifyDataModel import Attachment
 
 from .EmailUtilitiesManager import (
@@ -93,6 +96,8 @@ def compile_re(string):
     return re.compile(string, flags=re.IGNORECASE | re.MULTILINE)
 
 
+IP_OCTET_REGEX = r"""(?:1\d\d|2[0-5][0-5]|2[0-4]\d|0?[1-9]\d|0?0?\d)"""
+
 ENTITY_REGEXS = {
     "FILEHASH": {
         "patterns": [
@@ -124,12 +129,86 @@ ENTITY_REGEXS = {
     "ADDRESS": {
         "patterns": [
             compile_re(
-                r"""(?:(?:1\d\d|2[0-5][0-5]|2[0-4]\d|0?[1-9]\d|0?0?\d)\.|.*?\[\.\]|\.|\.){3}(?:1\d\d|2[0-5][0-5]|2[0-4]\d|0?[1-9]\d|0?0?\d)""",
+                rf"""(?:{IP_OCTET_REGEX}\.|.*?\[\.\]|\.|\.){{3}}{IP_OCTET_REGEX}""",
             ),
         ],
     },
 }
 
+# The ".*?\[\.\]" branch of the ADDRESS pattern scans to the end of the line at every
+# position. ADDRESS matches never span lines, so lines without a defanged dot are scanned
+# with the pattern without that branch, which finds the same addresses.
+DEFANGED_DOT = "[.]"
+UNDEFANGED_PATTERNS = {
+    ENTITY_REGEXS["ADDRESS"]["patterns"][0]: compile_re(
+        rf"""(?:{IP_OCTET_REGEX}\.|\.|\.){{3}}{IP_OCTET_REGEX}""",
+    ),
+}
+
+
+class EntityScanner:
+    """Finds the matches of the built-in and custom entity patterns in strings.
+
+    The patterns are compiled once, and a scanner is shared by all the emails and bodies
+    parsed with the same custom patterns.
+
+    Args:
+        custom_patterns (tuple): Pairs of custom entity types and their patterns.
+
+    """
+
+    def __init__(self, custom_patterns=()):
+        self.patterns = [
+            (entity_type, pattern)
+            for entity_type, entity_source in ENTITY_REGEXS.items()
+            for pattern in entity_source["patterns"]
+        ]
+        self.patterns += [
+            (entity_type, re.compile(pattern)) for entity_type, pattern in custom_patterns
+        ]
+
+    def scan(self, in_str):
+        """Find the matches of the patterns in a string, pattern by pattern.
+
+        Args:
+            in_str (str): The string to scan.
+
+        Yields:
+            tuple: The entity type of the pattern and the matched string.
+
+        """
+        lines = None
+        for entity_type, pattern in self.patterns:
+            undefanged_pattern = UNDEFANGED_PATTERNS.get(pattern)
+            if undefanged_pattern is None:
+                matches = pattern.finditer(in_str)
+            elif DEFANGED_DOT not in in_str:
+                matches = undefanged_pattern.finditer(in_str)
+            else:
+                if lines is None:
+                    lines = in_str.split("\n")
+                matches = itertools.chain.from_iterable(
+                    (pattern if DEFANGED_DOT in line else undefanged_pattern).finditer(line)
+                    for line in lines
+                )
+
+            for m in matches:
+                yield entity_type, m.group(0)
+
+
+@functools.lru_cache(maxsize=16)
+def get_entity_scanner(custom_patterns=()):
+    """Get the entity scanner of the custom patterns, shared by the whole process.
+
+    Args:
+        custom_patterns (tuple): Pairs of custom entity types and their patterns.
+
+    Returns:
+        EntityScanner: The scanner of the built-in and custom patterns.
+
+    """
+    return EntityScanner(custom_patterns)
+
 
 EXTEND_GRAPH_URL = "{}/external/v1/investigator/ExtendCaseGraph"
 INVALID_URL_PATTERN = r"https://[^\s]+https://[^\s]+"
@@ -643,35 +722,29 @@ class EmailUtils:
         entities.extend(self.custom_entities(in_str))
         return entities
 
+    @functools.cached_property
+    def entity_scanner(self):
+        custom_patterns = tuple(
+            (entity_type, pattern)
+            for entity_type, entity_source in (self.custom_regex or {}).items()
+            for pattern in entity_source["patterns"]
+        )
+        return get_entity_scanner(custom_patterns)
+
     def custom_entities(self, in_str):
         matched_entities = []
-        for entity_source in [ENTITY_REGEXS, self.custom_regex]:
-            for entity_type in entity_source:
-                for regex_search in entity_source[entity_type]["patterns"]:
-                    matches = re.finditer(regex_search, in_str)
-                    if bool(matches):
-                        for m in matches:
-                            entity = {}
-                            entity["entity_type"] = entity_type
-                            if entity_type == "DestinationURL":
-                                entity["identifier"] = EmailUtils.clean_found_url(
-                                    m.group(0),
-                                )
-                            elif (
-                                entity_type == "ADDRESS"
-                                and not extract_valid_ips_from_body(m.group(0))
-                            ):
-                                continue
-                            else:
-                                entity["identifier"] = m.group(0)
-
-                            if entity["identifier"] and re.search(
-                                INVALID_URL_PATTERN,
-                                entity["identifier"],
-                            ):
-                                continue
-                            if entity["identifier"]:
-                                matched_entities.append(entity)
+        for entity_type, identifier in self.entity_scanner.scan(in_str):
+            if entity_type == "DestinationURL":
+                identifier = EmailUtils.clean_found_url(identifier)
+            elif entity_type == "ADDRESS" and not extract_valid_ips_from_body(identifier):
+                continue
+
+            if identifier and re.search(INVALID_URL_PATTERN, identifier):
+                continue
+            if identifier:
+                matched_entities.append(
+                    {"entity_type": entity_type, "identifier": identifier},
+                )
         return matched_entities
 
     @staticmethod
@@ -1052,10 +1125,14 @@ class EMLParser:
         msg: Message,
         email_utils: EmailUtils | None = None,
         logger: SiemplifyLogger | None = None,
+        max_attachments: int | None = None,
+        max_attachment_size: int | None = None,
     ) -> None:
         self.msg: Message = msg
         self.email_utils: EmailUtils | None = email_utils
         self.logger: SiemplifyLogger | None = logger
+        self.max_attachments: int | None = max_attachments
+        self.max_attachment_size: int | None = max_attachment_size
 
     def parse_headers(self):
         # parse and decode subject
@@ -1246,6 +1323,8 @@ class EMLParser:
         """Recursively traverses all e-mail message multi-part elements and returns
         in a parsed form as a dict.
 
+        Attachments beyond the attachment limits are left out, without decoding them.
+
         Args:
             msg (email.message.Message): An e-mail message object.
             counter (int, optional): A counter which is used for generating attachments
@@ -1256,22 +1335,38 @@ class EMLParser:
                 generated hash check-sums, date size, file extension, real mime-type.
 
         """
-        attachments = []
+        attachments = select_attachments(
+            self.iter_attachments(msg, counter),
+            max_attachments=self.max_attachments,
+            max_attachment_size=self.max_attachment_size,
+            logger=self.logger,
+        )
 
+        return [self._prepare_attachment(attachment) for attachment in attachments]
+
+    def iter_attachments(self, msg, counter):
+        """Recursively enumerates the attachments of an e-mail message, without
+        decoding them.
+
+        Args:
+            msg (email.message.Message): An e-mail message object.
+            counter (int, optional): A counter which is used for generating attachments
+                file-names in case there are none found in the header. Default = 0.
+
+        Yields:
+            MimeAttachment: The attachments, in the order of their MIME parts.
+
+        """
         if msg.is_multipart():
             if "content-type" in msg and msg.get_content_type() == "message/rfc822":
-                attachments.append(self.prepare_attachment(msg, counter))
+                if is_attachment_part(msg):
+                    yield self._new_attachment(msg, counter)
 
             else:
                 for part in msg.iter_attachments():
-                    attachments.extend(self.traverse_multipart(part, counter))
-        else:
-            parsed_attachment = self.prepare_attachment(msg, counter)
-            if parsed_attachment:
-                return [self.prepare_attachment(msg, counter)]
-            return []
-
-        return attachments
+                    yield from self.iter_attachments(part, counter)
+        elif is_attachment_part(msg):
+            yield self._new_attachment(msg, counter)
 
     def prepare_attachment(self, msg, counter):
         """Extract meta-information from a multipart-part.
@@ -1286,104 +1381,60 @@ class EMLParser:
                 generated hash check-sums, date size, file extension, real mime-type.
 
         """
-        attachment = {}
-
-        # In case we hit bug 27257, try to downgrade the used policy
-        try:
-            lower_keys = [k.lower() for k in msg.keys()]
-
-        except AttributeError:
-            former_policy: email.policy.Policy = msg.policy  # type: ignore
-            msg.policy = email.policy.compat32  # type: ignore
-            lower_keys = [k.lower() for k in msg.keys()]
-            msg.policy = former_policy  # type: ignore
-
-        if (
-            "content-disposition" in lower_keys
-            and msg.get_content_disposition() != "inline"
-        ) or msg.get_content_maintype() != "text":
-            # if it's an attachment-type, pull out the filename
-            # and calculate the size in bytes
-            # charset = msg.get_content_charset()
-            filename = msg.get_filename("")
-            if msg.get_content_type() == "message/rfc822":
-                payload = msg.get_payload()
-                if len(payload) > 1:
-                    self.logger.info(
-                        'More than one payload for "message/rfc822" part detected. '
-                        "This is not supported, please report!",
-                    )
-
-                try:
-                    data = payload[0].as_bytes()
-                except UnicodeEncodeError:
-                    data = payload[0].as_bytes(policy=email.policy.compat32)
-
-                file_size = len(data)
-            else:
-                data = msg.get_payload(decode=True)
-                file_size = len(data)
-
-            if filename == "":
-                filename = f"part-{counter:03d}"
-            else:
-                filename = EmailUtils.decode_field(filename)
-
-            file_id = str(uuid.uuid1())
-            attachment["filename"] = filename
-            attachment["size"] = file_size
+        if is_attachment_part(msg):
+            return self._prepare_attachment(self._new_attachment(msg, counter))
+
+    def _new_attachment(self, msg, counter):
+        return MimeAttachment(
+            msg,
+            counter,
+            decode_field=EmailUtils.decode_field,
+            logger=self.logger,
+        )
 
-            # os.path always returns the extension as second element
-            # in case there is no extension it returns an empty string
-            extension = os.path.splitext(filename)[1].lower()
-            if extension:
-                # strip leading dot
-                attachment["extension"] = extension[1:]
+    def _prepare_attachment(self, mime_attachment):
+        data = mime_attachment.data
+        file_id = str(uuid.uuid1())
+        attachment = {
+            "filename": mime_attachment.filename,
+            "size": mime_attachment.size,
+        }
 
-            attachment["hash"] = EmailUtils.get_file_hash(data)
-            if len(data) != 0:
-                mime_type, mime_type_short = EmailUtils.get_mime_type(data)
+        if mime_attachment.extension:
+            attachment["extension"] = mime_attachment.extension
 
-                if not (mime_type is None or mime_type_short is None):
-                    attachment["mime_type"] = mime_type
-                    attachment["mime_type_short"] = mime_type_short
-                elif magic is not None:
-                    print(f'Error determining attachment mime-type - "{file_id}"')
+        attachment["hash"] = mime_attachment.hashes
+        if len(data) != 0:
+            mime_type, mime_type_short = EmailUtils.get_mime_type(data)
 
-                try:
-                    oid = OleId.OleID(data=data)
-                    indicators = oid.check()
-                    attachment["ole_data"] = []
-                    for i in indicators:
-                        ole_indicator = {}
-                        ole_indicator["id"] = i.id
-                        ole_indicator["value"] = i.value
-                        ole_indicator["name"] = i.name
-                        ole_indicator["description"] = i.description
-                        ole_indicator["risk"] = i.risk
-                        ole_indicator["hide_if_false"] = i.hide_if_false
-                        attachment["ole_data"].append(ole_indicator)
+            if not (mime_type is None or mime_type_short is None):
+                attachment["mime_type"] = mime_type
+                attachment["mime_type_short"] = mime_type_short
+            elif magic is not None:
+                print(f'Error determining attachment mime-type - "{file_id}"')
 
-                except Exception as e:
-                    print(f" failed in ole data: {e}")
-            else:
-                print("No data in attachment")
-
-            attachment["raw"] = (base64.b64encode(data)).decode("utf-8")
-
-            ch: dict[str, list[str]] = {}
-            for k, v in msg.items():
-                k = k.lower()
-                v = str(v)
+            try:
+                oid = OleId.OleID(data=data)
+                indicators = oid.check()
+                attachment["ole_data"] = []
+                for i in indicators:
+                    ole_indicator = {}
+                    ole_indicator["id"] = i.id
+                    ole_indicator["value"] = i.value
+                    ole_indicator["name"] = i.name
+                    ole_indicator["description"] = i.description
+                    ole_indicator["risk"] = i.risk
+                    ole_indicator["hide_if_false"] = i.hide_if_false
+                    attachment["ole_data"].append(ole_indicator)
 
-                if k in ch:
-                    ch[k].append(v)
-                else:
-                    ch[k] = [v]
+            except Exception as e:
+                print(f" failed in ole data: {e}")
+        else:
+            print("No data in attachment")
 
-            attachment["content_header"] = ch
-            counter += 1
-            return attachment
+        attachment["raw"] = mime_attachment.raw
+        attachment["content_header"] = mime_attachment.content_header
+        return attachment
 
     @staticmethod
     def get_content_type(headers, multipart=False):
@@ -1502,12 +1553,21 @@ class EMLParser:
 
 
 class EmailManager:
-    def __init__(self, siemplify=None, logger=None, custom_regex=None):
+    def __init__(
+        self,
+        siemplify=None,
+        logger=None,
+        custom_regex=None,
+        max_attachments=None,
+        max_attachment_size=None,
+    ):
         self.logger = logger
         self.siemplify = siemplify
         self.attachments = []
         self.attached_emails = []
         self.custom_regex = custom_regex
+        self.max_attachments = max_attachments
+        self.max_attachment_size = max_attachment_size
 
     def traverse_attachments(self, attachment_name, content_bytes, nested_level):
         try:
@@ -1612,7 +1672,13 @@ class EmailManager:
         email_utils = EmailUtils(custom_regex=self.custom_regex)
         if not msg:
             return None
-        parser = EMLParser(msg=msg, email_utils=email_utils, logger=self.logger)
+        parser = EMLParser(
+            msg=msg,
+            email_utils=email_utils,
+            logger=self.logger,
+            max_attachments=self.max_attachments,
+            max_attachment_size=self.max_attachment_size,
+        )
         return parser.parse()
 
     def get_alert_entity_identifiers(self):
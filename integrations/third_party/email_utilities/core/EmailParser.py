@@ -14,15 +14,18 @@
 
 from __future__ import annotations
 
-import base64
 import binascii
 import collections
 import email
 import email.message
+import email.parser
 import email.policy
 import email.utils
+import functools
 import hashlib
+import io
 import ipaddress
+import itertools
 import logging
 import os.path
 import re
@@ -36,6 +39,7 @@ from tld import get_fld
 from urlextract import URLExtract
 
 from . import EmailParserDecode, EmailParserRegex, EmailParserRouting
+from .MimeAttachment import MimeAttachment, is_attachment_part, select_attachments
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +56,41 @@ else:
         magic = None
 
 
+class TrieURLExtract(URLExtract):
+    """A URL extractor that searches the text for TLDs with a trie shaped regex.
+
+    URLExtract matches a regex with an alternative per TLD, longest first, at every
+    position of the text. The trie regex matches the same TLDs much faster.
+    """
+
+    def _reload_tlds_from_file(self) -> None:
+        tlds = sorted(self._load_cached_tlds(), key=len, reverse=True)
+        tlds += self._ipv4_tld
+        if self._extract_localhost:
+            tlds.append("localhost")
+
+        self._tlds_re = re.compile(
+            EmailParserRegex.build_trie_regex(tlds),
+            flags=re.IGNORECASE,
+        )
+
+
+@functools.cache
+def get_url_extractor(extract_email: bool = False) -> URLExtract:
+    """Get a URL extractor shared by the whole process.
+
+    Building an extractor loads and compiles the list of TLDs, which takes tens of
+    milliseconds, so extractors must not be built per body or per match.
+    """
+    return TrieURLExtract(extract_email=extract_email)
+
+
+@functools.lru_cache(maxsize=4096)
+def is_email_match(match: str) -> bool:
+    """Tell whether a match of the email extractor is an email rather than a URL."""
+    return "@" in match and not get_url_extractor().find_urls(match)
+
+
 class EmlParser:
     def __init__(
         self,
@@ -62,6 +101,8 @@ class EmlParser:
         ignore_bad_start: bool = False,
         email_force_tld: bool = False,
         parse_attachments: bool = True,
+        max_attachments: int | None = None,
+        max_attachment_size: int | None = None,
     ) -> None:
         self.include_raw_body = include_raw_body
         self.include_attachment_data = include_attachment_data
@@ -71,6 +112,8 @@ class EmlParser:
         self.ignore_bad_start = ignore_bad_start
         self.email_force_tld = email_force_tld
         self.parse_attachments = parse_attachments
+        self.max_attachments = max_attachments
+        self.max_attachment_size = max_attachment_size
 
         if self.email_force_tld:
             EmailParserRegex.email_regex = EmailParserRegex.email_force_tld_regex
@@ -110,6 +153,42 @@ class EmlParser:
 
         return self.decode_email_bytes(raw_email, ignore_bad_start=ignore_bad_start)
 
+    def decode_email_binary_file(
+        self,
+        fp: typing.BinaryIO,
+        ignore_bad_start: bool = False,
+    ) -> dict:
+        """Function for decoding an EML file object into an easily parsable structure.
+
+        The file is parsed as it's read, so the raw EML isn't kept in memory as a whole.
+
+        Args:
+            fp: A binary file object, positioned at the start of the EML.
+            ignore_bad_start: Ignore invalid file start for this run. This has a
+                considerable performance impact.
+
+        Returns:
+            dict: A dictionary with the content of the EML parsed and broken down into
+                  key-value pairs.
+
+        """
+        if self.ignore_bad_start or ignore_bad_start:
+            return self.decode_email_bytes(fp.read(), ignore_bad_start=True)
+
+        # Lines are read untranslated, as by email.message_from_bytes
+        text_fp = io.TextIOWrapper(
+            fp,
+            encoding="ASCII",
+            errors="surrogateescape",
+            newline="",
+        )
+        try:
+            self.msg = email.parser.Parser(policy=self.policy).parse(text_fp)
+        finally:
+            text_fp.detach()
+
+        return self.parse_email()
+
     def decode_email_bytes(
         self,
         eml_file: bytes,
@@ -475,44 +554,45 @@ class EmlParser:
             bodie: dict[str, typing.Any] = {}
             _, body, body_multhead = body_tup
             # Parse any URLs and mail found in the body
-            list_observed_urls: list[str] = []
+            list_observed_urls: typing.Counter[str] = Counter()
             list_observed_email: typing.Counter[str] = Counter()
             list_observed_dom: typing.Counter[str] = Counter()
             list_observed_ip: typing.Counter[str] = Counter()
+            domains_by_url: dict[str, str | None] = {}
 
             # If we start directly a findall on 500K+ body we got time and memory issues...
             # if more than 4K.. lets cheat, we will cut around the thing we search "://, @, ."
             # in order to reduce regex complexity.
             for body_slice in self.string_sliding_window_loop(body):
-                list_observed_urls = self.get_uri_ondata(body_slice)
-                extractor = URLExtract(extract_email=True)
-
-                for match in extractor.find_urls(body_slice):
-                    # for match in EmailParserRegex.email_regex.findall(body_slice):
-                    c = URLExtract()
-                    removedurl = c.find_urls(match)
-                    if not removedurl:
-                        match = match.replace("mailto:", "")
-                        list_observed_email[match.lower()] = 1
-
-                # for match in EmailParserRegex.dom_regex.findall(body_slice):
-                for match in list_observed_urls:
-                    try:
-                        dom = get_fld(match.lower(), fix_protocol=True)
-                        list_observed_dom[dom] = 1
-                    except Exception:
-                        pass
-                for match in EmailParserRegex.ipv4_regex.findall(body_slice):
-                    try:
-                        ipaddress_match = ipaddress.ip_address(match)
-                    except ValueError:
-                        continue
-                    else:
-                        if not (
-                            ipaddress_match.is_private or match in self.pconf["whiteip"]
-                        ):
-                            list_observed_ip[match] = 1
-                for match in EmailParserRegex.ipv6_regex.findall(body_slice):
+                for url in self.get_uri_ondata(body_slice):
+                    list_observed_urls[url] = 1
+                    if url not in domains_by_url:
+                        try:
+                            domains_by_url[url] = get_fld(url.lower(), fix_protocol=True)
+                        except Exception:
+                            domains_by_url[url] = None
+                        else:
+                            list_observed_dom[domains_by_url[url]] = 1
+
+                # Emails can only be found around an "@"
+                if "@" in body_slice:
+                    extractor = get_url_extractor(extract_email=True)
+                    for match in extractor.find_urls(body_slice):
+                        if is_email_match(match):
+                            match = match.replace("mailto:", "")
+                            list_observed_email[match.lower()] = 1
+
+                # The IP regexes are only run on the runs of characters IPs are made of,
+                # in the same order as running them on the whole slice
+                ipv4_matches: list[str] = []
+                ipv6_matches: list[str] = []
+                for run in EmailParserRegex.ip_chars_run_regex.findall(body_slice):
+                    if "." in run:
+                        ipv4_matches += EmailParserRegex.ipv4_regex.findall(run)
+                    if ":" in run:
+                        ipv6_matches += EmailParserRegex.ipv6_regex.findall(run)
+
+                for match in itertools.chain(ipv4_matches, ipv6_matches):
                     try:
                         ipaddress_match = ipaddress.ip_address(match)
                     except ValueError:
@@ -720,7 +800,7 @@ class EmlParser:
 
         """
         list_observed_urls: typing.Counter[str] = Counter()
-        extractor = URLExtract()
+        extractor = get_url_extractor()
 
         for found_url in extractor.find_urls(body):
             # for found_url in EmailParserRegex.url_regex_simple.findall(body):
@@ -914,6 +994,8 @@ class EmlParser:
     ) -> dict[str, typing.Any]:
         """Recursively traverses all e-mail message multi-part elements and returns in a parsed form as a dict.
 
+        Attachments beyond the attachment limits are left out, without decoding them.
+
         Args:
             msg (email.message.Message): An e-mail message object.
             counter (int, optional): A counter which is used for generating attachments
@@ -924,22 +1006,46 @@ class EmlParser:
                 date size, file extension, real mime-type.
 
         """
-        attachments = {}
+        attachments = select_attachments(
+            self.iter_attachments(msg, counter),
+            max_attachments=self.max_attachments,
+            max_attachment_size=self.max_attachment_size,
+            logger=logger,
+        )
+
+        result = {}
+        for attachment in attachments:
+            result.update(self._prepare_attachment(attachment))
+
+        return result
+
+    def iter_attachments(
+        self,
+        msg: email.message.Message,
+        counter: int = 0,
+    ) -> typing.Iterator[MimeAttachment]:
+        """Recursively enumerates the attachments of an e-mail message, without decoding them.
+
+        Args:
+            msg (email.message.Message): An e-mail message object.
+            counter (int, optional): A counter which is used for generating attachments
+                file-names in case there are none found in the header. Default = 0.
+
+        Yields:
+            MimeAttachment: The attachments, in the order of their MIME parts.
 
+        """
         if msg.is_multipart():
             if "content-type" in msg:
                 if msg.get_content_type() == "message/rfc822":
                     # This is an e-mail message attachment, add it to the attachment list apart from parsing it
-                    attachments.update(
-                        self.prepare_multipart_part_attachment(msg, counter),
-                    )
+                    if is_attachment_part(msg):
+                        yield self._new_attachment(msg, counter)
 
             for part in msg.get_payload():
-                attachments.update(self.traverse_multipart(part, counter))
-        else:
-            return self.prepare_multipart_part_attachment(msg, counter)
-
-        return attachments
+                yield from self.iter_attachments(part, counter)
+        elif is_attachment_part(msg):
+            yield self._new_attachment(msg, counter)
 
     def prepare_multipart_part_attachment(
         self,
@@ -958,89 +1064,51 @@ class EmlParser:
                 date size, file extension, real mime-type.
 
         """
-        attachment: dict[str, typing.Any] = {}
+        if not is_attachment_part(msg):
+            return {}
 
-        # In case we hit bug 27257, try to downgrade the used policy
-        try:
-            lower_keys = [k.lower() for k in msg.keys()]
-        except AttributeError:
-            former_policy: email.policy.Policy = msg.policy  # type: ignore
-            msg.policy = email.policy.compat32  # type: ignore
-            lower_keys = [k.lower() for k in msg.keys()]
-            msg.policy = former_policy  # type: ignore
-
-        if (
-            "content-disposition" in lower_keys
-            and msg.get_content_disposition() != "inline"
-        ) or msg.get_content_maintype() != "text":
-            # if it's an attachment-type, pull out the filename
-            # and calculate the size in bytes
-            if msg.get_content_type() == "message/rfc822":
-                payload = msg.get_payload()
-                if len(payload) > 1:
-                    logger.warning(
-                        'More than one payload for "message/rfc822" part detected. This is not supported, please report!',
-                    )
+        return self._prepare_attachment(self._new_attachment(msg, counter))
 
-                try:
-                    data = payload[0].as_bytes()
-                except UnicodeEncodeError:
-                    data = payload[0].as_bytes(policy=email.policy.compat32)
+    def _new_attachment(
+        self,
+        msg: email.message.Message,
+        counter: int,
+    ) -> MimeAttachment:
+        return MimeAttachment(
+            msg,
+            counter,
+            decode_field=EmailParserDecode.decode_field,
+            logger=logger,
+        )
 
-                file_size = len(data)
-            else:
-                data = msg.get_payload(decode=True)
-                file_size = len(data)
+    def _prepare_attachment(self, attachment: MimeAttachment) -> dict[str, typing.Any]:
+        file_id = str(uuid.uuid1())
+        prepared: dict[str, typing.Any] = {
+            "filename": attachment.filename,
+            "size": attachment.size,
+        }
 
-            filename = msg.get_filename("")
-            if filename == "":
-                filename = f"part-{counter:03d}"
-            else:
-                filename = EmailParserDecode.decode_field(filename)
-
-            file_id = str(uuid.uuid1())
-            attachment[file_id] = {}
-            attachment[file_id]["filename"] = filename
-            attachment[file_id]["size"] = file_size
-
-            # os.path always returns the extension as second element
-            # in case there is no extension it returns an empty string
-            extension = os.path.splitext(filename)[1].lower()
-            if extension:
-                # strip leading dot
-                attachment[file_id]["extension"] = extension[1:]
-
-            attachment[file_id]["hash"] = self.get_file_hash(data)
-
-            mime_type, mime_type_short = self.get_mime_type(data)
-
-            if not (mime_type is None or mime_type_short is None):
-                attachment[file_id]["mime_type"] = mime_type
-                # attachments[file_id]['mime_type_short'] = attachments[file_id]['mime_type'].split(",")[0]
-                attachment[file_id]["mime_type_short"] = mime_type_short
-            elif magic is not None:
-                logger.warning(
-                    f'Error determining attachment mime-type - "{file_id}"',
-                )
+        if attachment.extension:
+            prepared["extension"] = attachment.extension
 
-            if self.include_attachment_data:
-                attachment[file_id]["raw"] = (base64.b64encode(data)).decode("utf-8")
+        prepared["hash"] = attachment.hashes
 
-            ch: dict[str, list[str]] = {}
-            for k, v in msg.items():
-                k = k.lower()
-                v = str(v)
+        mime_type, mime_type_short = self.get_mime_type(attachment.data)
 
-                if k in ch:
-                    ch[k].append(v)
-                else:
-                    ch[k] = [v]
+        if not (mime_type is None or mime_type_short is None):
+            prepared["mime_type"] = mime_type
+            prepared["mime_type_short"] = mime_type_short
+        elif magic is not None:
+            logger.warning(
+                f'Error determining attachment mime-type - "{file_id}"',
+            )
 
-            attachment[file_id]["content_header"] = ch
+        if self.include_attachment_data:
+            prepared["raw"] = attachment.raw
 
-            counter += 1
+        prepared["content_header"] = attachment.content_header
 
-        return attachment
+        return {file_id: prepared}
 
     @staticmethod
     def get_mime_type(
@@ -1072,6 +1140,8 @@ def decode_email(
     ignore_bad_start: bool = False,
     email_force_tld: bool = False,
     parse_attachments: bool = True,
+    max_attachments: int | None = None,
+    max_attachment_size: int | None = None,
 ) -> dict:
     """Function for decoding an EML file into an easily parsable structure.
 
@@ -1105,6 +1175,12 @@ def decode_email(
                                           Please note that HTML attachments as well as other text data marked to be
                                           in-lined, will always be parsed.
 
+      max_attachments (int, optional): The maximal number of attachments to parse. No limit
+                                       by default.
+
+      max_attachment_size (int, optional): The maximal size in bytes of a parsed attachment. Larger
+                                           attachments are left out. No limit by default.
+
     Returns:
       dict: A dictionary with the content of the EML parsed and broken down into
             key-value pairs.
@@ -1127,6 +1203,8 @@ def decode_email(
         ignore_bad_start=ignore_bad_start,
         email_force_tld=email_force_tld,
         parse_attachments=parse_attachments,
+        max_attachments=max_attachments,
+        max_attachment_size=max_attachment_size,
     )
 
 
@@ -1139,6 +1217,8 @@ def decode_email_b(
     ignore_bad_start: bool = False,
     email_force_tld: bool = False,
     parse_attachments: bool = True,
+    max_attachments: int | None = None,
+    max_attachment_size: int | None = None,
 ) -> dict:
     """Function for decoding an EML file into an easily parsable structure.
 
@@ -1172,6 +1252,12 @@ def decode_email_b(
                                           Please note that HTML attachments as well as other text data marked to be
                                           in-lined, will always be parsed.
 
+      max_attachments (int, optional): The maximal number of attachments to parse. No limit
+                                       by default.
+
+      max_attachment_size (int, optional): The maximal size in bytes of a parsed attachment. Larger
+                                           attachments are left out. No limit by default.
+
     Returns:
         dict: A dictionary with the content of the EML parsed and broken down into
               key-value pairs.
@@ -1190,6 +1276,8 @@ def decode_email_b(
         ignore_bad_start=ignore_bad_start,
         email_force_tld=email_force_tld,
         parse_attachments=parse_attachments,
+        max_attachments=max_attachments,
+        max_attachment_size=max_attachment_size,
     )
 
     return ep.decode_email_bytes(eml_file)
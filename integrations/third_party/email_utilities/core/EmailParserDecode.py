@@ -14,6 +14,7 @@
 
 from __future__ import annotations
 
+import base64
 import datetime
 import email
 import email.errors
@@ -22,6 +23,8 @@ import email.policy
 import email.utils
 import json
 import logging
+import re
+import tempfile
 import typing
 
 import dateutil.parser
@@ -38,6 +41,55 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+BASE64_CHUNK_SIZE = 1024 * 1024
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+NON_BASE64_REGEX = re.compile(r"[^A-Za-z0-9+/]")
+
+
+def decode_base64_to_file(
+    data: str,
+    max_size: int = SPOOL_MAX_SIZE,
+) -> tempfile.SpooledTemporaryFile:
+    """Decode base64 data into a temporary file, chunk by chunk.
+
+    The decoded data is kept in memory up to max_size bytes, and moved to disk beyond
+    it. Like base64.b64decode, characters outside of the base64 alphabet are discarded.
+
+    Args:
+        data (str): The base64 encoded data.
+        max_size (int, optional): The size in bytes above which the file is moved to disk.
+
+    Returns:
+        tempfile.SpooledTemporaryFile: The decoded data, positioned at its start.
+
+    Raises:
+        binascii.Error: If the data is incorrectly padded.
+        ValueError: If the data contains non-ASCII characters.
+
+    """
+    fp = tempfile.SpooledTemporaryFile(max_size=max_size)
+
+    # Padding may end the decoding early, so the data from the first padding character
+    # on is decoded at once
+    padding_start = data.find("=")
+    if padding_start == -1:
+        padding_start = len(data)
+
+    remainder = ""
+    for start in range(0, padding_start, BASE64_CHUNK_SIZE):
+        chunk = data[start : min(start + BASE64_CHUNK_SIZE, padding_start)]
+        if not chunk.isascii():
+            raise ValueError("string argument should contain only ASCII characters")
+
+        chunk = remainder + NON_BASE64_REGEX.sub("", chunk)
+        end = len(chunk) - len(chunk) % 4
+        fp.write(base64.b64decode(chunk[:end]))
+        remainder = chunk[end:]
+
+    fp.write(base64.b64decode(remainder + data[padding_start:]))
+    fp.seek(0)
+    return fp
+
 
 def decode_field(field: str) -> str:
     """Try to get the specified field using the Header module.
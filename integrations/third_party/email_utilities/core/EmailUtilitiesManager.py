@@ -16,12 +16,20 @@ from __future__ import annotations
 
 import base64
 import binascii
+import concurrent.futures
 import hashlib
 import logging
 import re
 import sys
+import threading
 import time
 
+import dns.message
+import dns.name
+import dns.rcode
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
 import dnslib
 
 # only needed for arc
@@ -48,6 +56,8 @@ from dkim.crypto import (
     parse_public_key,
 )
 
+from .LookupCache import DEFAULT_MAX_WORKERS, LookupCache
+
 __all__ = [
     "ARC",
     "DKIM",
@@ -234,10 +244,12 @@ class InvalidTagSpec(InvalidTagValueList):
     pass
 
 
-def get_txt_dnspython(name, timeout=5):
+def get_txt_dnspython(name, timeout=5, resolver=None):
     """Return a TXT record associated with a DNS name."""
+    if resolver is None:
+        resolver = dns.resolver.get_default_resolver()
     try:
-        a = dns.resolver.query(
+        a = resolver.query(
             name,
             dns.rdatatype.TXT,
             raise_on_no_answer=False,
@@ -1929,9 +1941,11 @@ class Resolver:
     wildcards = {}
     failed_code = False
     last_resolver = ""
+    ttl = None
 
-    def __init__(self, nameservers=["8.8.8.8", "8.8.4.4"]):
+    def __init__(self, nameservers=["8.8.8.8", "8.8.4.4"], port=53):
         self.nameservers = nameservers
+        self.port = port
 
     def query(self, hostname, query_type="ANY", name_server=False, use_tcp=True):
         ret = []
@@ -1944,7 +1958,7 @@ class Resolver:
         self.last_resolver = name_server
         query = dnslib.DNSRecord.question(hostname, query_type.upper().strip())
         try:
-            response_q = query.send(name_server, 53, use_tcp)
+            response_q = query.send(name_server, self.port, use_tcp)
             if response_q:
                 response = dnslib.DNSRecord.parse(response_q)
             else:
@@ -1954,6 +1968,7 @@ class Resolver:
             raise OSError(str(e))
         if response:
             self.rcode = dnslib.RCODE[response.header.rcode]
+            self.ttl = min((r.ttl for r in response.rr), default=None)
             for r in response.rr:
                 try:
                     rtype = str(dnslib.QTYPE[r.rtype])
@@ -2026,6 +2041,154 @@ class Resolver:
         return self.last_resolver
 
 
+# The maximal time in seconds answers without records are cached for
+NEGATIVE_CACHE_TTL = 300
+
+
+class CachedResolver(dns.resolver.Resolver):
+    """A DNS resolver that shares answers through a TTL cache, in memory and optionally in a
+    file across runs. Answers are cached for their DNS TTL, and concurrent queries of the same
+    record wait for the one in flight instead of querying again.
+
+    Besides the dnspython queries, such as the ones of checkdmarc, it answers the TXT lookups of
+    DKIM and ARC verification through `get_txt`, and the dnslib queries of `SpfRecord` through
+    `query_records`.
+    """
+
+    def __init__(self, cache=None, max_workers=DEFAULT_MAX_WORKERS, nameservers=None, port=53):
+        """
+        :param cache: {LookupCache} the cache of answers. By default answers are cached in memory
+        :param max_workers: {int} maximal number of concurrent queries, such as the ones of the
+            domains an SPF record includes
+        :param nameservers: {list} addresses of DNS servers to use instead of the system ones,
+            and of Google's for dnslib queries
+        :param port: {int} the port of the DNS servers
+        """
+        super().__init__(configure=nameservers is None)
+        if nameservers is not None:
+            self.nameservers = list(nameservers)
+            self.port = port
+        self.lookup_cache = cache if cache is not None else LookupCache()
+        self.max_workers = max_workers
+        self.records_nameservers = nameservers
+        self.records_port = port
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+
+    def cached(self, key, query):
+        """Get a cached answer, or query it once for all the threads that need it.
+        :param key: {str} the key of the answer in the cache
+        :param query: {callable} run the query, returning the JSON serializable answer and the
+            time in seconds it's valid for
+        :return: the answer
+        """
+        with self._in_flight_lock:
+            if key in self.lookup_cache:
+                return self.lookup_cache.get(key)
+            future = self._in_flight.get(key)
+            is_querying = future is None
+            if is_querying:
+                future = self._in_flight[key] = concurrent.futures.Future()
+
+        if not is_querying:
+            return future.result()
+
+        try:
+            value, ttl = query()
+        except BaseException as e:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self._in_flight_lock:
+            self.lookup_cache.set(key, value, ttl=ttl)
+            del self._in_flight[key]
+        future.set_result(value)
+        return value
+
+    def resolve(
+        self,
+        qname,
+        rdtype=dns.rdatatype.A,
+        rdclass=dns.rdataclass.IN,
+        tcp=False,
+        source=None,
+        raise_on_no_answer=True,
+        source_port=0,
+        lifetime=None,
+        search=None,
+    ):
+        if isinstance(qname, str):
+            qname = dns.name.from_text(qname)
+        rdtype = dns.rdatatype.RdataType.make(rdtype)
+        rdclass = dns.rdataclass.RdataClass.make(rdclass)
+
+        def query():
+            try:
+                answer = super(CachedResolver, self).resolve(
+                    qname,
+                    rdtype,
+                    rdclass,
+                    tcp,
+                    source,
+                    False,
+                    source_port,
+                    lifetime,
+                    search,
+                )
+                response = answer.response
+            except dns.resolver.NXDOMAIN as e:
+                response = e.response(e.qnames()[0])
+
+            chaining_result = response.resolve_chaining()
+            ttl = chaining_result.minimum_ttl
+            if chaining_result.answer is None:
+                ttl = min(ttl, NEGATIVE_CACHE_TTL)
+            return base64.b64encode(response.to_wire()).decode(), ttl
+
+        key = f"dns:{qname.to_text().lower()}:{rdclass.name}:{rdtype.name}"
+        response = dns.message.from_wire(base64.b64decode(self.cached(key, query)))
+        if response.rcode() == dns.rcode.NXDOMAIN:
+            raise dns.resolver.NXDOMAIN(qnames=[qname], responses={qname: response})
+
+        answer = dns.resolver.Answer(qname, rdtype, rdclass, response)
+        if answer.rrset is None and raise_on_no_answer:
+            raise dns.resolver.NoAnswer(response=response)
+        return answer
+
+    def get_txt(self, name, timeout=5):
+        """Return a TXT record associated with a DNS name, as `get_txt` does. Use it as the
+        `dnsfunc` of DKIM and ARC verification.
+        @param name: The bytestring domain name to look up.
+        """
+        try:
+            unicode_name = name.decode()
+        except UnicodeDecodeError:
+            return None
+        return get_txt_dnspython(unicode_name, timeout, resolver=self)
+
+    def query_records(self, hostname, query_type="ANY"):
+        """Query records with dnslib, as `Resolver.query` does.
+        :param hostname: {str} the name to query
+        :param query_type: {str} the type of the records
+        :return: {list} the records, as (name, type, data) tuples
+        """
+
+        def query():
+            if self.records_nameservers is None:
+                resolver = Resolver()
+            else:
+                resolver = Resolver(list(self.records_nameservers), self.records_port)
+            records = resolver.query(hostname, query_type)
+            if resolver.ttl is None:
+                return records, NEGATIVE_CACHE_TTL
+            return records, resolver.ttl
+
+        key = f"records:{hostname.lower()}:{query_type.upper().strip()}"
+        return [tuple(record) for record in self.cached(key, query)]
+
+
 # Toggle debug output
 verbose = False
 
@@ -2039,13 +2202,14 @@ def trace(*args, **kwargs):
 
 
 class SpfRecord:
-    def __init__(self, domain):
+    def __init__(self, domain, resolver=None):
         self.version = None
         self.record = None
         self.mechanisms = None
         self.all_string = None
         self.domain = domain
         self.recursion_depth = 0
+        self.resolver = resolver
 
     def __str__(self):
         return self.record
@@ -2055,10 +2219,10 @@ class SpfRecord:
 
     def get_redirected_record(self):
         if self.recursion_depth >= 10:
-            return SpfRecord(self.get_redirect_domain())
+            return SpfRecord(self.get_redirect_domain(), self.resolver)
         redirect_domain = self.get_redirect_domain()
         if redirect_domain is not None:
-            redirect_record = SpfRecord.from_domain(redirect_domain)
+            redirect_record = SpfRecord.from_domain(redirect_domain, self.resolver)
             redirect_record.recursion_depth = self.recursion_depth + 1
             return redirect_record
 
@@ -2085,10 +2249,11 @@ class SpfRecord:
         if self.recursion_depth >= 10:
             return {}
         include_domains = self.get_include_domains()
+        futures = SpfRecord.from_domains_concurrently(include_domains, self.resolver)
         include_records = {}
-        for domain in include_domains:
+        for domain, future in zip(include_domains, futures):
             try:
-                include_records[domain] = SpfRecord.from_domain(domain)
+                include_records[domain] = future.result()
                 include_records[domain].recursion_depth = self.recursion_depth + 1
             except OSError as e:
                 logging.exception(e)
@@ -2108,7 +2273,7 @@ class SpfRecord:
         redirect_domain = self.get_redirect_domain()
 
         if redirect_domain is not None:
-            redirect_mechanism = SpfRecord.from_domain(redirect_domain)
+            redirect_mechanism = SpfRecord.from_domain(redirect_domain, self.resolver)
 
             if redirect_mechanism is not None:
                 return redirect_mechanism.is_record_strong()
@@ -2141,22 +2306,37 @@ class SpfRecord:
         return strong_spf_record
 
     @staticmethod
-    def from_spf_string(spf_string, domain):
+    def from_spf_string(spf_string, domain, resolver=None):
         if spf_string is not None:
-            spf_record = SpfRecord(domain)
+            spf_record = SpfRecord(domain, resolver)
             spf_record.record = spf_string
             spf_record.mechanisms = _extract_mechanisms(spf_string)
             spf_record.version = _extract_version(spf_string)
             spf_record.all_string = _extract_all_mechanism(spf_record.mechanisms)
             return spf_record
-        return SpfRecord(domain)
+        return SpfRecord(domain, resolver)
 
     @staticmethod
-    def from_domain(domain):
-        spf_string = get_spf_string_for_domain(domain)
+    def from_domain(domain, resolver=None):
+        spf_string = get_spf_string_for_domain(domain, resolver)
         if spf_string is not None:
-            return SpfRecord.from_spf_string(spf_string, domain)
-        return SpfRecord(domain)
+            return SpfRecord.from_spf_string(spf_string, domain, resolver)
+        return SpfRecord(domain, resolver)
+
+    @staticmethod
+    def from_domains_concurrently(domains, resolver=None):
+        """Get the SPF records of domains, querying them concurrently.
+        :param domains: {list} the domains
+        :param resolver: {CachedResolver} the resolver to query the records with
+        :return: {list} the futures of the records, in the order of the domains
+        """
+        if not domains:
+            return []
+        max_workers = DEFAULT_MAX_WORKERS if resolver is None else resolver.max_workers
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(domains))),
+        ) as executor:
+            return [executor.submit(SpfRecord.from_domain, domain, resolver) for domain in domains]
 
 
 def _extract_version(spf_string):
@@ -2213,9 +2393,12 @@ def _find_record_from_answers(txt_records):
     return spf_record
 
 
-def get_spf_string_for_domain(domain):
+def get_spf_string_for_domain(domain, resolver=None):
     try:
-        txt_records = Resolver().query(domain, query_type="TXT")
+        if resolver is None:
+            txt_records = Resolver().query(domain, query_type="TXT")
+        else:
+            txt_records = resolver.query_records(domain, query_type="TXT")
         return _find_record_from_answers(txt_records)
     except OSError:
         # This is returned usually as a NXDOMAIN, which is expected.
@@ -0,0 +1,213 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import json
+
+import dns.resolver
+import pydnsbl
+from ipwhois import IPWhois
+
+from .IpLocation import DbIpCity
+from .LookupCache import DEFAULT_MAX_WORKERS, lookup_all
+
+DEFAULT_LOOKUP_TIMEOUT = 10
+
+
+class HopEnrichment:
+    """The DNSBL, DNS, RDAP and geolocation lookups of the relay hosts of email hops.
+    The hosts of all the hops are collected and looked up concurrently, each distinct lookup
+    once, before the hops are parsed. Lookups that were not prefetched run when their result
+    is first needed.
+    """
+
+    def __init__(
+        self,
+        cache=None,
+        max_workers=DEFAULT_MAX_WORKERS,
+        timeout=DEFAULT_LOOKUP_TIMEOUT,
+        nameservers=None,
+        port=53,
+    ):
+        """
+        :param cache: {LookupCache} the cache of lookup results of previous runs
+        :param max_workers: {int} maximal number of concurrent lookups
+        :param timeout: {int} timeout of each lookup in seconds
+        :param nameservers: {list} addresses of DNS servers to use instead of the system ones
+        :param port: {int} the port of the DNS servers
+        """
+        self.cache = cache
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.nameservers = nameservers
+        self.port = port
+        self._results = {}
+        self._resolver = dns.resolver.Resolver(configure=nameservers is None)
+        if nameservers is not None:
+            self._resolver.nameservers = list(nameservers)
+            self._resolver.port = port
+
+    def prefetch(self, from_hosts, by_hosts):
+        """Run the lookups the hops of the hosts are enriched with, concurrently.
+        :param from_hosts: {iterable} the hosts the hops were received from
+        :param by_hosts: {iterable} the hosts that received the hops
+        """
+        keys = []
+        for host in from_hosts:
+            if is_ip_address(host):
+                keys += [f"dnsbl_ip:{host}", *self._address_keys(host)]
+            else:
+                keys += [f"dnsbl_domain:{host}", f"resolve:{host}"]
+
+        for host in by_hosts:
+            if is_ip_address(host):
+                # Hosts without RDAP data are resolved instead
+                keys += self._address_keys(host) or [f"resolve:{host}"]
+            else:
+                keys.append(f"resolve:{host}")
+
+        self._lookup_all(keys)
+
+        # The addresses the host names resolved to are looked up next
+        address_keys = []
+        for key, future in list(self._results.items()):
+            if key.startswith("resolve:") and future.exception() is None:
+                address_keys += self._address_keys(future.result())
+
+        self._lookup_all(address_keys)
+
+    def dnsbl_ip(self, ip):
+        """
+        :param ip: {str} an IP address
+        :return: {dict} the DNSBL listing of the address, with "blacklisted", "detected_by",
+            "categories", "providers_count" and "failed_providers" keys
+        """
+        return self._get(f"dnsbl_ip:{ip}")
+
+    def dnsbl_domain(self, domain):
+        """
+        :param domain: {str} a domain name
+        :return: {dict} the DNSBL listing of the domain, as returned by `dnsbl_ip`
+        """
+        return self._get(f"dnsbl_domain:{domain}")
+
+    def resolve(self, host):
+        """
+        :param host: {str} a host name
+        :return: {str} the first IPv4 address of the host
+        """
+        return self._get(f"resolve:{host}")
+
+    def rdap(self, ip):
+        """
+        :param ip: {str} an IP address
+        :return: {dict} the RDAP whois information of the address
+        """
+        return self._get(f"rdap:{ip}")
+
+    def geo(self, ip):
+        """
+        :param ip: {str} an IP address
+        :return: {dict} the geolocation of the address
+        """
+        return self._get(f"geo:{ip}")
+
+    def lookup(self, key):
+        """Run a single lookup.
+        :param key: {str} the kind of the lookup and the host, separated by ":"
+        :return: {dict|str} the result of the lookup
+        """
+        kind, _, host = key.partition(":")
+        if kind == "dnsbl_ip":
+            return self.lookup_dnsbl(host, pydnsbl.DNSBLIpChecker)
+        if kind == "dnsbl_domain":
+            return self.lookup_dnsbl(host, pydnsbl.DNSBLDomainChecker)
+        if kind == "resolve":
+            return str(self._resolver.resolve(host, lifetime=self.timeout)[0])
+        if kind == "rdap":
+            return self.lookup_rdap(host)
+        if kind == "geo":
+            return self.lookup_geo(host)
+        raise ValueError(f"Unknown lookup: {key}")
+
+    def lookup_dnsbl(self, host, checker_class):
+        # Every lookup runs on its own event loop, as the lookups run in different threads
+        loop = asyncio.new_event_loop()
+        try:
+            checker = checker_class(timeout=self.timeout, loop=loop)
+            if self.nameservers is not None:
+                checker._resolver.nameservers = [
+                    f"[{address}]:{self.port}" if ":" in address else f"{address}:{self.port}"
+                    for address in self.nameservers
+                ]
+            result = checker.check(host)
+        finally:
+            loop.close()
+
+        return {
+            "blacklisted": result.blacklisted,
+            "detected_by": result.detected_by,
+            "categories": sorted(result.categories),
+            "providers_count": len(result.providers),
+            "failed_providers": [provider.host for provider in result.failed_providers],
+        }
+
+    def lookup_rdap(self, ip):
+        return IPWhois(ip, timeout=self.timeout).lookup_rdap(depth=1)
+
+    def lookup_geo(self, ip):
+        response = DbIpCity.get(ip, api_key="free", timeout=self.timeout)
+        return json.loads(response.to_json())
+
+    def _address_keys(self, ip):
+        # Private and reserved addresses have no RDAP data, so they are not looked up ahead
+        if ipaddress.ip_address(ip).is_global:
+            return [f"rdap:{ip}", f"geo:{ip}"]
+        return []
+
+    def _lookup_all(self, keys):
+        keys = [key for key in dict.fromkeys(keys) if key not in self._results]
+        self._results.update(
+            lookup_all(
+                self.lookup,
+                keys,
+                cache=self.cache,
+                max_workers=self.max_workers,
+                is_cacheable=is_cacheable_result,
+            ),
+        )
+
+    def _get(self, key):
+        if key not in self._results:
+            self._lookup_all([key])
+        return self._results[key].result()
+
+
+def is_ip_address(host):
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+def is_cacheable_result(result):
+    # DNSBL results are not kept across runs when no provider answered, as on DNS outages.
+    # Some providers fail on every query, so results with some failures are kept.
+    if isinstance(result, dict) and "failed_providers" in result:
+        return len(result["failed_providers"]) < result["providers_count"]
+    return True
@@ -139,12 +139,19 @@ class DbIpCity:
     """Class for accessing geolocation data provided by https://db-ip.com/api/."""
 
     @staticmethod
-    def get(ip_address, api_key="free", db_path=None, username=None, password=None):
+    def get(
+        ip_address,
+        api_key="free",
+        db_path=None,
+        username=None,
+        password=None,
+        timeout=62,
+    ):
         # process request
         try:
             request = requests.get(
                 "http://api.db-ip.com/v2/" + quote(api_key) + "/" + quote(ip_address),
-                timeout=62,
+                timeout=timeout,
             )
         except:
             raise
@@ -184,7 +191,7 @@ class DbIpCity:
             + content.get("stateProv", "")
             + " "
             + content.get("countryCode", ""),
-            timeout=62,
+            timeout=timeout,
         )
 
         if osm.ok:
@@ -194,7 +201,7 @@ class DbIpCity:
         else:
             osm = geocoder.osm(
                 content.get("city", "") + ", " + content.get("countryCode", ""),
-                timeout=62,
+                timeout=timeout,
             )
 
             if osm.ok:
@@ -0,0 +1,130 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import concurrent.futures
+import json
+import os
+import time
+
+DEFAULT_MAX_WORKERS = 10
+DEFAULT_CACHE_MAX_AGE = 24 * 60 * 60
+
+
+class LookupCache:
+    """A TTL cache of lookup results, stored as a JSON file so it's shared across runs.
+    Values must be JSON serializable.
+    """
+
+    def __init__(self, path=None, max_age=DEFAULT_CACHE_MAX_AGE):
+        """
+        :param path: {str} the path of the cache file. Without a path results are only cached in
+            memory
+        :param max_age: {int} maximal age of cached results in seconds. 0 disables the cache
+        """
+        self.path = path
+        self.max_age = max_age
+        self._entries = {}
+        self._is_dirty = False
+        if self.max_age > 0 and self.path is not None:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if isinstance(entries, dict):
+            now = time.time()
+            self._entries = {
+                key: entry
+                for key, entry in entries.items()
+                if isinstance(entry, dict) and self._is_fresh(entry, now)
+            }
+
+    def _is_fresh(self, entry, now):
+        age = now - entry.get("stored_at", 0)
+        return age <= self.max_age and age <= entry.get("ttl", self.max_age)
+
+    def __contains__(self, key):
+        entry = self._entries.get(key)
+        return entry is not None and self._is_fresh(entry, time.time())
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        return default if entry is None else entry["value"]
+
+    def set(self, key, value, ttl=None):
+        """
+        :param key: {str} the key of the result
+        :param value: the result
+        :param ttl: {int} the time in seconds the result is valid for, if shorter than max_age
+        """
+        if self.max_age > 0:
+            self._entries[key] = {"stored_at": time.time(), "value": value}
+            if ttl is not None:
+                self._entries[key]["ttl"] = ttl
+            self._is_dirty = True
+
+    def save(self):
+        """Write the cache file, if results were added. The file is replaced atomically, so
+        concurrent runs never read a partial file.
+        """
+        if not self._is_dirty or self.path is None:
+            return
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self.path)
+        self._is_dirty = False
+
+
+def lookup_all(lookup, keys, cache=None, max_workers=DEFAULT_MAX_WORKERS, is_cacheable=None):
+    """Look up every distinct key once, concurrently, using cached results where possible.
+    Successful results are added to the cache.
+    :param lookup: {callable} look up a single key, returning a JSON serializable result
+    :param keys: {iterable} the keys to look up. Duplicate keys are looked up once
+    :param cache: {LookupCache} the cache of results of previous lookups
+    :param max_workers: {int} maximal number of concurrent lookups
+    :param is_cacheable: {callable} tells whether a result may be cached. By default every
+        successful result is cached
+    :return: {dict} the keys mapped to futures of their results, in the order of the keys
+    """
+    futures = {}
+    looked_up = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for key in keys:
+            if key in futures:
+                continue
+
+            if cache is not None and key in cache:
+                futures[key] = concurrent.futures.Future()
+                futures[key].set_result(cache.get(key))
+            else:
+                futures[key] = executor.submit(lookup, key)
+                looked_up.append(key)
+
+    if cache is not None:
+        for key in looked_up:
+            if futures[key].exception() is None and (
+                is_cacheable is None or is_cacheable(futures[key].result())
+            ):
+                cache.set(key, futures[key].result())
+
+    return futures
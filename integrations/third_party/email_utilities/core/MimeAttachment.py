@@ -0,0 +1,215 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Lazily processed attachment MIME parts of e-mail messages.
+
+Enumerating the attachments of a message only reads the headers of their MIME parts.
+The content of a part is decoded when it's first needed, once, and its size, hashes
+and base64 form are all computed from that decoded copy. Attachments left out by the
+attachment limits are never decoded.
+"""
+
+from __future__ import annotations
+
+import base64
+import email.message
+import email.policy
+import functools
+import hashlib
+import logging
+import os.path
+import typing
+
+if typing.TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+HASH_ALGORITHMS = ("md5", "sha1", "sha256", "sha512")
+
+
+def is_attachment_part(msg: email.message.Message) -> bool:
+    """Check whether a MIME part is an attachment rather than a body part.
+
+    Args:
+        msg (email.message.Message): A MIME part.
+
+    Returns:
+        bool: True for parts with a content-disposition other than inline, and for
+            parts that aren't text.
+
+    """
+    # In case we hit bug 27257, try to downgrade the used policy
+    try:
+        lower_keys = [k.lower() for k in msg.keys()]
+    except AttributeError:
+        former_policy: email.policy.Policy = msg.policy  # type: ignore
+        msg.policy = email.policy.compat32  # type: ignore
+        lower_keys = [k.lower() for k in msg.keys()]
+        msg.policy = former_policy  # type: ignore
+
+    return (
+        "content-disposition" in lower_keys and msg.get_content_disposition() != "inline"
+    ) or msg.get_content_maintype() != "text"
+
+
+class MimeAttachment:
+    """An attachment MIME part, whose content is decoded on demand.
+
+    The file name and content headers come from the part headers. The decoded content
+    is kept once decoded, so the size, hashes and base64 form of the attachment don't
+    decode it again.
+
+    Args:
+        msg (email.message.Message): The attachment MIME part.
+        counter (int, optional): A counter which is used for generating the file-name
+            in case there is none found in the header. Default = 0.
+        decode_field (callable, optional): Decodes the file-name found in the header.
+        logger (optional): The logger to warn about unsupported parts with.
+
+    """
+
+    def __init__(
+        self,
+        msg: email.message.Message,
+        counter: int = 0,
+        decode_field: Callable[[str], str] | None = None,
+        logger: typing.Any = None,
+    ) -> None:
+        self.msg = msg
+        self.logger = logger or logging.getLogger(__name__)
+
+        filename = msg.get_filename("")
+        if filename == "":
+            filename = f"part-{counter:03d}"
+        elif decode_field is not None:
+            filename = decode_field(filename)
+        self.filename = filename
+
+    @property
+    def extension(self) -> str:
+        """str: The lower-case file extension without its leading dot, or an empty string."""
+        # os.path always returns the extension as second element
+        # in case there is no extension it returns an empty string
+        return os.path.splitext(self.filename)[1].lower()[1:]
+
+    @property
+    def is_message(self) -> bool:
+        """bool: Whether the attachment is an e-mail message."""
+        return self.msg.get_content_type() == "message/rfc822"
+
+    @functools.cached_property
+    def content_header(self) -> dict[str, list[str]]:
+        """dict: The headers of the part, by lower-case name."""
+        ch: dict[str, list[str]] = {}
+        for k, v in self.msg.items():
+            k = k.lower()
+            v = str(v)
+
+            if k in ch:
+                ch[k].append(v)
+            else:
+                ch[k] = [v]
+
+        return ch
+
+    @property
+    def estimated_size(self) -> int:
+        """int: The size of the decoded content, estimated from the encoded payload
+        if the content isn't decoded yet.
+        """
+        payload = self.msg.get_payload()
+        if "data" in self.__dict__ or not isinstance(payload, str):
+            return self.size
+
+        if self.msg.get("content-transfer-encoding", "").strip().lower() == "base64":
+            encoded_size = len(payload) - payload.count("\n") - payload.count("\r")
+            padding = payload.rstrip()[-2:].count("=")
+            return encoded_size * 3 // 4 - padding
+
+        return len(payload)
+
+    @functools.cached_property
+    def data(self) -> bytes:
+        """bytes: The decoded content. E-mail message attachments are serialized."""
+        if not self.is_message:
+            return self.msg.get_payload(decode=True)
+
+        payload = self.msg.get_payload()
+        if len(payload) > 1:
+            self.logger.warning(
+                'More than one payload for "message/rfc822" part detected. '
+                "This is not supported, please report!",
+            )
+
+        try:
+            return payload[0].as_bytes()
+        except UnicodeEncodeError:
+            return payload[0].as_bytes(policy=email.policy.compat32)
+
+    @property
+    def size(self) -> int:
+        """int: The size of the decoded content in bytes."""
+        return len(self.data)
+
+    @functools.cached_property
+    def hashes(self) -> dict[str, str]:
+        """dict: The ``MD5``, ``SHA-1``, ``SHA-256`` and ``SHA-512`` hashes of the content."""
+        return {k: getattr(hashlib, k)(self.data).hexdigest() for k in HASH_ALGORITHMS}
+
+    @property
+    def raw(self) -> str:
+        """str: The content, base64 encoded."""
+        return base64.b64encode(self.data).decode("utf-8")
+
+
+def select_attachments(
+    attachments: Iterable[MimeAttachment],
+    max_attachments: int | None = None,
+    max_attachment_size: int | None = None,
+    logger: typing.Any = None,
+) -> list[MimeAttachment]:
+    """Select the attachments within the attachment limits, in their order.
+
+    Attachments larger than the size limit are left out without decoding them when
+    their size can be estimated from the encoded payload, and don't count towards the
+    count limit.
+
+    Args:
+        attachments (Iterable[MimeAttachment]): The attachments.
+        max_attachments (int, optional): The maximal number of attachments to select.
+            No limit if None.
+        max_attachment_size (int, optional): The maximal size of a selected attachment
+            in bytes. No limit if None.
+        logger (optional): The logger to report left out attachments with.
+
+    Returns:
+        list[MimeAttachment]: The selected attachments.
+
+    """
+    logger = logger or logging.getLogger(__name__)
+    selected = []
+    for attachment in attachments:
+        if max_attachments is not None and len(selected) >= max_attachments:
+            logger.warning(
+                f'Attachment "{attachment.filename}" left out, as there are more than '
+                f"{max_attachments} attachments",
+            )
+        elif max_attachment_size is not None and attachment.estimated_size > max_attachment_size:
+            logger.warning(
+                f'Attachment "{attachment.filename}" left out, as it is larger than '
+                f"{max_attachment_size} bytes",
+            )
+        else:
+            selected.append(attachment)
+
+    return selected
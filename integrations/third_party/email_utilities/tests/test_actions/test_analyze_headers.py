@@ -0,0 +1,258 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import http.server
+import json
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import dns.resolver
+import pytest
+import requests
+from dnslib import QTYPE, RR, TXT, A
+from dnslib.server import BaseResolver, DNSLogger, DNSServer
+
+from ...core.EmailUtilitiesManager import CachedResolver, SpfRecord
+from ...core.HopEnrichment import HopEnrichment
+from ...core.LookupCache import LookupCache
+
+if TYPE_CHECKING:
+    import pathlib
+    from collections.abc import Iterator
+
+RESPONSE_DELAY = 0.2
+LISTED_ADDRESS = "8.8.4.4"
+HOST_ADDRESSES = {"relay.example.com.": LISTED_ADDRESS, "mx.example.org.": "1.1.1.1"}
+TXT_RECORDS = {
+    "sel._domainkey.example.com.": "v=DKIM1; k=rsa; p=",
+    "example.com.": "v=spf1 include:a.example.com include:b.example.com -all",
+    "a.example.com.": "v=spf1 ip4:192.0.2.0/24 include:c.example.com ~all",
+    "b.example.com.": "v=spf1 include:c.example.com ~all",
+    # Includes form a cycle
+    "c.example.com.": "v=spf1 ip4:198.51.100.0/24 include:a.example.com -all",
+}
+
+
+class StubResolver(BaseResolver):
+    queries: collections.Counter[str] = collections.Counter()
+
+    def resolve(self, request, handler):
+        name = str(request.q.qname)
+        StubResolver.queries[name] += 1
+        reply = request.reply()
+        if request.q.qtype == QTYPE.TXT and name in TXT_RECORDS:
+            time.sleep(RESPONSE_DELAY)
+            reply.add_answer(RR(name, QTYPE.TXT, rdata=TXT(TXT_RECORDS[name]), ttl=60))
+        elif name in HOST_ADDRESSES:
+            reply.add_answer(RR(name, QTYPE.A, rdata=A(HOST_ADDRESSES[name]), ttl=60))
+        elif name.startswith("4.4.8.8."):
+            # The address is listed by every DNSBL
+            reply.add_answer(RR(name, QTYPE.A, rdata=A("127.0.0.2"), ttl=60))
+        else:
+            reply.header.rcode = 3  # NXDOMAIN
+
+        return reply
+
+
+class StubLookupHandler(http.server.BaseHTTPRequestHandler):
+    requests_count: collections.Counter[str] = collections.Counter()
+
+    def do_GET(self) -> None:
+        StubLookupHandler.requests_count[self.path] += 1
+        time.sleep(RESPONSE_DELAY)
+        body = json.dumps({"query": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class StubHopEnrichment(HopEnrichment):
+    """Looks up RDAP and geo location data from the stub HTTP server."""
+
+    base_url = ""
+
+    def lookup_rdap(self, ip: str) -> dict:
+        return requests.get(f"{self.base_url}/rdap/{ip}", timeout=self.timeout).json()
+
+    def lookup_geo(self, ip: str) -> dict:
+        return requests.get(f"{self.base_url}/geo/{ip}", timeout=self.timeout).json()
+
+
+@pytest.fixture
+def dns_port() -> Iterator[int]:
+    StubResolver.queries.clear()
+    server = DNSServer(
+        StubResolver(),
+        address="127.0.0.1",
+        port=0,
+        logger=DNSLogger("-request,-reply"),
+    )
+    server.start_thread()
+    port = server.server.server_address[1]
+    # dnslib queries, such as the ones of SPF records, are made over TCP
+    tcp_server = DNSServer(
+        StubResolver(),
+        address="127.0.0.1",
+        port=port,
+        tcp=True,
+        logger=DNSLogger("-request,-reply"),
+    )
+    tcp_server.start_thread()
+    try:
+        yield port
+    finally:
+        server.stop()
+        tcp_server.stop()
+
+
+@pytest.fixture
+def stub_server_url() -> Iterator[str]:
+    StubLookupHandler.requests_count.clear()
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubLookupHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def build_enrichment(dns_port: int, base_url: str, cache=None) -> StubHopEnrichment:
+    enrichment = StubHopEnrichment(
+        cache=cache,
+        max_workers=10,
+        timeout=2,
+        nameservers=["127.0.0.1"],
+        port=dns_port,
+    )
+    enrichment.base_url = base_url
+    return enrichment
+
+
+def test_prefetch_looks_up_every_host_once(dns_port: int, stub_server_url: str) -> None:
+    enrichment = build_enrichment(dns_port, stub_server_url)
+
+    start = time.monotonic()
+    enrichment.prefetch(
+        from_hosts=["relay.example.com", "9.9.9.9"] * 5,
+        by_hosts=["mx.example.org", "10.0.0.1", "9.9.9.9"] * 5,
+    )
+    elapsed = time.monotonic() - start
+
+    assert enrichment.resolve("relay.example.com") == LISTED_ADDRESS
+    assert enrichment.rdap(LISTED_ADDRESS) == {"query": f"/rdap/{LISTED_ADDRESS}"}
+    assert enrichment.geo("1.1.1.1") == {"query": "/geo/1.1.1.1"}
+    assert enrichment.dnsbl_ip("9.9.9.9")["blacklisted"] is False
+    assert StubResolver.queries["relay.example.com."] == 1
+    assert StubLookupHandler.requests_count == {
+        f"/{kind}/{ip}": 1
+        for kind in ("rdap", "geo")
+        for ip in ("9.9.9.9", LISTED_ADDRESS, "1.1.1.1")
+    }
+    # The hosts are looked up concurrently, then the addresses they resolved to
+    assert elapsed < 4 * RESPONSE_DELAY
+
+
+def test_dnsbl_listing(dns_port: int, stub_server_url: str) -> None:
+    enrichment = build_enrichment(dns_port, stub_server_url)
+
+    result = enrichment.dnsbl_ip(LISTED_ADDRESS)
+
+    assert result["blacklisted"] is True
+    assert result["detected_by"]
+    assert result["failed_providers"] == []
+
+
+def test_lookups_are_cached_across_runs(
+    dns_port: int,
+    stub_server_url: str,
+    tmp_path: pathlib.Path,
+) -> None:
+    cache_path = str(tmp_path / "cache.json")
+    hosts = {"from_hosts": ["relay.example.com"], "by_hosts": ["mx.example.org"]}
+
+    cache = LookupCache(cache_path, max_age=60)
+    build_enrichment(dns_port, stub_server_url, cache).prefetch(**hosts)
+    cache.save()
+    queries = sum(StubResolver.queries.values())
+    requests_count = sum(StubLookupHandler.requests_count.values())
+
+    enrichment = build_enrichment(dns_port, stub_server_url, LookupCache(cache_path, max_age=60))
+    enrichment.prefetch(**hosts)
+
+    assert enrichment.rdap("1.1.1.1") == {"query": "/rdap/1.1.1.1"}
+    assert sum(StubResolver.queries.values()) == queries
+    assert sum(StubLookupHandler.requests_count.values()) == requests_count
+
+
+def test_concurrent_txt_queries_are_coalesced(dns_port: int) -> None:
+    resolver = CachedResolver(nameservers=["127.0.0.1"], port=dns_port)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
+        results = list(executor.map(resolver.get_txt, [b"sel._domainkey.example.com"] * 10))
+
+    assert results == [b"v=DKIM1; k=rsa; p="] * 10
+    assert StubResolver.queries["sel._domainkey.example.com."] == 1
+
+
+def test_spf_include_tree_is_queried_once_per_domain(dns_port: int) -> None:
+    resolver = CachedResolver(nameservers=["127.0.0.1"], port=dns_port)
+
+    start = time.monotonic()
+    records = SpfRecord.from_domain("example.com", resolver).get_include_records()
+    futures = SpfRecord.from_domains_concurrently(
+        ["a.example.com", "b.example.com", "c.example.com"] * 3,
+        resolver,
+    )
+    elapsed = time.monotonic() - start
+
+    assert list(records) == ["a.example.com", "b.example.com"]
+    assert futures[-1].result().record == TXT_RECORDS["c.example.com."]
+    assert StubResolver.queries == {f"{domain}example.com.": 1 for domain in ("", "a.", "b.", "c.")}
+    # The includes of a record are queried concurrently
+    assert elapsed < 4 * RESPONSE_DELAY
+
+
+def test_answers_are_cached_across_runs(dns_port: int, tmp_path: pathlib.Path) -> None:
+    cache_path = str(tmp_path / "cache.json")
+
+    def run() -> None:
+        cache = LookupCache(cache_path, max_age=60)
+        resolver = CachedResolver(cache, nameservers=["127.0.0.1"], port=dns_port)
+        assert resolver.get_txt(b"sel._domainkey.example.com") == b"v=DKIM1; k=rsa; p="
+        assert str(resolver.resolve("relay.example.com", "A")[0]) == LISTED_ADDRESS
+        assert resolver.query_records("mx.example.org", "A") == [
+            ("mx.example.org", "A", "1.1.1.1"),
+        ]
+        with pytest.raises(dns.resolver.NXDOMAIN):
+            resolver.resolve("missing.example.com", "TXT")
+        cache.save()
+
+    run()
+    queries = sum(StubResolver.queries.values())
+    run()
+
+    assert queries == 4
+    assert sum(StubResolver.queries.values()) == queries
@@ -0,0 +1,48 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+from ...core.EmailManager import EmailUtils
+
+CUSTOM_REGEX = {
+    "CVE": {"patterns": [r"CVE-\d{4}-\d{4,7}"]},
+    "TICKET": {"patterns": [r"\bINC\d{7}\b", r"\bREQ\d{7}\b"]},
+}
+
+
+def test_custom_entities() -> None:
+    text = (
+        "Ticket INC0012345 tracks CVE-2024-12345 on 8.8.8.8, see REQ0000001.\n"
+        "Defanged 1[.]2[.]3[.]4 next to 9.9.9.9 at https://bad.example.com/x\n"
+    )
+
+    entities = EmailUtils(custom_regex=CUSTOM_REGEX).custom_entities(text)
+
+    assert [(e["entity_type"], e["identifier"]) for e in entities] == [
+        ("DestinationURL", "https://bad.example.com/x"),
+        ("ADDRESS", "8.8.8.8"),
+        ("ADDRESS", "9.9.9.9"),
+        ("CVE", "CVE-2024-12345"),
+        ("TICKET", "INC0012345"),
+        ("TICKET", "REQ0000001"),
+    ]
+
+
+def test_entity_scanner_is_shared() -> None:
+    first = EmailUtils(custom_regex=CUSTOM_REGEX).entity_scanner
+    second = EmailUtils(custom_regex=dict(CUSTOM_REGEX)).entity_scanner
+
+    assert first is second
+    assert EmailUtils(custom_regex={}).entity_scanner is not first
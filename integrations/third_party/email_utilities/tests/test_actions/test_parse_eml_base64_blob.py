@@ -0,0 +1,63 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import email
+
+from ...actions.ParseEmlBase64Blob import (
+    MAX_NESTING_DEPTH,
+    extract_content,
+    iter_email_results,
+)
+
+
+def build_nested_email(depth: int) -> email.message.Message:
+    content = "Content-Type: text/plain\n\nleaf\n"
+    for i in range(depth):
+        content = f'Content-Type: multipart/mixed; boundary="b{i}"\n\n--b{i}\n{content}--b{i}--\n'
+    return email.message_from_string(f"From: a@example.com\nSubject: Nested\n{content}")
+
+
+def test_nesting_depth_is_capped() -> None:
+    assert extract_content(build_nested_email(MAX_NESTING_DEPTH)) == ("leaf", "", 1)
+    assert extract_content(build_nested_email(MAX_NESTING_DEPTH + 1)) == ("", "", 0)
+
+
+def test_email_results() -> None:
+    msg = email.message_from_string(
+        "From: Sender <sender@example.com>\n"
+        "To: recipient@example.org\n"
+        "Subject: Report\n"
+        'Content-Type: multipart/mixed; boundary="outer"\n\n'
+        "--outer\n"
+        'Content-Type: multipart/mixed; boundary="inner"\n\n'
+        "--inner\n"
+        "Content-Type: text/plain\n\nbody\n"
+        "--inner\n"
+        'Content-Type: multipart/alternative; boundary="attached"\n'
+        "Subject: Attached\n\n"
+        "--attached\n"
+        "Content-Type: text/plain\n\nattached body\n"
+        "--attached--\n"
+        "--inner--\n"
+        "--outer--\n",
+    )
+
+    results = list(iter_email_results(msg, "blob"))
+
+    assert [r["Entity"] for r in results] == ["Report", "Attached"]
+    assert results[0]["EntityResult"]["sender"] == ["sender@example.com"]
+    assert results[0]["EntityResult"]["text_body"] == "bodyattached body"
+    assert results[1]["EntityResult"]["text_body"] == "attached body"
@@ -0,0 +1,123 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import base64
+import email.message
+import hashlib
+import io
+
+from ...core.EmailParser import EmlParser, get_url_extractor, is_email_match
+from ...core.EmailParserDecode import decode_base64_to_file
+from ...core.MimeAttachment import select_attachments
+
+
+def build_email(body: str) -> bytes:
+    msg = email.message.EmailMessage()
+    msg["From"] = "sender@example.com"
+    msg["To"] = "recipient@example.org"
+    msg["Subject"] = "Newsletter"
+    msg.set_content(body)
+    return msg.as_bytes()
+
+
+def parse_body(body: str) -> dict:
+    parsed = EmlParser(include_raw_body=True).decode_email_bytes(build_email(body))
+    return parsed["body"][0]
+
+
+def test_body_observables() -> None:
+    body = parse_body(
+        "Visit https://news.example.com/item?id=1 or write to Editor@Example.org.\n"
+        "Served from 8.8.8.8 and 2001:4860:4860::8888, not from 10.0.0.1.\n"
+    )
+
+    assert body["uri"][0] == "https://news.example.com/item?id=1"
+    assert body["email"] == ["editor@example.org"]
+    assert body["domain"] == ["example.com"]
+    assert body["ip"] == ["8.8.8.8", "2001:4860:4860::8888"]
+
+
+def test_body_observables_of_every_slice() -> None:
+    filler = "lorem ipsum dolor sit amet " * 2000
+    body = parse_body(f"https://first.example.com/a {filler} https://last.example.net/b {filler}")
+
+    assert body["uri"] == ["https://first.example.com/a", "https://last.example.net/b"]
+    assert body["domain"] == ["example.com", "example.net"]
+
+
+def test_url_extractors_are_shared() -> None:
+    assert get_url_extractor() is get_url_extractor()
+    assert get_url_extractor(extract_email=True) is not get_url_extractor()
+    assert is_email_match("mailto:someone@example.com")
+    assert not is_email_match("https://example.com/@someone")
+
+
+def build_email_with_attachments(sizes: list[int]) -> bytes:
+    msg = email.message.EmailMessage()
+    msg["From"] = "sender@example.com"
+    msg["To"] = "recipient@example.org"
+    msg["Subject"] = "Attachments"
+    msg.set_content("See attached")
+    for i, size in enumerate(sizes):
+        msg.add_attachment(
+            bytes(size),
+            maintype="application",
+            subtype="octet-stream",
+            filename=f"file{i}.bin",
+        )
+    return msg.as_bytes()
+
+
+def test_attachment_limits() -> None:
+    raw = build_email_with_attachments([10, 5000, 20, 30])
+
+    parsed = EmlParser(max_attachments=2, max_attachment_size=1000).decode_email_bytes(raw)
+
+    assert [a["filename"] for a in parsed["attachment"]] == ["file0.bin", "file2.bin"]
+    assert [a["size"] for a in parsed["attachment"]] == [10, 20]
+
+
+def test_attachments_are_decoded_on_demand() -> None:
+    parser = EmlParser()
+    parser.decode_email_bytes(build_email_with_attachments([10, 5000]))
+    attachments = list(parser.iter_attachments(parser.msg))
+
+    selected = select_attachments(attachments, max_attachment_size=1000)
+
+    assert selected == attachments[:1]
+    assert [a.estimated_size for a in attachments] == [10, 5000]
+    assert "data" not in attachments[1].__dict__
+    assert selected[0].hashes["md5"] == hashlib.md5(bytes(10)).hexdigest()
+
+
+def test_base64_is_decoded_to_file() -> None:
+    data = bytes(range(256)) * 100
+    encoded = base64.encodebytes(data).decode()
+
+    with decode_base64_to_file(encoded, max_size=1000) as fp:
+        assert fp._rolled
+        assert fp.read() == data
+
+    with decode_base64_to_file(" QUJD\nRA=\n=") as fp:
+        assert fp.read() == b"ABCD"
+
+
+def test_email_is_parsed_from_file() -> None:
+    raw = build_email("First line\r\nSecond line\r\n").replace(b"\n", b"\r\n")
+
+    parsed = EmlParser(include_raw_body=True).decode_email_binary_file(io.BytesIO(raw))
+
+    assert parsed == EmlParser(include_raw_body=True).decode_email_bytes(raw)
@@ -15,6 +15,7 @@
 from __future__ import annotations
 
 import json
+import os
 import re
 
 import whois_alt
@@ -30,8 +31,17 @@ from soar_sdk.SiemplifyUtils import (
 from tldextract import extract
 
 from ..core.IpLocation import DbIpCity
+from ..core.LookupCache import (
+    DEFAULT_CACHE_MAX_AGE,
+    DEFAULT_MAX_WORKERS,
+    LookupCache,
+    lookup_all,
+)
 
 EXTEND_GRAPH_URL = "{}/external/v1/investigator/ExtendCaseGraph"
+CACHE_FILE = "whois_cache.json"
+IP_KEY_PREFIX = "ip:"
+DOMAIN_KEY_PREFIX = "domain:"
 
 from datetime import date, datetime
 
@@ -71,6 +81,32 @@ def json_serial(obj):
     raise TypeError(f"Type {type(obj)} not serializable")
 
 
+def lookup_ip(ip_address):
+    """Get the RDAP and geo location data of an IP address.
+    :param ip_address: {str} the IP address
+    :return: {dict} the JSON serializable data
+    """
+    ip_whois = IPWhois(ip_address).lookup_rdap(depth=1)
+    response = DbIpCity.get(ip_address, api_key="free")
+    ip_whois["geo_lookup"] = json.loads(response.to_json())
+    return json.loads(json.dumps(ip_whois, default=json_serial))
+
+
+def lookup_domain(domain):
+    """Get the WHOIS data of a registered domain.
+    :param domain: {str} the registered domain
+    :return: {dict} the JSON serializable data
+    """
+    return json.loads(json.dumps(whois_alt.get_whois(domain), default=json_serial))
+
+
+def lookup(key):
+    if key.startswith(IP_KEY_PREFIX):
+        return lookup_ip(key[len(IP_KEY_PREFIX) :])
+
+    return lookup_domain(key[len(DOMAIN_KEY_PREFIX) :])
+
+
 @output_handler
 def main():
     siemplify = SiemplifyAction()
@@ -91,54 +127,72 @@ def main():
         default_value=0,
         input_type=int,
     )
+    max_workers = siemplify.extract_action_param(
+        "Max Concurrent Lookups",
+        print_value=True,
+        default_value=DEFAULT_MAX_WORKERS,
+        input_type=int,
+    )
+    cache_max_age = siemplify.extract_action_param(
+        "Cache Max Age (Seconds)",
+        print_value=True,
+        default_value=DEFAULT_CACHE_MAX_AGE,
+        input_type=int,
+    )
     json_result = {}
     updated_entities = []
     enriched_entities = {}
+
+    # Every IP address and registered domain is looked up once, concurrently
+    lookup_keys = {}
+    for entity in siemplify.target_entities:
+        if entity.entity_type == "ADDRESS":
+            lookup_keys[entity.identifier] = IP_KEY_PREFIX + entity.identifier
+        else:
+            domain = get_domain_from_string(entity.identifier)
+            if domain:
+                lookup_keys[entity.identifier] = DOMAIN_KEY_PREFIX + domain
+
+    cache = LookupCache(os.path.join(siemplify.run_folder, CACHE_FILE), cache_max_age)
+    lookups = lookup_all(lookup, lookup_keys.values(), cache, max_workers)
+    try:
+        cache.save()
+    except OSError as e:
+        siemplify.LOGGER.error(f"Failed to save the WHOIS cache: {e}")
+
     for entity in siemplify.target_entities:
         if entity.entity_type == "ADDRESS":
             try:
-                obj = IPWhois(entity.identifier)
-                obj.lookup_rdap(depth=1)
-                ip_whois = obj.lookup_rdap(depth=1)
-                response = DbIpCity.get(entity.identifier, api_key="free")
-                ip_whois["geo_lookup"] = json.loads(response.to_json())
+                ip_whois = lookups[lookup_keys[entity.identifier]].result()
                 json_result[entity.identifier] = ip_whois
                 enriched_entities[entity.identifier] = ip_whois
                 result_value = "true"
             except Exception as e:
                 print(e)
-        else:
+        elif entity.identifier in lookup_keys:
             try:
-                domain = get_domain_from_string(entity.identifier)
-                if domain:
-                    whois_data = whois_alt.get_whois(domain)
-                    if "creation_date" in whois_data:
-                        whois_data["age_in_days"] = int(
-                            (
-                                datetime.now() - whois_data["creation_date"][0]
-                            ).total_seconds()
-                            / 86400,
-                        )
-                    json_result[entity.identifier] = json.loads(
-                        json.dumps(whois_data, default=json_serial),
+                domain = lookup_keys[entity.identifier][len(DOMAIN_KEY_PREFIX) :]
+                whois_data = dict(lookups[lookup_keys[entity.identifier]].result())
+                if "creation_date" in whois_data:
+                    whois_data["age_in_days"] = int(
+                        (
+                            datetime.now()
+                            - datetime.fromisoformat(whois_data["creation_date"][0])
+                        ).total_seconds()
+                        / 86400,
                     )
-                    del whois_data["raw"]
-                    enriched_entities[entity.identifier] = json.loads(
-                        json.dumps(whois_data, default=json_serial),
+                json_result[entity.identifier] = whois_data
+                whois_data = {key: value for key, value in whois_data.items() if key != "raw"}
+                enriched_entities[entity.identifier] = whois_data
+                result_value = "true"
+                if create_entities and domain.upper() != entity.identifier:
+                    create_entity_with_relation(
+                        siemplify,
+                        domain,
+                        entity.identifier,
                     )
-                    result_value = "true"
-                    if create_entities and domain.upper() != entity.identifier:
-                        create_entity_with_relation(
-                            siemplify,
-                            domain,
-                            entity.identifier,
-                        )
-                        enriched_entities[domain] = json.loads(
-                            json.dumps(whois_data, default=json_serial),
-                        )
-                        json_result[domain] = json.loads(
-                            json.dumps(whois_data, default=json_serial),
-                        )
+                    enriched_entities[domain] = whois_data
+                    json_result[domain] = whois_data
 
             except whois_alt.shared.WhoisException:
                 pass
@@ -0,0 +1,131 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import collections
+import http.server
+import json
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+import requests
+
+from ...core.LookupCache import LookupCache, lookup_all
+
+if TYPE_CHECKING:
+    import pathlib
+    from collections.abc import Iterator
+
+RESPONSE_DELAY = 0.2
+
+
+class StubWhoisHandler(http.server.BaseHTTPRequestHandler):
+    requests_count: collections.Counter[str] = collections.Counter()
+
+    def do_GET(self) -> None:
+        StubWhoisHandler.requests_count[self.path] += 1
+        time.sleep(RESPONSE_DELAY)
+        if self.path.startswith("/missing"):
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        body = json.dumps({"query": self.path.strip("/")}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def stub_server_url() -> Iterator[str]:
+    StubWhoisHandler.requests_count.clear()
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubWhoisHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def stub_lookup(base_url: str):
+    def lookup(key: str) -> dict:
+        response = requests.get(f"{base_url}/{key}", timeout=5)
+        response.raise_for_status()
+        return response.json()
+
+    return lookup
+
+
+def test_lookup_all_runs_distinct_lookups_concurrently(stub_server_url: str) -> None:
+    keys = [f"domain{i % 10}.com" for i in range(100)]
+
+    start = time.monotonic()
+    results = lookup_all(stub_lookup(stub_server_url), keys, max_workers=10)
+    elapsed = time.monotonic() - start
+
+    assert list(results) == [f"domain{i}.com" for i in range(10)]
+    assert results["domain3.com"].result() == {"query": "domain3.com"}
+    assert sum(StubWhoisHandler.requests_count.values()) == 10
+    assert elapsed < 10 * RESPONSE_DELAY
+
+
+def test_lookup_all_keeps_failures_per_key(stub_server_url: str) -> None:
+    results = lookup_all(stub_lookup(stub_server_url), ["found.com", "missing.com"])
+
+    assert results["found.com"].result() == {"query": "found.com"}
+    with pytest.raises(requests.HTTPError):
+        results["missing.com"].result()
+
+
+def test_lookup_cache_is_shared_across_runs(stub_server_url: str, tmp_path: pathlib.Path) -> None:
+    cache_path = str(tmp_path / "cache.json")
+    lookup = stub_lookup(stub_server_url)
+
+    cache = LookupCache(cache_path, max_age=60)
+    lookup_all(lookup, ["a.com", "missing.com"], cache)
+    cache.save()
+
+    cache = LookupCache(cache_path, max_age=60)
+    results = lookup_all(lookup, ["a.com", "missing.com"], cache)
+
+    assert results["a.com"].result() == {"query": "a.com"}
+    assert StubWhoisHandler.requests_count == {"/a.com": 1, "/missing.com": 2}
+
+
+def test_lookup_cache_expires_results(tmp_path: pathlib.Path) -> None:
+    cache_path = str(tmp_path / "cache.json")
+    cache = LookupCache(cache_path, max_age=60)
+    cache.set("a.com", {"query": "a.com"})
+    cache.save()
+
+    assert "a.com" in LookupCache(cache_path, max_age=60)
+    assert "a.com" not in LookupCache(cache_path, max_age=0)
+
+    with open(cache_path, encoding="utf-8") as f:
+        entries = json.load(f)
+    entries["a.com"]["stored_at"] -= 120
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump(entries, f)
+
+    assert "a.com" not in LookupCache(cache_path, max_age=60)
@@ -49,7 +49,7 @@ def main():
         # Lock the file from other actions that may use it. if file
         with EntityFileManager(filepath, timeout) as efm:
             for entity in siemplify.target_entities:
-                if entity.identifier not in efm.entities:
+                if entity.identifier not in efm:
                     siemplify.LOGGER.info(f"Adding entity: {entity.identifier}")
                     efm.addEntity(entity.identifier)
                     output_message += f"Added Entity: {entity.identifier}\n"
@@ -14,13 +14,12 @@
 
 from __future__ import annotations
 
-import base64
-import hashlib
-
 from soar_sdk.ScriptResult import EXECUTION_STATE_COMPLETED, EXECUTION_STATE_FAILED
 from soar_sdk.SiemplifyAction import SiemplifyAction
 from soar_sdk.SiemplifyUtils import output_handler
 
+from ..core.FileHasher import hash_base64, map_in_threads
+
 SCRIPT_NAME = "Create Hash From Base64"
 
 
@@ -41,29 +40,23 @@ def main():
     try:
         if names:
             names = names.split(siemplify.parameters["Names Separator"])
+            # Strings without a matching name are skipped
+            strings = strings[: len(names)]
 
-            for s, n in zip(strings, names, strict=False):
-                d = {
-                    "Hash": getattr(hashlib, hash_algorythm)(
-                        base64.b64decode(s),
-                    ).hexdigest(),
-                    "HashAlgorythm": hash_algorythm,
-                }
-                if siemplify.parameters["Include Base64"].lower() == "true":
-                    d["Base64"] = s
-                d["Name"] = n
-                res.append(d)
-        else:
-            for s in strings:
-                d = {
-                    "Hash": getattr(hashlib, hash_algorythm)(
-                        base64.b64decode(s),
-                    ).hexdigest(),
-                    "HashAlgorythm": hash_algorythm,
-                }
-                if siemplify.parameters["Include Base64"].lower() == "true":
-                    d["Base64"] = s
-                res.append(d)
+        hashes = map_in_threads(
+            lambda data: hash_base64(data, (hash_algorythm,))[0][hash_algorythm],
+            strings,
+        )
+        for i, (s, hash_) in enumerate(zip(strings, hashes, strict=True)):
+            d = {
+                "Hash": hash_,
+                "HashAlgorythm": hash_algorythm,
+            }
+            if siemplify.parameters["Include Base64"].lower() == "true":
+                d["Base64"] = s
+            if names:
+                d["Name"] = names[i]
+            res.append(d)
         siemplify.result.add_json("Hashes", res)
         siemplify.result.add_result_json(res)
     except Exception as e:
@@ -16,26 +16,19 @@ from __future__ import annotations
 
 import os
 import pathlib
-import shutil
 
 from soar_sdk.ScriptResult import EXECUTION_STATE_COMPLETED, EXECUTION_STATE_FAILED
 from soar_sdk.SiemplifyAction import SiemplifyAction
 from soar_sdk.SiemplifyUtils import output_handler
 
-DEST_DIR = "/opt/siemplify/siemplify_server/Scripting/FileUtilities/Extract"
-
+from ..core.ArchiveExtractor import (
+    ArchiveExtractor,
+    ExtractionLimits,
+    build_file_tree,
+)
 
-def path_to_dict(path):
-    d = {"name": os.path.basename(path)}
-    filename, file_extension = os.path.splitext(path)
-    if os.path.isdir(path):
-        d["type"] = "directory"
-        d["children"] = [path_to_dict(os.path.join(path, x)) for x in os.listdir(path)]
-    else:
-        d["type"] = "file"
-        d["extension"] = file_extension
-        d["path"] = path
-    return d
+DEST_DIR = "/opt/siemplify/siemplify_server/Scripting/FileUtilities/Extract"
+BYTES_IN_MB = 1024 * 1024
 
 
 @output_handler
@@ -55,6 +48,37 @@ def main():
     result_value = (
         None  # Set a simple result value, used for playbook if\else and placeholders.
     )
+    # Limits are applied only when set, so archives that extracted before still do
+    max_total_size = siemplify.extract_action_param(
+        "Max Total Size (MB)",
+        input_type=int,
+        print_value=True,
+    )
+    limits = ExtractionLimits(
+        max_total_size=max_total_size * BYTES_IN_MB if max_total_size is not None else None,
+        max_members=siemplify.extract_action_param(
+            "Max Files",
+            input_type=int,
+            print_value=True,
+        ),
+        max_compression_ratio=siemplify.extract_action_param(
+            "Max Compression Ratio",
+            input_type=float,
+            print_value=True,
+        ),
+    )
+    include_data = (
+        str(
+            siemplify.extract_action_param(
+                "Include Data In JSON Result",
+                default_value="false",
+                print_value=True,
+            ),
+        ).lower()
+        == "true"
+    )
+    extractor = ArchiveExtractor(limits=limits, include_raw=include_data)
+
     json_result = {}
     success_files = []
     failed_files = []
@@ -76,26 +100,20 @@ def main():
                 failed_files.append(archive)
                 raise
         try:
-            files = shutil.unpack_archive(archive, output_dir)
-            files = path_to_dict(output_dir)
+            members = extractor.extract(archive, output_dir)
             files_w_path = [
-                os.path.join(output_dir, f)
-                for f in os.listdir(output_dir)
-                if os.path.isfile(os.path.join(output_dir, f))
-            ]
-            onlyfiles = [
-                f
-                for f in os.listdir(output_dir)
-                if os.path.isfile(os.path.join(output_dir, f))
+                m.path for m in members if len(pathlib.PurePosixPath(m.filename).parts) == 1
             ]
+            onlyfiles = [os.path.basename(path) for path in files_w_path]
             json_result["archives"].append(
                 {
                     "success": True,
                     "archive": full_archive_name,
                     "folder": output_dir,
-                    "files": files,
+                    "files": build_file_tree(output_dir, members),
                     "files_with_path": files_w_path,
                     "files_list": onlyfiles,
+                    "members": [m.to_json() for m in members],
                 },
             )
             output_message = f"\nSuccessfully extracted archive: {full_archive_name}"
@@ -105,7 +123,7 @@ def main():
             siemplify.LOGGER.exception(e)
             status = EXECUTION_STATE_FAILED
             result_value = "Failed"
-            output_message += "\n" + e
+            output_message += f"\n{e}"
             json_result["archives"].append(
                 {"success": False, "archive": full_archive_name},
             )
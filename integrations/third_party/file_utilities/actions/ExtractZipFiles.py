@@ -21,10 +21,12 @@ from soar_sdk.ScriptResult import EXECUTION_STATE_COMPLETED
 from soar_sdk.SiemplifyAction import SiemplifyAction
 from soar_sdk.SiemplifyUtils import convert_dict_to_json_result_dict, output_handler
 
+from ..core.ArchiveExtractor import ExtractionLimits
 from ..core.AttachmentsManager import AttachmentsManager
 
 INTEGRATION_NAME = "FileUtilities"
 ACTION_NAME = "Extract Zip Files"
+BYTES_IN_MB = 1024 * 1024
 
 
 @output_handler
@@ -51,6 +53,25 @@ def main():
         siemplify.extract_action_param("Add to Case Wall", print_value=True).lower()
         == "true"
     )
+    # Limits are applied only when set, so archives that extracted before still do
+    max_total_size = siemplify.extract_action_param(
+        "Max Total Size (MB)",
+        input_type=int,
+        print_value=True,
+    )
+    limits = ExtractionLimits(
+        max_total_size=max_total_size * BYTES_IN_MB if max_total_size is not None else None,
+        max_members=siemplify.extract_action_param(
+            "Max Files",
+            input_type=int,
+            print_value=True,
+        ),
+        max_compression_ratio=siemplify.extract_action_param(
+            "Max Compression Ratio",
+            input_type=float,
+            print_value=True,
+        ),
+    )
     # zip_password = siemplify.extract_action_param("Zip File Password", print_value=True)
     # zip_password_delimiter = siemplify.extract_action_param("Zip Password List Delimiter", print_value=True)
 
@@ -97,6 +118,8 @@ def main():
                     zip_file_content,
                     bruteforce=bruteforce_password,
                     pwds=zip_passwords,
+                    include_raw=include_data or add_to_case_wall,
+                    limits=limits,
                 )
                 result_value = "true"
 
@@ -118,7 +141,7 @@ def main():
         for file_name in extracted_files:
             x_files = extracted_files[file_name]
             for x_file in extracted_files[file_name]:
-                del x_file["raw"]
+                x_file.pop("raw", None)
 
     if create_entities:
         for file_name in extracted_files:
@@ -14,7 +14,6 @@
 
 from __future__ import annotations
 
-import base64
 import json
 import os
 
@@ -22,6 +21,8 @@ from soar_sdk.ScriptResult import EXECUTION_STATE_COMPLETED, EXECUTION_STATE_FAI
 from soar_sdk.SiemplifyAction import SiemplifyAction
 from soar_sdk.SiemplifyUtils import output_handler
 
+from ..core.FileHasher import encode_file_base64
+
 INTEGRATION_NAME = "FileUtilities"
 SCRIPT_NAME = "Get Files as Base64"
 LOCAL_FOLDER = "downloads"
@@ -75,8 +76,7 @@ def main():
             file_data["path"] = head_tail[0]
             file_data["filename"] = head_tail[1]
             file_data["extension"] = file_extension
-            with open(file_location, "rb") as f:
-                file_data["base64"] = base64.b64encode(f.read()).decode("utf-8")
+            file_data["base64"] = encode_file_base64(file_location)
             json_result["data"].append(file_data)
             json_result["filenames"].append(file_location)
             file_paths.append(head_tail[1])
@@ -49,7 +49,7 @@ def main():
         # Lock the file from other actions that may use it. if file
         with EntityFileManager(filepath, timeout) as efm:
             for entity in siemplify.target_entities:
-                if entity.identifier in efm.entities:
+                if entity.identifier in efm:
                     siemplify.LOGGER.info(f"Removing entity: {entity.identifier}")
                     efm.removeEntity(entity.identifier)
                     output_message += f"Removed Entity: {entity.identifier}\n"
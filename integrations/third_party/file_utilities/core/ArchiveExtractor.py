@@ -0,0 +1,372 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import base64
+import dataclasses
+import os
+import pathlib
+import tarfile
+import zipfile
+from typing import IO, TYPE_CHECKING, Any
+
+import magic
+
+from .FileHasher import CHUNK_SIZE, DEFAULT_HASH_ALGORITHMS, MultiHasher
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+DEFAULT_MAX_TOTAL_SIZE = 1024 * 1024 * 1024
+DEFAULT_MAX_MEMBERS = 10_000
+DEFAULT_MAX_COMPRESSION_RATIO = 100
+
+
+class ArchiveLimitExceededError(Exception):
+    """Raised when an archive exceeds one of the configured extraction limits."""
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class ExtractionLimits:
+    """Limits applied while extracting an archive.
+
+    Attributes:
+        max_total_size: Maximal number of uncompressed bytes in all members.
+        max_members: Maximal number of file members.
+        max_compression_ratio: Maximal ratio between uncompressed and compressed size,
+            checked per zip member and for the archive as a whole.
+
+    A limit of None is not applied.
+    """
+
+    max_total_size: int | None = DEFAULT_MAX_TOTAL_SIZE
+    max_members: int | None = DEFAULT_MAX_MEMBERS
+    max_compression_ratio: float | None = DEFAULT_MAX_COMPRESSION_RATIO
+
+
+NO_LIMITS = ExtractionLimits(max_total_size=None, max_members=None, max_compression_ratio=None)
+
+
+@dataclasses.dataclass(slots=True)
+class ExtractedMember:
+    """A single extracted archive member."""
+
+    filename: str
+    size: int
+    hash: dict[str, str]
+    mime_type: str | None
+    mime_type_short: str | None
+    path: str | None = None
+    raw: bytes | None = None
+
+    @property
+    def extension(self) -> str:
+        return os.path.splitext(self.filename)[1][1:]
+
+    def to_json(self) -> dict[str, Any]:
+        """Build the attachment JSON that `AttachmentsManager.attachment` returns.
+
+        Returns:
+            The member as a JSON serializable dict. The "raw" key is present only if
+            the member's content was kept.
+
+        """
+        attachment_json = {
+            "filename": self.filename,
+            "size": self.size,
+            "extension": self.extension,
+            "hash": self.hash,
+            "mime_type": self.mime_type,
+            "mime_type_short": self.mime_type_short,
+        }
+        if self.path is not None:
+            attachment_json["path"] = self.path
+
+        if self.raw is not None:
+            attachment_json["raw"] = base64.b64encode(self.raw).decode()
+
+        return attachment_json
+
+
+class ArchiveExtractor:
+    """Extract archives member by member, without loading whole members to memory.
+
+    Every member is read once in chunks. The same chunks are used to update all
+    requested digests, detect the MIME type, write the member to disk and - only if
+    requested - keep its raw content.
+    """
+
+    def __init__(
+        self,
+        limits: ExtractionLimits | None = None,
+        hash_algorithms: Iterable[str] = DEFAULT_HASH_ALGORITHMS,
+        include_raw: bool = False,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> None:
+        self.limits = limits or ExtractionLimits()
+        self.hash_algorithms = tuple(hash_algorithms)
+        self.include_raw = include_raw
+        self.chunk_size = chunk_size
+        self._total_size = 0
+        self._members_count = 0
+        self._archive_size = 0
+
+    def iter_zip(
+        self,
+        archive: zipfile.ZipFile,
+        output_dir: str | None = None,
+        pwd: bytes | None = None,
+        archive_size: int | None = None,
+    ) -> Iterator[ExtractedMember]:
+        """Stream the file members of an open zip archive.
+
+        Args:
+            archive: An open zip archive.
+            output_dir: If provided, members are written under this directory.
+            pwd: The password of an encrypted archive.
+            archive_size: The compressed size of the whole archive, if known.
+
+        Yields:
+            An ExtractedMember for every file member of the archive.
+
+        """
+        self._start(
+            archive_size
+            if archive_size is not None
+            else sum(info.compress_size for info in archive.infolist())
+        )
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+
+            self._check_member_header(info.filename, info.file_size, info.compress_size)
+            with archive.open(info, pwd=pwd) as member:
+                yield self._read_member(info.filename, member, output_dir, info.compress_size)
+
+    def iter_tar(
+        self,
+        archive: tarfile.TarFile,
+        output_dir: str | None = None,
+        archive_size: int | None = None,
+    ) -> Iterator[ExtractedMember]:
+        """Stream the regular file members of an open tar archive.
+
+        Links and special files are skipped, so they cannot point outside
+        `output_dir`.
+
+        Args:
+            archive: An open tar archive, opened for reading.
+            output_dir: If provided, members are written under this directory.
+            archive_size: The compressed size of the whole archive, if known.
+
+        Yields:
+            An ExtractedMember for every regular file in the archive.
+
+        """
+        self._start(archive_size or 0)
+        for info in archive:
+            if not info.isfile():
+                continue
+
+            self._check_member_header(info.name, info.size, None)
+            member = archive.extractfile(info)
+            if member is None:
+                continue
+
+            with member:
+                yield self._read_member(info.name, member, output_dir, None)
+
+    def extract(self, archive_path: str, output_dir: str) -> list[ExtractedMember]:
+        """Extract a zip or tar (optionally gz, bz2 or xz compressed) archive.
+
+        Args:
+            archive_path: The path of the archive to extract.
+            output_dir: The directory to extract the archive into.
+
+        Returns:
+            The extracted file members, in archive order.
+
+        Raises:
+            ArchiveLimitExceededError: If the archive exceeds one of the limits.
+            ValueError: If the archive format is not supported.
+
+        """
+        archive_size = os.path.getsize(archive_path)
+        if zipfile.is_zipfile(archive_path):
+            with zipfile.ZipFile(archive_path) as archive:
+                return list(self.iter_zip(archive, output_dir, archive_size=archive_size))
+
+        if tarfile.is_tarfile(archive_path):
+            with tarfile.open(archive_path, mode="r:*") as archive:
+                return list(self.iter_tar(archive, output_dir, archive_size=archive_size))
+
+        raise ValueError(f"Unsupported archive format: {archive_path}")
+
+    def _start(self, archive_size: int) -> None:
+        self._total_size = 0
+        self._members_count = 0
+        self._archive_size = archive_size
+
+    def _check_member_header(
+        self,
+        name: str,
+        declared_size: int,
+        compressed_size: int | None,
+    ) -> None:
+        self._members_count += 1
+        max_members = self.limits.max_members
+        if max_members is not None and self._members_count > max_members:
+            raise ArchiveLimitExceededError(f"Archive has more than {max_members} members")
+
+        max_size = self.limits.max_total_size
+        if max_size is not None and self._total_size + declared_size > max_size:
+            raise ArchiveLimitExceededError(
+                f"Extracting {name} exceeds the total size limit of {max_size} bytes",
+            )
+
+        max_ratio = self.limits.max_compression_ratio
+        if (
+            max_ratio is not None
+            and compressed_size
+            and declared_size / compressed_size > max_ratio
+        ):
+            raise ArchiveLimitExceededError(
+                f"Member {name} exceeds the compression ratio limit of {max_ratio}",
+            )
+
+    def _check_streamed_size(self, name: str, size: int, compressed_size: int | None) -> None:
+        # Sizes declared in archive headers can't be trusted, so the limits are
+        # enforced again on the bytes actually read.
+        max_size = self.limits.max_total_size
+        if max_size is not None and self._total_size > max_size:
+            raise ArchiveLimitExceededError(
+                f"Extracting {name} exceeds the total size limit of {max_size} bytes",
+            )
+
+        max_ratio = self.limits.max_compression_ratio
+        if max_ratio is None:
+            return
+
+        if compressed_size and size > compressed_size * max_ratio:
+            raise ArchiveLimitExceededError(
+                f"Member {name} exceeds the compression ratio limit of {max_ratio}",
+            )
+
+        if self._archive_size and self._total_size > self._archive_size * max_ratio:
+            raise ArchiveLimitExceededError(
+                f"Archive exceeds the compression ratio limit of {max_ratio}",
+            )
+
+    def _read_member(
+        self,
+        name: str,
+        member: IO[bytes],
+        output_dir: str | None,
+        compressed_size: int | None,
+    ) -> ExtractedMember:
+        hasher = MultiHasher(self.hash_algorithms)
+        raw_chunks = [] if self.include_raw else None
+        target_path = _safe_target_path(output_dir, name) if output_dir else None
+        out = None
+        if target_path is not None:
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            out = open(target_path, "wb")
+
+        size = 0
+        mime_type = mime_type_short = None
+        try:
+            while chunk := member.read(self.chunk_size):
+                if size == 0:
+                    mime_type, mime_type_short = _get_mime_type(chunk)
+
+                size += len(chunk)
+                self._total_size += len(chunk)
+                self._check_streamed_size(name, size, compressed_size)
+                hasher.update(chunk)
+
+                if out is not None:
+                    out.write(chunk)
+
+                if raw_chunks is not None:
+                    raw_chunks.append(chunk)
+
+        finally:
+            if out is not None:
+                out.close()
+
+        if size == 0:
+            mime_type, mime_type_short = _get_mime_type(b"")
+
+        return ExtractedMember(
+            filename=name,
+            size=size,
+            hash=hasher.hexdigests(),
+            mime_type=mime_type,
+            mime_type_short=mime_type_short,
+            path=str(target_path) if target_path is not None else None,
+            raw=b"".join(raw_chunks) if raw_chunks is not None else None,
+        )
+
+
+def build_file_tree(output_dir: str, members: Iterable[ExtractedMember]) -> dict[str, Any]:
+    """Build the nested directory tree of extracted members.
+
+    Args:
+        output_dir: The directory the members were extracted into.
+        members: The extracted members.
+
+    Returns:
+        A tree of {"name", "type", "children"} directory nodes and
+        {"name", "type", "extension", "path"} file nodes.
+
+    """
+    root = {"name": os.path.basename(output_dir), "type": "directory", "children": []}
+    directories = {(): root}
+    for member in members:
+        parts = tuple(pathlib.PurePosixPath(member.filename).parts)
+        parent = root
+        for i in range(1, len(parts)):
+            directory = directories.get(parts[:i])
+            if directory is None:
+                directory = {"name": parts[i - 1], "type": "directory", "children": []}
+                directories[parts[:i]] = directory
+                parent["children"].append(directory)
+
+            parent = directory
+
+        parent["children"].append(
+            {
+                "name": parts[-1],
+                "type": "file",
+                "extension": os.path.splitext(parts[-1])[1],
+                "path": member.path,
+            },
+        )
+
+    return root
+
+
+def _safe_target_path(output_dir: str, name: str) -> pathlib.Path:
+    root = pathlib.Path(output_dir).resolve()
+    target = (root / name.lstrip("/\\")).resolve()
+    if not target.is_relative_to(root):
+        raise ArchiveLimitExceededError(f"Member {name} points outside of {output_dir}")
+
+    return target
+
+
+def _get_mime_type(data: bytes) -> tuple[str, str]:
+    detected = magic.detect_from_content(data)
+    return detected.name, detected.mime_type
@@ -15,8 +15,6 @@
 from __future__ import annotations
 
 import base64
-import hashlib
-import io
 import os
 import re
 import time
@@ -26,6 +24,10 @@ import magic
 from soar_sdk.SiemplifyDataModel import Attachment
 from soar_sdk.SiemplifyUtils import dict_to_flat
 
+from .ArchiveExtractor import NO_LIMITS, ArchiveExtractor
+from .FileHasher import hash_bytes
+from .ZipPasswordFinder import ZipPasswordCache, find_zip_password, is_encrypted
+
 ORIG_EMAIL_DESCRIPTION = "This is the original message as EML"
 EXTEND_GRAPH_URL = "{}/external/v1/investigator/ExtendCaseGraph"
 CASE_DETAILS_URL = "/external/v1/cases/GetCaseFullDetails/"
@@ -228,61 +230,46 @@ class AttachmentsManager:
         )
         created_entity.raise_for_status()
 
-    def extract_zip(self, zip_filename, content, bruteforce=False, pwds=None):
+    def extract_zip(
+        self,
+        zip_filename,
+        content,
+        bruteforce=False,
+        pwds=None,
+        include_raw=True,
+        limits=None,
+    ):
+        extractor = ArchiveExtractor(limits=limits or NO_LIMITS, include_raw=include_raw)
         with zipfile.ZipFile(content) as attach_zip:
-            extracted_files = []
-            try:
-                for name in attach_zip.namelist():
-                    extracted_file = self.attachment(name, attach_zip.read(name))
-                    extracted_file["parent_file"] = zip_filename
-                    extracted_files.append(extracted_file)
-                return extracted_files
-            except:
-                pass
-            pwd = None
+            if not is_encrypted(attach_zip):
+                return self._extract_zip_members(zip_filename, attach_zip, extractor)
+
+            password_cache = ZipPasswordCache(self.siemplify.run_folder)
+            candidates = list(pwds or [])
+            candidates.extend(password_cache.load())
             if bruteforce:
                 from wordlist import wordlist
 
-                for line in io.StringIO(wordlist.WORDLIST).readlines():
-                    password = line.strip("\n")
-                    try:
-                        attach_zip.setpassword(password.encode())
-                        for name in attach_zip.namelist():
-                            _file = attach_zip.read(name)
-                            pwd = password
-                            self.logger.info(f"Password found {pwd}")
-                            break
-                        break
-                    except:
-                        pass
+                candidates.extend(wordlist.WORDLIST.splitlines())
 
-            if pwds and pwd == None:
-                try:
-                    found = 0
-                    for passwd in pwds:
-                        try:
-                            attach_zip.setpassword(passwd.encode())
-                            for name in attach_zip.namelist():
-                                _file = attach_zip.read(name)
-                                pwd = passwd
-                                self.logger.info(f"Password found {pwd}")
-                                found = 1
-                                break
-                            if found == 1:
-                                break
-                        except Exception:
-                            pass
-                except:
-                    raise
+            pwd = find_zip_password(attach_zip, candidates)
+            if pwd is None:
+                raise RuntimeError(f"Could not find the password of {zip_filename}")
 
-            try:
-                for name in attach_zip.namelist():
-                    extracted_file = self.attachment(name, attach_zip.read(name))
-                    extracted_file["parent_file"] = zip_filename
-                    extracted_files.append(extracted_file)
-                return extracted_files
-            except RuntimeError:
-                raise
+            self.logger.info(f"Password found {pwd}")
+            password_cache.add(pwd)
+            attach_zip.setpassword(pwd.encode())
+            return self._extract_zip_members(zip_filename, attach_zip, extractor)
+
+    @staticmethod
+    def _extract_zip_members(zip_filename, attach_zip, extractor):
+        extracted_files = []
+        for member in extractor.iter_zip(attach_zip):
+            extracted_file = member.to_json()
+            extracted_file["parent_file"] = zip_filename
+            extracted_files.append(extracted_file)
+
+        return extracted_files
 
     @staticmethod
     def get_file_hash(data: bytes) -> dict[str, str]:
@@ -296,16 +283,7 @@ class AttachmentsManager:
           dict: Returns a dict with as key the hash-type and value the calculated hash.
 
         """
-        hashalgo = ["md5", "sha1", "sha256", "sha512"]
-        hash_ = {}
-
-        for k in hashalgo:
-            ha = getattr(hashlib, k)
-            h = ha()
-            h.update(data)
-            hash_[k] = h.hexdigest()
-
-        return hash_
+        return hash_bytes(data)
 
     @staticmethod
     def get_mime_type(
@@ -334,12 +312,7 @@ class AttachmentsManager:
             "filename": filename,
             "size": len(content),
             "extension": os.path.splitext(filename)[1][1:],
-            "hash": {
-                "md5": hashlib.md5(content).hexdigest(),
-                "sha1": hashlib.sha1(content).hexdigest(),
-                "sha256": hashlib.sha256(content).hexdigest(),
-                "sha512": hashlib.sha512(content).hexdigest(),
-            },
+            "hash": hash_bytes(content),
             "mime_type": mime_type,
             "mime_type_short": mime_type_short,
             "raw": base64.b64encode(content).decode(),
@@ -0,0 +1,219 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Single pass hashing and base64 encoding of files and blobs.
+
+Data is read once, in chunks, and every chunk updates all the requested digests
+while it is still in the CPU cache.
+"""
+
+from __future__ import annotations
+
+import base64
+import concurrent.futures
+import hashlib
+import re
+from typing import IO, TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_HASH_ALGORITHMS = ("md5", "sha1", "sha256", "sha512")
+# Multiples of 3 bytes and 4 characters, so chunks encode and decode independently
+BASE64_ENCODE_CHUNK_SIZE = 3 * 256 * 1024
+BASE64_DECODE_CHUNK_SIZE = 4 * 256 * 1024
+
+_NON_BASE64_CHARS = re.compile(r"[^A-Za-z0-9+/=]")
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MultiHasher:
+    """Update several digests from the same chunks."""
+
+    def __init__(self, algorithms: Iterable[str] = DEFAULT_HASH_ALGORITHMS) -> None:
+        self.algorithms = tuple(algorithms)
+        self._hashers = [hashlib.new(algorithm) for algorithm in self.algorithms]
+        self.size = 0
+
+    def update(self, chunk: bytes | memoryview) -> None:
+        self.size += len(chunk)
+        for hasher in self._hashers:
+            hasher.update(chunk)
+
+    def hexdigests(self) -> dict[str, str]:
+        """Get the digests of all the data so far.
+
+        Returns:
+            A mapping of algorithm names to hex digests, in the requested order.
+
+        """
+        return {
+            algorithm: hasher.hexdigest()
+            for algorithm, hasher in zip(self.algorithms, self._hashers, strict=True)
+        }
+
+
+def hash_bytes(
+    data: bytes,
+    algorithms: Iterable[str] = DEFAULT_HASH_ALGORITHMS,
+    chunk_size: int = CHUNK_SIZE,
+) -> dict[str, str]:
+    """Hash in-memory data with several algorithms in a single pass.
+
+    Returns:
+        A mapping of algorithm names to hex digests.
+
+    """
+    hasher = MultiHasher(algorithms)
+    view = memoryview(data)
+    for i in range(0, len(view), chunk_size):
+        hasher.update(view[i : i + chunk_size])
+
+    return hasher.hexdigests()
+
+
+def hash_stream(
+    stream: IO[bytes],
+    algorithms: Iterable[str] = DEFAULT_HASH_ALGORITHMS,
+    chunk_size: int = CHUNK_SIZE,
+) -> tuple[dict[str, str], int]:
+    """Hash a binary stream with several algorithms in a single pass.
+
+    Returns:
+        A tuple of the algorithm names to hex digests mapping, and the stream size.
+
+    """
+    hasher = MultiHasher(algorithms)
+    while chunk := stream.read(chunk_size):
+        hasher.update(chunk)
+
+    return hasher.hexdigests(), hasher.size
+
+
+def hash_file(
+    path: str,
+    algorithms: Iterable[str] = DEFAULT_HASH_ALGORITHMS,
+    chunk_size: int = CHUNK_SIZE,
+) -> tuple[dict[str, str], int]:
+    """Hash a file with several algorithms in a single pass.
+
+    Returns:
+        A tuple of the algorithm names to hex digests mapping, and the file size.
+
+    """
+    with open(path, "rb") as f:
+        return hash_stream(f, algorithms, chunk_size)
+
+
+def iter_base64_decode(data: str, chunk_size: int = BASE64_DECODE_CHUNK_SIZE) -> Iterator[bytes]:
+    """Decode a base64 string in chunks.
+
+    Characters outside the base64 alphabet are discarded, as `base64.b64decode` does.
+    The chunk size is rounded down to a multiple of 4 characters.
+
+    Yields:
+        The decoded data, chunk by chunk.
+
+    Raises:
+        binascii.Error: If the data is incorrectly padded.
+
+    """
+    data = _NON_BASE64_CHARS.sub("", data)
+    chunk_size = max(4, chunk_size - chunk_size % 4)
+    for i in range(0, len(data), chunk_size):
+        yield base64.b64decode(data[i : i + chunk_size])
+
+
+def hash_base64(
+    data: str,
+    algorithms: Iterable[str] = DEFAULT_HASH_ALGORITHMS,
+) -> tuple[dict[str, str], int]:
+    """Hash base64 encoded data without decoding all of it to memory.
+
+    Returns:
+        A tuple of the algorithm names to hex digests mapping, and the decoded size.
+
+    """
+    hasher = MultiHasher(algorithms)
+    for chunk in iter_base64_decode(data):
+        hasher.update(chunk)
+
+    return hasher.hexdigests(), hasher.size
+
+
+def iter_base64_encode(
+    stream: IO[bytes],
+    chunk_size: int = BASE64_ENCODE_CHUNK_SIZE,
+) -> Iterator[str]:
+    """Encode a binary stream to base64 in chunks.
+
+    The chunk size is rounded down to a multiple of 3 bytes, so only the last chunk
+    is padded.
+
+    Yields:
+        The base64 encoded data, chunk by chunk. The chunks join to the same string
+        `base64.b64encode` returns for the whole stream.
+
+    """
+    chunk_size = max(3, chunk_size - chunk_size % 3)
+    while chunk := _read_exactly(stream, chunk_size):
+        yield base64.b64encode(chunk).decode("ascii")
+
+
+def _read_exactly(stream: IO[bytes], size: int) -> bytes:
+    # Raw streams may return less than requested before the end of the stream
+    data = stream.read(size)
+    while data and len(data) < size and (more := stream.read(size - len(data))):
+        data += more
+
+    return data
+
+
+def encode_file_base64(path: str, chunk_size: int = BASE64_ENCODE_CHUNK_SIZE) -> str:
+    """Encode a file to base64, reading it in chunks.
+
+    The encoded string is still built in memory as a whole, so this saves only the
+    copy of the raw content.
+
+    Returns:
+        The base64 encoded content of the file.
+
+    """
+    with open(path, "rb") as f:
+        return "".join(iter_base64_encode(f, chunk_size))
+
+
+def map_in_threads(
+    function: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int | None = None,
+) -> list[R]:
+    """Apply a function to items in worker threads.
+
+    hashlib releases the GIL while hashing, so hashing several files or blobs in
+    threads runs in parallel.
+
+    Returns:
+        The results, in the order of the items.
+
+    """
+    items = list(items)
+    if max_workers == 1 or len(items) < 2:
+        return [function(item) for item in items]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(function, items))
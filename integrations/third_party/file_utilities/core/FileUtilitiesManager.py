@@ -14,6 +14,8 @@
 
 from __future__ import annotations
 
+import os
+
 from filelock import FileLock
 
 
@@ -35,7 +37,11 @@ class EntityFileManager:
             self.lock = FileLock(self.lockpath, timeout=self.timeout)
         else:
             self.lock = FileLock(self.lockpath)
-        self.entities = []
+        # A dict is used as an insertion ordered set of the entity identifiers
+        self._entities = {}
+        self._added = []
+        self._removed = False
+        self._needs_compaction = False
 
     def __enter__(self):
         """This function is executed with a "with" statement. It will acquire the lock, and block other processes from
@@ -44,18 +50,55 @@ class EntityFileManager:
         :return:
         """
         self.lock.acquire()
-        self.entities = self.readFile()
+        try:
+            lines = self.readFile()
+        except BaseException:
+            self.lock.release()
+            raise
+
+        self._entities = dict.fromkeys(line for line in lines if line)
+        self._added = []
+        self._removed = False
+        # Duplicate or blank lines are dropped the next time the file is written
+        self._needs_compaction = len(self._entities) != len(lines)
         return self
 
     def __exit__(self, typ, value, traceback):
         """This function is executed in the end of the "with" statement. It will write the changed to the file and release
-        the lock. All parameters are built-ins of python and are not required.
+        the lock. The file is written only if entities were added or removed. Additions are appended
+        to the file, and it's rewritten only after removals. All parameters are built-ins of python
+        and are not required.
         :param typ: Ignore.
         :param value: Ignore.
         :param traceback: Ignore.
         """
-        self.writeFile()
-        self.lock.release()
+        try:
+            if self._removed or (self._added and self._needs_compaction):
+                self.writeFile()
+            elif self._added:
+                self.appendToFile(self._added)
+        finally:
+            self.lock.release()
+
+    def __contains__(self, entity):
+        return entity in self._entities
+
+    def __len__(self):
+        return len(self._entities)
+
+    @property
+    def entities(self):
+        """The entity identifiers in the file, in file order.
+        :return: A set-like view of the entity identifiers
+        """
+        return self._entities.keys()
+
+    @property
+    def is_dirty(self):
+        """Whether entities were added or removed since the file was read.
+        :return: True if the file has to be written, else False
+        """
+        return self._removed or bool(self._added)
 
     def readFile(self):
         """Helper function to read all entities from the file.
@@ -69,25 +112,54 @@ class EntityFileManager:
             return []
 
     def writeFile(self):
-        """Helper function to write the entities list to the file"""
-        with open(self.filepath, "w") as f:
-            f.write("\n".join(self.entities))
+        """Helper function to write the entities list to the file.
+        The file is replaced atomically, so readers that don't lock it never see a partial file.
+        """
+        tmp_path = self.filepath + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(self._entities))
+        os.replace(tmp_path, self.filepath)
+
+        self._added = []
+        self._removed = False
+        self._needs_compaction = False
+
+    def appendToFile(self, entities):
+        """Helper function to append entities to the end of the file, without rewriting it.
+        :param entities: List of entity identifiers
+        """
+        with open(self.filepath, "a+b") as f:
+            separator = b""
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) not in (b"\n", b"\r"):
+                    separator = b"\n"
+            f.write(separator + "\n".join(entities).encode())
+
+        self._added = []
 
     def addEntity(self, entity):
-        """Add elements to self.entities list
+        """Add an entity to the file, if it's not already in it
         :param entity: Entity identifier
         :return: True
         """
-        self.entities.append(entity)
+        if entity not in self._entities:
+            self._entities[entity] = None
+            self._added.append(entity)
         return True
 
     def removeEntity(self, entity):
-        """Remove elements from self.entities list
+        """Remove an entity from the file
         :param entity: Entity identifier
         :return: True
         """
         try:
-            self.entities.remove(entity)
-            return True
+            del self._entities[entity]
         except KeyError:
             raise EntityFileManagerException("Entity not found in file")
+
+        if entity in self._added:
+            self._added.remove(entity)
+        else:
+            self._removed = True
+        return True
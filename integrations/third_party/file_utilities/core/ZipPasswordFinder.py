@@ -0,0 +1,262 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Password recovery for zip files encrypted with the traditional PKWARE cipher.
+
+Every encrypted member starts with a 12 bytes encryption header. Decrypting it with
+the right password yields a known check byte, so wrong candidates are rejected by
+decrypting 12 bytes instead of decompressing the member. Candidates that pass the
+header check of every member are confirmed by a full, CRC checked read.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import json
+import os
+import struct
+import zipfile
+import zlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+ENCRYPTED_FLAG = 0x1
+DATA_DESCRIPTOR_FLAG = 0x8
+WINZIP_AES_COMPRESS_TYPE = 99
+ENCRYPTION_HEADER_LENGTH = 12
+LOCAL_FILE_HEADER_FORMAT = "<4s2B4HL2L2H"
+LOCAL_FILE_HEADER_SIZE = struct.calcsize(LOCAL_FILE_HEADER_FORMAT)
+
+PARALLEL_THRESHOLD = 20_000
+CANDIDATES_CHUNK_SIZE = 5_000
+PASSWORD_CACHE_FILE_NAME = "zip_passwords_cache.json"
+PASSWORD_CACHE_MAX_SIZE = 1_000
+
+
+def _build_crc_table() -> tuple[int, ...]:
+    table = []
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xEDB88320 if crc & 1 else crc >> 1
+        table.append(crc)
+
+    return tuple(table)
+
+
+CRC_TABLE = _build_crc_table()
+
+EncryptionHeader = tuple[bytes, int]
+
+
+def is_encrypted(archive: zipfile.ZipFile) -> bool:
+    """Check whether any member of a zip archive is encrypted.
+
+    Returns:
+        True if at least one file member is encrypted, else False.
+
+    """
+    return any(info.flag_bits & ENCRYPTED_FLAG for info in archive.infolist() if not info.is_dir())
+
+
+def read_encryption_headers(archive: zipfile.ZipFile) -> list[EncryptionHeader]:
+    """Read the encryption header and expected check byte of every encrypted member.
+
+    Args:
+        archive: An open zip archive.
+
+    Returns:
+        A list of (encryption header, check byte) tuples. The list is empty if the
+        archive uses an encryption the check does not support (e.g. WinZip AES).
+
+    """
+    headers = []
+    for info in archive.infolist():
+        if info.is_dir() or not info.flag_bits & ENCRYPTED_FLAG:
+            continue
+
+        if info.compress_type == WINZIP_AES_COMPRESS_TYPE:
+            return []
+
+        archive.fp.seek(info.header_offset)
+        fields = struct.unpack(LOCAL_FILE_HEADER_FORMAT, archive.fp.read(LOCAL_FILE_HEADER_SIZE))
+        flag_bits, mod_time, filename_length, extra_length = (
+            fields[3],
+            fields[5],
+            fields[10],
+            fields[11],
+        )
+        archive.fp.seek(filename_length + extra_length, os.SEEK_CUR)
+        header = archive.fp.read(ENCRYPTION_HEADER_LENGTH)
+        check_byte = (
+            (mod_time >> 8) & 0xFF if flag_bits & DATA_DESCRIPTOR_FLAG else (info.CRC >> 24) & 0xFF
+        )
+        headers.append((header, check_byte))
+
+    return headers
+
+
+def password_matches_headers(password: bytes, headers: Iterable[EncryptionHeader]) -> bool:
+    """Check a password against encryption headers without decompressing anything.
+
+    Returns:
+        True if decrypting every header with the password yields its check byte.
+
+    """
+    crc_table = CRC_TABLE
+    k0, k1, k2 = 305419896, 591751049, 878082192
+    for c in password:
+        k0 = (k0 >> 8) ^ crc_table[(k0 ^ c) & 0xFF]
+        k1 = ((k1 + (k0 & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+        k2 = (k2 >> 8) ^ crc_table[(k2 ^ (k1 >> 24)) & 0xFF]
+
+    for header, check_byte in headers:
+        h0, h1, h2 = k0, k1, k2
+        plain = 0
+        for c in header:
+            t = (h2 | 2) & 0xFFFF
+            plain = c ^ (((t * (t ^ 1)) >> 8) & 0xFF)
+            h0 = (h0 >> 8) ^ crc_table[(h0 ^ plain) & 0xFF]
+            h1 = ((h1 + (h0 & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+            h2 = (h2 >> 8) ^ crc_table[(h2 ^ (h1 >> 24)) & 0xFF]
+
+        if plain != check_byte:
+            return False
+
+    return True
+
+
+def find_zip_password(
+    archive: zipfile.ZipFile,
+    candidates: Iterable[str],
+    processes: int | None = None,
+) -> str | None:
+    """Find the password of an encrypted zip archive.
+
+    Candidates are checked against the encryption headers first. Large candidate lists
+    are split between worker processes. Candidates that pass the header check are
+    confirmed by fully reading the smallest encrypted member.
+
+    Args:
+        archive: An open zip archive.
+        candidates: Passwords to try, in order.
+        processes: Maximal number of worker processes. Defaults to the CPU count.
+
+    Returns:
+        The first working password, or None if no candidate works.
+
+    """
+    headers = read_encryption_headers(archive)
+    candidates = list(dict.fromkeys(candidates))
+    if not headers:
+        return next((c for c in candidates if _read_succeeds(archive, c)), None)
+
+    for candidate in _header_matches(headers, candidates, processes):
+        if _read_succeeds(archive, candidate):
+            return candidate
+
+    return None
+
+
+def _header_matches(
+    headers: list[EncryptionHeader],
+    candidates: list[str],
+    processes: int | None,
+) -> Iterator[str]:
+    if len(candidates) < PARALLEL_THRESHOLD:
+        yield from _match_chunk(headers, candidates)
+        return
+
+    chunks = [
+        candidates[i : i + CANDIDATES_CHUNK_SIZE]
+        for i in range(0, len(candidates), CANDIDATES_CHUNK_SIZE)
+    ]
+    try:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=processes)
+    except (NotImplementedError, OSError):
+        yield from _match_chunk(headers, candidates)
+        return
+
+    try:
+        for matches in executor.map(_match_chunk, [headers] * len(chunks), chunks):
+            yield from matches
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _match_chunk(headers: list[EncryptionHeader], candidates: list[str]) -> list[str]:
+    return [
+        candidate
+        for candidate in candidates
+        if password_matches_headers(candidate.encode(), headers)
+    ]
+
+
+def _read_succeeds(archive: zipfile.ZipFile, password: str) -> bool:
+    encrypted = [
+        info for info in archive.infolist() if not info.is_dir() and info.flag_bits & ENCRYPTED_FLAG
+    ]
+    if not encrypted:
+        return True
+
+    smallest = min(encrypted, key=lambda info: info.compress_size)
+    try:
+        with archive.open(smallest, pwd=password.encode()) as member:
+            while member.read(1024 * 1024):
+                pass
+
+    except (RuntimeError, zipfile.BadZipFile, ValueError, OSError, EOFError, zlib.error):
+        # A wrong password passes the 1 byte header check about once in 256 tries,
+        # and decompressing what it decrypts to fails in any of these ways
+        return False
+
+    return True
+
+
+class ZipPasswordCache:
+    """A small on-disk list of passwords that opened zip files before.
+
+    Cached passwords are tried after the passwords supplied by the user and before
+    the wordlist, most recent first.
+    """
+
+    def __init__(self, folder: str, max_size: int = PASSWORD_CACHE_MAX_SIZE) -> None:
+        self.path = os.path.join(folder, PASSWORD_CACHE_FILE_NAME)
+        self.max_size = max_size
+
+    def load(self) -> list[str]:
+        """Load the cached passwords.
+
+        Returns:
+            The cached passwords, most recently used first.
+
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                passwords = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return []
+
+        return [p for p in passwords if isinstance(p, str)]
+
+    def add(self, password: str) -> None:
+        """Move a password to the top of the cache, or add it if it's new."""
+        passwords = [password] + [p for p in self.load() if p != password]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(passwords[: self.max_size], f)
+
+        os.replace(tmp_path, self.path)
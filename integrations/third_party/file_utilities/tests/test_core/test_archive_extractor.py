@@ -0,0 +1,61 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import io
+import zipfile
+
+import pytest
+
+from ...core.ArchiveExtractor import (
+    NO_LIMITS,
+    ArchiveExtractor,
+    ArchiveLimitExceededError,
+    ExtractionLimits,
+)
+
+CONTENT = b"2024-01-01 00:00:00 INFO request served\n" * 50_000
+
+
+def _deflated_zip(content: bytes) -> zipfile.ZipFile:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("app.log", content)
+
+    return zipfile.ZipFile(buffer)
+
+
+def test_iter_zip_no_limits() -> None:
+    archive = _deflated_zip(CONTENT)
+    assert archive.getinfo("app.log").file_size / archive.getinfo("app.log").compress_size > 100
+
+    (member,) = ArchiveExtractor(limits=NO_LIMITS, include_raw=True).iter_zip(archive)
+
+    assert member.filename == "app.log"
+    assert member.size == len(CONTENT)
+    assert member.raw == CONTENT
+
+
+@pytest.mark.parametrize(
+    "limits",
+    [
+        ExtractionLimits(max_compression_ratio=100),
+        ExtractionLimits(max_total_size=len(CONTENT) - 1, max_compression_ratio=None),
+        ExtractionLimits(max_members=0, max_compression_ratio=None),
+    ],
+)
+def test_iter_zip_limit_exceeded(limits: ExtractionLimits) -> None:
+    with pytest.raises(ArchiveLimitExceededError):
+        list(ArchiveExtractor(limits=limits).iter_zip(_deflated_zip(CONTENT)))
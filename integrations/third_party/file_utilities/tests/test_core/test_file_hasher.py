@@ -0,0 +1,109 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import os
+import pathlib
+
+import pytest
+
+from ...core.FileHasher import (
+    DEFAULT_HASH_ALGORITHMS,
+    MultiHasher,
+    encode_file_base64,
+    hash_base64,
+    hash_bytes,
+    hash_file,
+    hash_stream,
+    iter_base64_decode,
+    iter_base64_encode,
+)
+
+DATA = os.urandom(10_000) + b"tail"
+CHUNK_SIZES = [1, 2, 4, 5, 7, 1_000, 1_001, 100_000]
+
+
+class ShortReadStream(io.RawIOBase):
+    """A raw stream that returns at most 5 bytes per read."""
+
+    def __init__(self, data: bytes) -> None:
+        self._stream = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: memoryview) -> int:
+        chunk = self._stream.read(min(len(buffer), 5))
+        buffer[: len(chunk)] = chunk
+        return len(chunk)
+
+
+def expected_hashes(data: bytes) -> dict[str, str]:
+    return {
+        algorithm: hashlib.new(algorithm, data).hexdigest() for algorithm in DEFAULT_HASH_ALGORITHMS
+    }
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_hashes_match_hashlib(tmp_path: pathlib.Path, chunk_size: int) -> None:
+    path = tmp_path / "data.bin"
+    path.write_bytes(DATA)
+    expected = expected_hashes(DATA)
+
+    assert hash_bytes(DATA, chunk_size=chunk_size) == expected
+    assert hash_stream(io.BytesIO(DATA), chunk_size=chunk_size) == (expected, len(DATA))
+    assert hash_file(str(path), chunk_size=chunk_size) == (expected, len(DATA))
+
+
+def test_multi_hasher_algorithms() -> None:
+    hasher = MultiHasher(["sha256", "md5"])
+    hasher.update(DATA[:10])
+    hasher.update(memoryview(DATA)[10:])
+
+    assert list(hasher.hexdigests()) == ["sha256", "md5"]
+    assert hasher.hexdigests()["sha256"] == hashlib.sha256(DATA).hexdigest()
+    assert hasher.size == len(DATA)
+
+
+def test_hash_empty_data() -> None:
+    assert hash_bytes(b"") == expected_hashes(b"")
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 10, len(DATA)])
+def test_iter_base64_encode(chunk_size: int, size: int) -> None:
+    expected = base64.b64encode(DATA[:size]).decode()
+
+    assert "".join(iter_base64_encode(io.BytesIO(DATA[:size]), chunk_size)) == expected
+    stream = io.BufferedReader(ShortReadStream(DATA[:size]), buffer_size=1)
+    assert "".join(iter_base64_encode(stream, chunk_size)) == expected
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_iter_base64_decode(chunk_size: int) -> None:
+    encoded = base64.encodebytes(DATA).decode()
+
+    assert b"".join(iter_base64_decode(encoded, chunk_size)) == DATA
+    assert hash_base64(encoded) == (expected_hashes(DATA), len(DATA))
+
+
+def test_encode_file_base64(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "data.bin"
+    path.write_bytes(DATA)
+
+    assert encode_file_base64(str(path), 1_000) == base64.b64encode(DATA).decode()
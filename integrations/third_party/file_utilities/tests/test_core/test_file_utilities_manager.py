@@ -0,0 +1,110 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import pathlib
+
+import pytest
+
+from ...core.FileUtilitiesManager import EntityFileManager, EntityFileManagerException
+
+
+def read_lines(path: pathlib.Path) -> list[str]:
+    return path.read_text().splitlines()
+
+
+def test_add_entities(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "entities.txt"
+    with EntityFileManager(str(path)) as manager:
+        manager.addEntity("A")
+        manager.addEntity("B")
+        manager.addEntity("A")
+
+        assert list(manager.entities) == ["A", "B"]
+
+    assert read_lines(path) == ["A", "B"]
+
+
+def test_duplicate_add_does_not_write(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "entities.txt"
+    path.write_text("A\nB")
+    with EntityFileManager(str(path)) as manager:
+        manager.addEntity("B")
+
+        assert not manager.is_dirty
+
+    assert path.read_text() == "A\nB"
+
+
+def test_remove_absent_entity(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "entities.txt"
+    path.write_text("A")
+    with EntityFileManager(str(path)) as manager:
+        with pytest.raises(EntityFileManagerException):
+            manager.removeEntity("B")
+
+        assert not manager.is_dirty
+
+    assert path.read_text() == "A"
+
+
+def test_added_then_removed_entity_is_not_written(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "entities.txt"
+    path.write_text("A")
+    with EntityFileManager(str(path)) as manager:
+        manager.addEntity("B")
+        manager.removeEntity("B")
+
+        assert not manager.is_dirty
+
+    assert path.read_text() == "A"
+
+
+def test_removal_rewrites_file(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "entities.txt"
+    path.write_text("A\nB\nC\n")
+    with EntityFileManager(str(path)) as manager:
+        manager.removeEntity("B")
+        manager.addEntity("D")
+
+    assert read_lines(path) == ["A", "C", "D"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["entities.txt", "entities.txt.lock"]
+
+
+def test_duplicates_are_compacted_on_write(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "entities.txt"
+    path.write_text("A\n\nB\nA\n")
+    with EntityFileManager(str(path)) as manager:
+        assert list(manager.entities) == ["A", "B"]
+        manager.addEntity("C")
+
+    assert read_lines(path) == ["A", "B", "C"]
+
+
+def test_reload_after_append(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "entities.txt"
+    path.write_text("A")
+    with EntityFileManager(str(path)) as manager:
+        manager.addEntity("B")
+
+    # Another run appends to the file written by the first one
+    with EntityFileManager(str(path)) as manager:
+        assert list(manager.entities) == ["A", "B"]
+        manager.addEntity("C")
+
+    assert path.read_text() == "A\nB\nC"
+    with EntityFileManager(str(path)) as manager:
+        assert "C" in manager
+        assert len(manager) == 3
@@ -0,0 +1,82 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import io
+import struct
+import zipfile
+import zlib
+
+from ...core.ZipPasswordFinder import CRC_TABLE, find_zip_password
+
+PASSWORD = "infected"
+CONTENT = b"2024-01-01 00:00:00 INFO request served\n" * 2_000
+
+
+def _crc(value: int, byte: int) -> int:
+    return (value >> 8) ^ CRC_TABLE[(value ^ byte) & 0xFF]
+
+
+def _encrypt(password: bytes, data: bytes) -> bytes:
+    keys = [305419896, 591751049, 878082192]
+
+    def update(byte: int) -> None:
+        keys[0] = _crc(keys[0], byte)
+        keys[1] = ((keys[1] + (keys[0] & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+        keys[2] = _crc(keys[2], keys[1] >> 24)
+
+    for c in password:
+        update(c)
+
+    encrypted = bytearray()
+    for c in data:
+        t = (keys[2] | 2) & 0xFFFF
+        encrypted.append(c ^ (((t * (t ^ 1)) >> 8) & 0xFF))
+        update(c)
+
+    return bytes(encrypted)
+
+
+def _deflated_encrypted_zip(name: str, password: str, content: bytes) -> zipfile.ZipFile:
+    """Build a zip with one deflated member encrypted with the traditional PKWARE cipher."""
+    compressor = zlib.compressobj(wbits=-15)
+    compressed = compressor.compress(content) + compressor.flush()
+    crc = zlib.crc32(content)
+    header = bytes(range(11)) + bytes([crc >> 24])
+    data = _encrypt(password.encode(), header + compressed)
+
+    filename = name.encode()
+    fields = (0x1, zipfile.ZIP_DEFLATED, 0, 0, crc, len(data), len(content), len(filename), 0)
+    local = struct.pack("<4s5H3L2H", b"PK\x03\x04", 20, *fields) + filename
+    central = struct.pack("<4s6H3L5H2L", b"PK\x01\x02", 20, 20, *fields, 0, 0, 0, 0, 0)
+    central += filename
+    offset = len(local) + len(data)
+    end = struct.pack("<4s4H2LH", b"PK\x05\x06", 0, 0, 1, 1, len(central), offset, 0)
+    return zipfile.ZipFile(io.BytesIO(local + data + central + end))
+
+
+def test_find_zip_password() -> None:
+    archive = _deflated_encrypted_zip("app.log", PASSWORD, CONTENT)
+
+    assert archive.read("app.log", pwd=PASSWORD.encode()) == CONTENT
+    assert find_zip_password(archive, ["secret", PASSWORD]) == PASSWORD
+
+
+def test_find_zip_password_wrong_candidates() -> None:
+    archive = _deflated_encrypted_zip("app.log", PASSWORD, CONTENT)
+    candidates = [f"wrong-{i}" for i in range(5_000)]
+
+    assert find_zip_password(archive, candidates, processes=1) is None
+    assert find_zip_password(archive, [*candidates, PASSWORD], processes=1) == PASSWORD
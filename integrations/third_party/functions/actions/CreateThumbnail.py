@@ -14,15 +14,14 @@
 
 from __future__ import annotations
 
-import base64
-import io
 import json
 
-from PIL import Image
 from soar_sdk.ScriptResult import EXECUTION_STATE_COMPLETED
 from soar_sdk.SiemplifyAction import SiemplifyAction
 from soar_sdk.SiemplifyUtils import convert_dict_to_json_result_dict, output_handler
 
+from ..core.Thumbnails import create_thumbnail, create_thumbnails
+
 MISSING_VAL = "NotFound"
 
 
@@ -57,17 +56,6 @@ def find_key_path_recursive(key_list, current_json):
         return f"{current_json}"  # Found val, return it. Format to make everything into string
 
 
-def create_thumbnail(base64_str, thumb_size):
-    buffer = io.BytesIO()
-
-    imgdata = base64.b64decode(base64_str)
-    img = Image.open(io.BytesIO(imgdata))
-    new_img = img.resize((int(thumb_size[0]), int(thumb_size[1])))  # x, y
-    new_img.save(buffer, format="PNG")
-    img_b64 = base64.b64encode(buffer.getvalue())
-    return str(img_b64)[2:-1]
-
-
 @output_handler
 def main():
     siemplify = SiemplifyAction()
@@ -98,12 +86,27 @@ def main():
 
     if input_json != None:
         in_json = json.loads(input_json)
-        for entity_json in in_json:
-            base64_str = find_key_path_in_json(image_key_path, entity_json)
+        base64_strs = [
+            find_key_path_in_json(image_key_path, entity_json) for entity_json in in_json
+        ]
+        failed_entities = []
+        thumbnails = create_thumbnails(base64_strs, thumb_size)
+        for entity_json, thumbnail in zip(in_json, thumbnails):
+            if isinstance(thumbnail, Exception):
+                siemplify.LOGGER.error(
+                    f"Failed to create a thumbnail for {entity_json['Entity']}: {thumbnail}",
+                )
+                failed_entities.append(entity_json["Entity"])
+                continue
+
             data = {}
-            data["thumbnail"] = create_thumbnail(base64_str, thumb_size)
+            data["thumbnail"] = thumbnail
             json_result[entity_json["Entity"]] = data
-            json_result = convert_dict_to_json_result_dict(json_result)
+        json_result = convert_dict_to_json_result_dict(json_result)
+        if failed_entities:
+            output_message += "\n Failed processing entities:\n   {}".format(
+                "\n   ".join(failed_entities),
+            )
     else:
         data = {}
         data["thumbnail"] = create_thumbnail(base64_str, thumb_size)
@@ -14,12 +14,11 @@
 
 from __future__ import annotations
 
-from hashid import *
 from soar_sdk.ScriptResult import EXECUTION_STATE_COMPLETED, EXECUTION_STATE_FAILED
 from soar_sdk.SiemplifyAction import SiemplifyAction
 from soar_sdk.SiemplifyUtils import output_handler
 
-SUPPORTED_OUTPUT_TYPES = {"SHA-256", "MD5", "SHA-1", "SHA-512"}
+from ..core.HashTypes import detect_hash_type
 
 
 @output_handler
@@ -34,34 +33,17 @@ def main():
 
     res = []
     to_enrich = []
-    hid = HashID()
 
     hashes = siemplify.parameters.get("Hashes")
     if hashes:
         hashes = hashes.split(",")
     try:
         for _hash in hashes:
-            intersection = list(
-                set([x.name for x in hid.identifyHash(_hash)]).intersection(
-                    SUPPORTED_OUTPUT_TYPES,
-                ),
-            )
-            if intersection:
-                res.append({"Hash": _hash, "HashType": intersection[0]})
-            else:
-                res.append({"Hash": _hash, "HashType": "UNDETECTED"})
+            res.append({"Hash": _hash, "HashType": detect_hash_type(_hash) or "UNDETECTED"})
 
         for entity in siemplify.target_entities:
             if entity.entity_type == "FILEHASH":
-                intersection = list(
-                    set(
-                        [x.name for x in hid.identifyHash(entity.identifier)],
-                    ).intersection(SUPPORTED_OUTPUT_TYPES),
-                )
-                if intersection:
-                    d = {"HashType": intersection[0]}
-                else:
-                    d = {"HashType": "UNDETECTED"}
+                d = {"HashType": detect_hash_type(entity.identifier) or "UNDETECTED"}
                 entity.additional_properties.update(d)
                 to_enrich.append(entity)
                 d["Hash"] = entity.identifier
@@ -23,22 +23,8 @@ from soar_sdk.ScriptResult import EXECUTION_STATE_COMPLETED, EXECUTION_STATE_FAI
 from soar_sdk.SiemplifyAction import SiemplifyAction
 from soar_sdk.SiemplifyUtils import output_handler
 from tld import get_fld
-from urlextract import URLExtract
-
-IPV4_REGEX: re.Pattern[str] = re.compile(r"""(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})""")
-IPV6_REGEX: re.Pattern[str] = re.compile(
-    r"""((?:[0-9A-Fa-f]{1,4}:){6}(?:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4}|(?:(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5]))|::(?:[0-9A-Fa-f]{1,4}:){5}(?:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4}|(?:(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5]))|(?:[0-9A-Fa-f]{1,4})?::(?:[0-9A-Fa-f]{1,4}:){4}(?:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4}|(?:(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5]))|(?:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4})?::(?:[0-9A-Fa-f]{1,4}:){3}(?:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4}|(?:(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5]))|(?:(?:[0-9A-Fa-f]{1,4}:){,2}[0-9A-Fa-f]{1,4})?::(?:[0-9A-Fa-f]{1,4}:){2}(?:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4}|(?:(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5]))|(?:(?:[0-9A-Fa-f]{1,4}:){,3}[0-9A-Fa-f]{1,4})?::[0-9A-Fa-f]{1,4}:(?:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4}|(?:(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5]))|(?:(?:[0-9A-Fa-f]{1,4}:){,4}[0-9A-Fa-f]{1,4})?::(?:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4}|(?:(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5]))|(?:(?:[0-9A-Fa-f]{1,4}:){,5}[0-9A-Fa-f]{1,4})?::[0-9A-Fa-f]{1,4}|(?:(?:[0-9A-Fa-f]{1,4}:){,6}[0-9A-Fa-f]{1,4})?::)""",
-)
-EMAIL_REGEXP: re.Pattern[str] = re.compile(
-    r"(?i)"  # Case-insensitive matching
-    r"(?:[A-Z0-9!#$%&'*+/=?^_`{|}~-]+"  # Unquoted local part
-    r"(?:\.[A-Z0-9!#$%&'*+/=?^_`{|}~-]+)*"  # Dot-separated atoms in local part
-    r"|\"(?:[\x01-\x08\x0b\x0c\x0e-\x1f\x21\x23-\x5b\x5d-\x7f]"  # Quoted strings
-    r"|\\[\x01-\x09\x0b\x0c\x0e-\x7f])*\")"  # Escaped characters in local part
-    r"@"  # Separator
-    r"[A-Z0-9](?:[A-Z0-9-]*[A-Z0-9])?"  # Domain name
-    r"\.(?:[A-Z0-9](?:[A-Z0-9-]*[A-Z0-9])?)+",  # Top-level domain and subdomains
-)
+
+from ..core.IocScanner import find_emails, find_urls, iter_ip_matches
 
 
 @output_handler
@@ -49,8 +35,14 @@ def main() -> None:
             "Input String",
             print_value=True,
         )
+        check_dns: bool = siemplify.extract_action_param(
+            "Validate URLs With DNS",
+            default_value=False,
+            input_type=bool,
+            print_value=True,
+        )
         status: int = EXECUTION_STATE_COMPLETED
-        urls_found: list[str] = get_urls(input_string)
+        urls_found: list[str] = get_urls(input_string, check_dns=check_dns)
         domains_found: list[str] = extract_domains_from_urls(urls_found)
         ips_found = extract_ips(input_string)
         emails_found: list[str] = extract_emails(input_string)
@@ -86,19 +78,19 @@ def main() -> None:
         siemplify.end(f"Failed due to error: {e!s}", "", status)
 
 
-def get_urls(body: str) -> list[str]:
+def get_urls(body: str, check_dns: bool = False) -> list[str]:
     """Function for extracting URLs from the input string.
 
     Args:
         body (str): Text input which should be searched for URLs.
+        check_dns (bool): Whether to keep only URLs whose host name resolves.
 
     Returns:
         list: Returns a list of URLs found in the input string.
 
     """
     list_observed_urls: dict[str, None] = {}
-    extractor: URLExtract = URLExtract(cache_dns=False)
-    for found_url in extractor.find_urls(body, check_dns=True):
+    for found_url in find_urls(body, check_dns=check_dns):
         if "." not in found_url:
             # If we found a URL like http://afafasasfasfas that makes no
             # sense, thus skip it
@@ -215,21 +207,21 @@ def extract_ips(body: str, include_internal: bool = True) -> list[str]:
 
     """
     ips: dict[str, None] = {}
-    for ip_type in (IPV4_REGEX, IPV6_REGEX):
-        for match in ip_type.findall(body):
-            try:
-                ipaddress_match: ipaddress.IPv4Address | ipaddress.IPv6Address = (
-                    ipaddress.ip_address(match)
-                )
-
-            except ValueError:
-                continue
-
-            else:
-                if not ipaddress_match.is_private or (
-                    include_internal and match != "::"
-                ):
-                    ips[match] = None
+    for match in iter_ip_matches(body):
+        if match in ips:
+            continue
+
+        try:
+            ipaddress_match: ipaddress.IPv4Address | ipaddress.IPv6Address = (
+                ipaddress.ip_address(match)
+            )
+
+        except ValueError:
+            continue
+
+        else:
+            if not ipaddress_match.is_private or (include_internal and match != "::"):
+                ips[match] = None
 
     return list(ips)
 
@@ -244,7 +236,7 @@ def extract_emails(body: str) -> list[str]:
         list: List of emails extracted from the string.
 
     """
-    return list({e.lower(): None for e in EMAIL_REGEXP.findall(body)})
+    return list({e.lower(): None for e in find_emails(body)})
 
 
 if __name__ == "__main__":
@@ -14,13 +14,12 @@
 
 from __future__ import annotations
 
-import json
-
-from jsonpath_ng.ext import parse
 from soar_sdk.ScriptResult import EXECUTION_STATE_COMPLETED
 from soar_sdk.SiemplifyAction import SiemplifyAction
 from soar_sdk.SiemplifyUtils import output_handler
 
+from ..core.JsonPathQuery import compile_expression, find_matches
+
 
 @output_handler
 def main():
@@ -28,15 +27,17 @@ def main():
 
     json_string = siemplify.extract_action_param("Json", print_value=False)
     xpath = siemplify.extract_action_param("JSONPath Expression", print_value=True)
+    max_matches = siemplify.extract_action_param(
+        "Max Matches",
+        input_type=int,
+        default_value=0,
+        print_value=True,
+    )
     json_result = {}
     json_result["matches"] = []
     try:
-        json_data = json.loads(json_string)
-        json_expression = parse(xpath)
-
-        match = json_expression.find(json_data)
-        for m in match:
-            json_result["matches"].append(m.value)
+        json_expression = compile_expression(xpath)
+        json_result["matches"] = find_matches(json_string, json_expression, max_matches)
 
     except Exception:
         raise
@@ -0,0 +1,43 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+HASH_TYPES_BY_LENGTH = {32: "MD5", 40: "SHA-1", 64: "SHA-256", 128: "SHA-512"}
+HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+
+def detect_hash_type(value: str) -> str | None:
+    """Detect the type of a hash by its length and character set.
+
+    A hash is a hex digest, optionally followed by a colon and a salt, the same
+    format hashid recognizes for the MD5, SHA-1, SHA-256 and SHA-512 types. A digest
+    length maps to a single type, so no input is ambiguous between them.
+
+    Args:
+        value: The hash. Surrounding whitespace is ignored.
+
+    Returns:
+        The hash type, or None if the value isn't a hash of a supported type.
+
+    """
+    digest, separator, salt = value.strip().partition(":")
+    hash_type = HASH_TYPES_BY_LENGTH.get(len(digest))
+    if hash_type is None or not HEX_DIGITS.issuperset(digest):
+        return None
+
+    if separator and (not salt or "\n" in salt):
+        return None
+
+    return hash_type
@@ -0,0 +1,157 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Scanning of text for IOCs.
+
+The TLD data of the URL extractor is loaded once per process and compiled to a
+trie shaped regex, and IP addresses are found in a single pass over the text, which
+only runs the IP regexes on the short runs of characters that can be part of an IP
+address.
+"""
+
+from __future__ import annotations
+
+import functools
+import re
+from typing import TYPE_CHECKING
+
+from urlextract import URLExtract
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+IPV4_REGEX: re.Pattern[str] = re.compile(r"""(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})""")
+IPV6_REGEX: re.Pattern[str] = re.compile(
+    r"""((?:[0-9A-Fa-f]{1,4}:){6}(?:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4}|(?:(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5]))|::(?:[0-9A-Fa-f]{1,4}:){5}(?:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4}|(?:(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5]))|(?:[0-9A-Fa-f]{1,4})?::(?:[0-9A-Fa-f]{1,4}:){4}(?:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4}|(?:(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5]))|(?:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4})?::(?:[0-9A-Fa-f]{1,4}:){3}(?:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4}|(?:(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5]))|(?:(?:[0-9A-Fa-f]{1,4}:){,2}[0-9A-Fa-f]{1,4})?::(?:[0-9A-Fa-f]{1,4}:){2}(?:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4}|(?:(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5]))|(?:(?:[0-9A-Fa-f]{1,4}:){,3}[0-9A-Fa-f]{1,4})?::[0-9A-Fa-f]{1,4}:(?:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4}|(?:(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5]))|(?:(?:[0-9A-Fa-f]{1,4}:){,4}[0-9A-Fa-f]{1,4})?::(?:[0-9A-Fa-f]{1,4}:[0-9A-Fa-f]{1,4}|(?:(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5]))|(?:(?:[0-9A-Fa-f]{1,4}:){,5}[0-9A-Fa-f]{1,4})?::[0-9A-Fa-f]{1,4}|(?:(?:[0-9A-Fa-f]{1,4}:){,6}[0-9A-Fa-f]{1,4})?::)""",
+)
+EMAIL_REGEXP: re.Pattern[str] = re.compile(
+    r"(?i)"  # Case-insensitive matching
+    r"(?:[A-Z0-9!#$%&'*+/=?^_`{|}~-]+"  # Unquoted local part
+    r"(?:\.[A-Z0-9!#$%&'*+/=?^_`{|}~-]+)*"  # Dot-separated atoms in local part
+    r"|\"(?:[\x01-\x08\x0b\x0c\x0e-\x1f\x21\x23-\x5b\x5d-\x7f]"  # Quoted strings
+    r"|\\[\x01-\x09\x0b\x0c\x0e-\x7f])*\")"  # Escaped characters in local part
+    r"@"  # Separator
+    r"[A-Z0-9](?:[A-Z0-9-]*[A-Z0-9])?"  # Domain name
+    r"\.(?:[A-Z0-9](?:[A-Z0-9-]*[A-Z0-9])?)+",  # Top-level domain and subdomains
+)
+# Maximal runs of the characters IPv4 and IPv6 addresses are made of. Every IP regex
+# match is contained in a single run, so searching the runs finds the same matches
+# as searching the whole text.
+IP_CHARS_RUN_REGEX: re.Pattern[str] = re.compile(r"[\dA-Fa-f:.]+")
+
+
+def build_trie_regex(words: Iterable[str]) -> str:
+    """Build a regex that matches any of the words, preferring the longest match.
+
+    Shared prefixes are matched once, so the regex engine doesn't try every word at
+    every position of the text.
+
+    Returns:
+        The regex pattern.
+
+    """
+    trie: dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    return _trie_node_regex(trie)
+
+
+def _trie_node_regex(node: dict[str, dict]) -> str:
+    branches = [re.escape(char) + _trie_node_regex(child) for char, child in node.items() if char]
+    if not branches:
+        return ""
+
+    regex = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    if "" in node:
+        # Longer words are tried first
+        regex = f"(?:{regex})?"
+
+    return regex
+
+
+class TrieURLExtract(URLExtract):
+    """A URL extractor that searches the text for TLDs with a trie shaped regex.
+
+    URLExtract matches a regex with an alternative per TLD, longest first, at every
+    position of the text. The trie regex matches the same TLDs much faster.
+    """
+
+    def _reload_tlds_from_file(self) -> None:
+        tlds = sorted(self._load_cached_tlds(), key=len, reverse=True)
+        tlds += self._ipv4_tld
+        if self._extract_localhost:
+            tlds.append("localhost")
+
+        self._tlds_re = re.compile(build_trie_regex(tlds), flags=re.IGNORECASE)
+
+
+@functools.cache
+def get_url_extractor() -> URLExtract:
+    """Get the URL extractor shared by the process.
+
+    Returns:
+        A URL extractor, with the TLD list loaded.
+
+    """
+    return TrieURLExtract(cache_dns=False)
+
+
+def find_urls(body: str, check_dns: bool = False) -> list[str]:
+    """Find the URLs in a text.
+
+    Args:
+        body (str): The text to search.
+        check_dns (bool): Whether to keep only URLs whose host name resolves.
+
+    Returns:
+        list: The URLs found in the text.
+
+    """
+    return get_url_extractor().find_urls(body, check_dns=check_dns)
+
+
+def iter_ip_matches(body: str) -> Iterator[str]:
+    """Find the IPv4 and IPv6 address candidates in a text.
+
+    Yields:
+        The matches of `IPV4_REGEX`, followed by the matches of `IPV6_REGEX`, as
+        `findall` of each regex on the whole text returns them.
+
+    """
+    ipv6_matches: list[str] = []
+    for run in IP_CHARS_RUN_REGEX.findall(body):
+        if "." in run:
+            yield from IPV4_REGEX.findall(run)
+
+        if ":" in run:
+            ipv6_matches.extend(IPV6_REGEX.findall(run))
+
+    yield from ipv6_matches
+
+
+def find_emails(body: str) -> list[str]:
+    """Find the email addresses in a text.
+
+    Returns:
+        list: The email addresses found in the text.
+
+    """
+    if "@" not in body:
+        return []
+
+    return EMAIL_REGEXP.findall(body)
@@ -0,0 +1,245 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compiled JSONPath expressions, and incremental evaluation of simple paths.
+
+Parsing an expression builds a PLY parser, so compiled expressions are cached in
+the process. Every action run is a new process, so the cache only helps when an
+expression is compiled more than once in a run. Simple paths, made only of field
+names, non-negative indexes and `[*]`, can be evaluated while scanning the JSON
+text, which stops as soon as enough matches are found. Only the values on the path
+are scanned member by member; everything else is skipped by the C JSON decoder.
+"""
+
+from __future__ import annotations
+
+import functools
+import itertools
+import json
+import re
+from typing import TYPE_CHECKING, Any
+
+from jsonpath_ng.ext import parse
+from jsonpath_ng.jsonpath import Child, DatumInContext, Fields, Index, Root, Slice
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterator
+
+    from jsonpath_ng.jsonpath import JSONPath
+
+MAX_CACHED_EXPRESSIONS = 256
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+@functools.lru_cache(maxsize=MAX_CACHED_EXPRESSIONS)
+def compile_expression(expression: str) -> JSONPath:
+    """Compile a JSONPath expression, using previously compiled expressions if possible.
+
+    Args:
+        expression: The JSONPath expression.
+
+    Returns:
+        The compiled expression.
+
+    """
+    return parse(expression)
+
+
+def get_simple_path_steps(expression: JSONPath) -> list[JSONPath] | None:
+    """Get the steps of a simple path expression.
+
+    A simple path starts at the root, and each of its steps is a single field name,
+    a non-negative index or `[*]`.
+
+    Returns:
+        The steps of the path, or None if the expression isn't a simple path.
+
+    """
+    steps = []
+    while isinstance(expression, Child):
+        steps.append(expression.right)
+        expression = expression.left
+
+    if not isinstance(expression, Root):
+        return None
+
+    for step in steps:
+        if type(step) is Fields:
+            if len(step.fields) != 1 or step.fields[0] == "*":
+                return None
+        elif type(step) is Index:
+            if step.index < 0:
+                return None
+        elif type(step) is not Slice or (step.start, step.end, step.step) != (None, None, None):
+            return None
+
+    steps.reverse()
+    return steps
+
+
+def iter_simple_path_matches(json_string: str, steps: list[JSONPath]) -> Iterator[Any]:
+    """Find the matches of a simple path while scanning JSON text.
+
+    The matches are the same as evaluating the path on the decoded JSON, except for
+    objects with duplicate keys, where the first value of a key is used rather than
+    the last one.
+
+    Args:
+        json_string: The JSON text.
+        steps: The steps of the path, from `get_simple_path_steps`.
+
+    Yields:
+        The values of the matches, in document order.
+
+    Raises:
+        json.JSONDecodeError: If the text scanned so far isn't valid JSON.
+
+    """
+    end = yield from _walk(json_string, _skip_whitespace(json_string, 0), steps)
+    end = _skip_whitespace(json_string, end)
+    if end != len(json_string):
+        raise json.JSONDecodeError("Extra data", json_string, end)
+
+
+def find_matches(
+    json_string: str,
+    expression: JSONPath,
+    max_matches: int | None = None,
+) -> list[Any]:
+    """Evaluate a JSONPath expression on JSON text.
+
+    Args:
+        json_string: The JSON text.
+        expression: The compiled JSONPath expression.
+        max_matches: The maximal number of matches to return. If the expression is
+            a simple path, the text is only scanned until this many matches are found.
+            None or 0 returns all matches.
+
+    Returns:
+        The values of the matches.
+
+    Raises:
+        ValueError: If max_matches is negative.
+
+    """
+    if max_matches is not None and max_matches < 0:
+        raise ValueError(f"Max Matches must be 0 or greater, got {max_matches}")
+
+    if max_matches:
+        steps = get_simple_path_steps(expression)
+        if steps is not None:
+            return list(itertools.islice(iter_simple_path_matches(json_string, steps), max_matches))
+
+    matches = [match.value for match in expression.find(json.loads(json_string))]
+    return matches[:max_matches] if max_matches else matches
+
+
+def _skip_whitespace(json_string: str, pos: int) -> int:
+    return _WHITESPACE.match(json_string, pos).end()
+
+
+def _walk(json_string: str, pos: int, steps: list[JSONPath]) -> Generator[Any, None, int]:
+    """Yield the matches of the steps in the JSON value at a position.
+
+    Returns:
+        The position right after the value.
+
+    """
+    if steps:
+        char = json_string[pos : pos + 1]
+        if char == "{" and type(steps[0]) is Fields:
+            return (yield from _walk_object(json_string, pos, steps[0].fields[0], steps[1:]))
+
+        if char == "[" and type(steps[0]) is not Fields:
+            return (yield from _walk_array(json_string, pos, steps[0], steps[1:]))
+
+    # Any other value is decoded, and the steps are evaluated on it the usual way
+    value, end = _DECODER.raw_decode(json_string, pos)
+    data = [DatumInContext.wrap(value)]
+    for step in steps:
+        data = [match for datum in data for match in step.find(datum)]
+
+    for datum in data:
+        yield datum.value
+
+    return end
+
+
+def _walk_object(
+    json_string: str,
+    pos: int,
+    field: str,
+    steps: list[JSONPath],
+) -> Generator[Any, None, int]:
+    pos = _skip_whitespace(json_string, pos + 1)
+    if json_string[pos : pos + 1] == "}":
+        return pos + 1
+
+    found = False
+    while True:
+        if json_string[pos : pos + 1] != '"':
+            raise json.JSONDecodeError(
+                "Expecting property name enclosed in double quotes", json_string, pos
+            )
+
+        key, pos = _DECODER.raw_decode(json_string, pos)
+        pos = _skip_whitespace(json_string, pos)
+        if json_string[pos : pos + 1] != ":":
+            raise json.JSONDecodeError("Expecting ':' delimiter", json_string, pos)
+
+        pos = _skip_whitespace(json_string, pos + 1)
+        if key == field and not found:
+            found = True
+            pos = yield from _walk(json_string, pos, steps)
+        else:
+            _, pos = _DECODER.raw_decode(json_string, pos)
+
+        pos = _skip_whitespace(json_string, pos)
+        char = json_string[pos : pos + 1]
+        if char == "}":
+            return pos + 1
+
+        if char != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", json_string, pos)
+
+        pos = _skip_whitespace(json_string, pos + 1)
+
+
+def _walk_array(
+    json_string: str,
+    pos: int,
+    step: Index | Slice,
+    steps: list[JSONPath],
+) -> Generator[Any, None, int]:
+    pos = _skip_whitespace(json_string, pos + 1)
+    if json_string[pos : pos + 1] == "]":
+        return pos + 1
+
+    for index in itertools.count():
+        if type(step) is Slice or index == step.index:
+            pos = yield from _walk(json_string, pos, steps)
+        else:
+            _, pos = _DECODER.raw_decode(json_string, pos)
+
+        pos = _skip_whitespace(json_string, pos)
+        char = json_string[pos : pos + 1]
+        if char == "]":
+            return pos + 1
+
+        if char != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", json_string, pos)
+
+        pos = _skip_whitespace(json_string, pos + 1)
@@ -0,0 +1,109 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Creation of thumbnails from base64 encoded images.
+
+Images are decoded at a reduced scale where the format supports it, and batches of
+images are processed in a bounded thread pool, as Pillow releases the GIL while it
+decodes and resizes images.
+"""
+
+from __future__ import annotations
+
+import base64
+import concurrent.futures
+import io
+import os
+from typing import TYPE_CHECKING
+
+from PIL import Image
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+MAX_IMAGE_BYTES = 50 * 1024 * 1024
+MAX_IMAGE_PIXELS = 50_000_000
+# Images are first reduced by an integer factor to at least this multiple of the
+# thumbnail size, the same way `Image.thumbnail` does
+REDUCING_GAP = 2.0
+DEFAULT_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+
+class ThumbnailError(Exception):
+    """Raised when an image can't be made into a thumbnail."""
+
+
+def create_thumbnail(
+    base64_str: str,
+    thumb_size: Sequence[str | int],
+    max_image_bytes: int = MAX_IMAGE_BYTES,
+    max_image_pixels: int = MAX_IMAGE_PIXELS,
+) -> str:
+    """Create a PNG thumbnail of a base64 encoded image.
+
+    Args:
+        base64_str: The base64 encoded image.
+        thumb_size: The width and height of the thumbnail.
+        max_image_bytes: The maximal size of the decoded image.
+        max_image_pixels: The maximal number of pixels in the image.
+
+    Returns:
+        The base64 encoded PNG thumbnail.
+
+    Raises:
+        ThumbnailError: If the image is larger than the limits.
+
+    """
+    size = (int(thumb_size[0]), int(thumb_size[1]))  # x, y
+    if len(base64_str) * 3 // 4 > max_image_bytes:
+        raise ThumbnailError(f"The image is larger than {max_image_bytes} bytes")
+
+    imgdata = base64.b64decode(base64_str)
+    with Image.open(io.BytesIO(imgdata)) as img:
+        if img.width * img.height > max_image_pixels:
+            raise ThumbnailError(
+                f"The image is {img.width}x{img.height}, more than {max_image_pixels} pixels"
+            )
+
+        # JPEG images are decoded at the smallest scale that is not smaller than the
+        # thumbnail. Other formats ignore the draft.
+        img.draft(img.mode, size)
+        new_img = img.resize(size, reducing_gap=REDUCING_GAP)
+
+    buffer = io.BytesIO()
+    new_img.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def create_thumbnails(
+    base64_strs: Iterable[str],
+    thumb_size: Sequence[str | int],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> list[str | Exception]:
+    """Create PNG thumbnails of base64 encoded images, in a thread pool.
+
+    Returns:
+        The thumbnails, in the order of the images. Images that failed are replaced
+        by the exception that was raised for them.
+
+    """
+
+    def create(base64_str: str) -> str | Exception:
+        try:
+            return create_thumbnail(base64_str, thumb_size)
+        except Exception as e:
+            return e
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        return list(executor.map(create, base64_strs))
@@ -0,0 +1,62 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from ...core.Thumbnails import ThumbnailError, create_thumbnail, create_thumbnails
+
+
+def encode_image(image_format: str, size: tuple[int, int] = (640, 480)) -> str:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 50, 50)).save(buffer, format=image_format)
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def decode_image(base64_str: str) -> Image.Image:
+    return Image.open(io.BytesIO(base64.b64decode(base64_str)))
+
+
+@pytest.mark.parametrize("image_format", ["JPEG", "PNG"])
+def test_create_thumbnail(image_format: str) -> None:
+    thumbnail = decode_image(create_thumbnail(encode_image(image_format), ["100", "50"]))
+
+    assert thumbnail.format == "PNG"
+    assert thumbnail.size == (100, 50)
+    assert all(abs(a - b) <= 3 for a, b in zip(thumbnail.getpixel((50, 25)), (200, 50, 50)))
+
+
+def test_create_thumbnail_size_limits() -> None:
+    image = encode_image("PNG")
+
+    with pytest.raises(ThumbnailError):
+        create_thumbnail(image, [10, 10], max_image_pixels=640 * 480 - 1)
+
+    with pytest.raises(ThumbnailError):
+        create_thumbnail(image, [10, 10], max_image_bytes=10)
+
+
+def test_create_thumbnails_keeps_order_and_failures() -> None:
+    images = [encode_image("PNG", (64, 64)), "bm90IGFuIGltYWdl", encode_image("JPEG", (32, 32))]
+
+    thumbnails = create_thumbnails(images, [16, 16], max_workers=2)
+
+    assert decode_image(thumbnails[0]).size == (16, 16)
+    assert isinstance(thumbnails[1], Exception)
+    assert decode_image(thumbnails[2]).size == (16, 16)
@@ -0,0 +1,48 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import hashlib
+
+import pytest
+
+from ...core.HashTypes import detect_hash_type
+
+
+@pytest.mark.parametrize(
+    ("algorithm", "hash_type"),
+    [("md5", "MD5"), ("sha1", "SHA-1"), ("sha256", "SHA-256"), ("sha512", "SHA-512")],
+)
+def test_detect_hash_type(algorithm: str, hash_type: str) -> None:
+    digest = hashlib.new(algorithm, b"test").hexdigest()
+
+    assert detect_hash_type(digest) == hash_type
+    assert detect_hash_type(f" {digest.upper()}\n") == hash_type
+    assert detect_hash_type(f"{digest}:salt") == hash_type
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "",
+        "202cb962ac59075b964b07152d234b7",
+        "202cb962ac59075b964b07152d234b70a",
+        "202cb962ac59075b964b07152d234b7g",
+        "202cb962ac59075b964b07152d234b70:",
+        "202cb962ac59075b964b07152d234b70:a\nb",
+    ],
+)
+def test_detect_hash_type_undetected(value: str) -> None:
+    assert detect_hash_type(value) is None
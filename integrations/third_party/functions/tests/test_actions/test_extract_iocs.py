@@ -0,0 +1,56 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import re
+
+from urlextract import URLExtract
+
+from ...core.IocScanner import (
+    IPV4_REGEX,
+    IPV6_REGEX,
+    build_trie_regex,
+    find_emails,
+    get_url_extractor,
+    iter_ip_matches,
+)
+
+TEXT = (
+    "Connections from 8.8.8.8, 10.0.0.1 and 999.1.1.1 to fe80::1 and ::ffff:1.2.3.4 "
+    "were reported by admin@example.com. See https://www.example.co.uk/path?a=1 and "
+    "http://localhost:8080/status or EXAMPLE.ORG for details, deadbeef:cafe::1."
+)
+
+
+def test_iter_ip_matches_finds_the_regex_matches() -> None:
+    assert list(iter_ip_matches(TEXT)) == IPV4_REGEX.findall(TEXT) + IPV6_REGEX.findall(TEXT)
+
+
+def test_find_emails() -> None:
+    assert find_emails(TEXT) == ["admin@example.com"]
+    assert find_emails("no emails here") == []
+
+
+def test_build_trie_regex_prefers_the_longest_word() -> None:
+    regex = re.compile(build_trie_regex([".co.uk", ".com", ".co", ".c+"]))
+
+    assert regex.findall("a.co.uk b.com c.co d.c+ e.cx") == [".co.uk", ".com", ".co", ".c+"]
+
+
+def test_get_url_extractor_finds_the_same_urls() -> None:
+    extractor = get_url_extractor()
+
+    assert extractor is get_url_extractor()
+    assert extractor.find_urls(TEXT) == URLExtract(cache_dns=False).find_urls(TEXT)
@@ -0,0 +1,77 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from ...core.JsonPathQuery import (
+    compile_expression,
+    find_matches,
+    get_simple_path_steps,
+)
+
+EVENTS = json.dumps({
+    "events": [
+        {"id": 1, "tags": ["a", "b"]},
+        {"id": 2, "tags": []},
+        {"name": "no id"},
+        {"id": 3, "tags": ["c"]},
+    ],
+    "total": 4,
+})
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["$.events[*].id", "$.events[1]", "$.events[*].tags[0]", "$.total", "$", "$.missing.id"],
+)
+@pytest.mark.parametrize("max_matches", [None, 1, 2, 10])
+def test_find_matches_simple_paths(expression: str, max_matches: int | None) -> None:
+    compiled = compile_expression(expression)
+    expected = [match.value for match in compiled.find(json.loads(EVENTS))]
+
+    assert get_simple_path_steps(compiled) is not None
+    assert find_matches(EVENTS, compiled, max_matches) == expected[:max_matches]
+
+
+@pytest.mark.parametrize("expression", ["$..id", "$.events[?(@.id > 1)].id", "events[-1]"])
+def test_find_matches_other_expressions(expression: str) -> None:
+    compiled = compile_expression(expression)
+    expected = [match.value for match in compiled.find(json.loads(EVENTS))]
+
+    assert get_simple_path_steps(compiled) is None
+    assert find_matches(EVENTS, compiled) == expected
+    assert find_matches(EVENTS, compiled, 1) == expected[:1]
+
+
+def test_find_matches_stops_at_max_matches() -> None:
+    truncated = '{"events": [{"id": 1}, {"id": 2}, {"id": '
+
+    assert find_matches(truncated, compile_expression("$.events[*].id"), 2) == [1, 2]
+    with pytest.raises(json.JSONDecodeError):
+        find_matches(truncated, compile_expression("$.events[*].id"), 3)
+
+
+@pytest.mark.parametrize("expression", ["$.events[*].id", "$..id"])
+def test_find_matches_rejects_negative_max_matches(expression: str) -> None:
+    with pytest.raises(ValueError, match="Max Matches"):
+        find_matches(EVENTS, compile_expression(expression), -1)
+
+
+def test_compile_expression_is_cached() -> None:
+    assert compile_expression("$.events[*].id") is compile_expression("$.events[*].id")
@@ -14,36 +14,11 @@
 
 from __future__ import annotations
 
-import json
-
 from soar_sdk.ScriptResult import EXECUTION_STATE_COMPLETED, EXECUTION_STATE_FAILED
 from soar_sdk.SiemplifyAction import SiemplifyAction
-from soar_sdk.SiemplifyDataModel import CustomList
 from soar_sdk.SiemplifyUtils import convert_dict_to_json_result_dict, output_handler
 
-
-def get_custom_list_items_from_identifier_list(siemplify, category_name, identifiers):
-    """Get a list of custom list items from category and entities list.
-    :param category_name: the custom list category
-    :param identifiers: a list of strings
-    :return: a list of custom list item objects
-    """
-    custom_list_items = []
-    for identifier in identifiers:
-        custom_list_items.append(
-            CustomList(identifier, category_name, siemplify.environment),
-        )
-    return custom_list_items
-
-
-def is_identifier_in_custom_list(siemplify, identifier, category):
-    # Returns True if identifier in category (for current environment)
-    custom_list_items = get_custom_list_items_from_identifier_list(
-        siemplify,
-        category,
-        [identifier],
-    )
-    return siemplify.any_entity_in_custom_list(custom_list_items)
+from ..core.CustomListsManager import CustomListsManager, parse_identifier_list
 
 
 @output_handler
@@ -56,19 +31,15 @@ def main():
         result_value = 0
 
         category = siemplify.parameters.get("Category")
-        try:
-            identifier_list = json.loads(siemplify.parameters.get("IdentifierList"))
-        except:
-            identifier_list = siemplify.parameters.get("IdentifierList").split(",")
-        identifier_list = [x.strip() for x in identifier_list]
+        identifier_list = parse_identifier_list(
+            siemplify.parameters.get("IdentifierList"),
+        )
 
-        json_result = {}
-        for identifier in identifier_list:
-            if is_identifier_in_custom_list(siemplify, identifier, category):
-                json_result[identifier] = True
-                result_value += 1
-            else:
-                json_result[identifier] = False
+        json_result = CustomListsManager(siemplify).find_in_custom_list(
+            category,
+            identifier_list,
+        )
+        result_value = sum(json_result[identifier] for identifier in identifier_list)
 
         if json_result:
             siemplify.result.add_result_json(
@@ -16,43 +16,9 @@ from __future__ import annotations
 
 from soar_sdk.ScriptResult import EXECUTION_STATE_COMPLETED, EXECUTION_STATE_FAILED
 from soar_sdk.SiemplifyAction import SiemplifyAction
-from soar_sdk.SiemplifyDataModel import CustomList
 from soar_sdk.SiemplifyUtils import output_handler
 
-
-def get_custom_list_items(siemplify, category_name, input_string):
-    """Get a list of custom list items from category and entities list.
-    :param category_name: the custom list category
-    :param entities: a list of entities
-    :return: a list of custom list item objects
-    """
-    custom_list_items = []
-    custom_list_items.append(
-        CustomList(input_string, category_name, siemplify.environment),
-    )
-    return custom_list_items
-
-
-def remove_entities_from_custom_list(siemplify, custom_list_items):
-    """Remove the entities from the custom list with the given category.
-    :param custom_list_items: a list of custom list items
-    :return: None
-    """
-    custom_list_items_data = []
-    for cli in custom_list_items:
-        custom_list_items_data.append(cli.__dict__)
-
-    address = f"{siemplify.API_ROOT}/{'external/v1/sdk/RemoveEntitiesFromCustomList?format=snake'}"
-    response = siemplify.session.post(address, json=custom_list_items_data)
-    siemplify.validate_siemplify_error(response)
-
-    custom_list_dicts = response.json()
-
-    # Create CustomList objects from the custom list dicts
-    custom_lists = [
-        CustomList(**custom_list_dict) for custom_list_dict in custom_list_dicts
-    ]
-    return custom_lists
+from ..core.CustomListsManager import CustomListsManager, parse_list_item
 
 
 @output_handler
@@ -65,9 +31,12 @@ def main():
         result_value = 0
         category = siemplify.parameters.get("Category")
         list_item = siemplify.parameters.get("ListItem")
-        custom_list_items = get_custom_list_items(siemplify, category, list_item)
-        json_result = remove_entities_from_custom_list(siemplify, custom_list_items)
-        output_message = f"Removed {list_item} from category {category}"
+        list_items = parse_list_item(list_item)
+        CustomListsManager(siemplify).remove_from_custom_list(category, list_items)
+        if len(list_items) == 1:
+            output_message = f"Removed {list_items[0]} from category {category}"
+        else:
+            output_message = f"Removed {len(list_items)} items from category {category}"
 
     except Exception:
         raise
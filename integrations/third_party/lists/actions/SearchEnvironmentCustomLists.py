@@ -20,6 +20,12 @@ from soar_sdk.SiemplifyUtils import output_handler
 
 from TIPCommon.rest.soar_api import get_traking_list_records_filtered
 
+from ..core.CustomListsManager import (
+    DEFAULT_SNAPSHOT_MAX_AGE,
+    CustomListRecordsIndex,
+    load_records_snapshot,
+)
+
 
 @output_handler
 def main():
@@ -35,6 +41,12 @@ def main():
         print_value=True,
         default_value=None,
     )
+    cache_max_age = siemplify.extract_action_param(
+        "Cache Max Age (Seconds)",
+        print_value=True,
+        input_type=int,
+        default_value=DEFAULT_SNAPSHOT_MAX_AGE,
+    )
 
     list_categories = (
         [category.strip() for category in categories.split(",") if category.strip()]
@@ -49,32 +61,21 @@ def main():
 
     try:
         siemplify.LOGGER.info("Getting custom list records")
-        records = get_traking_list_records_filtered(siemplify)
-        records = records = (
-            records.get("custom_lists", [])
-            if isinstance(records, dict) else records
+        records = load_records_snapshot(
+            siemplify,
+            lambda: get_traking_list_records_filtered(siemplify),
+            f"environment:{siemplify.environment}",
+            cache_max_age,
         )
 
         siemplify.LOGGER.info("Searching records for match criteria")
 
         if records:
-            if list_categories:
-                relevant_records = []
-                for record in records:
-                    if record["category"] in list_categories:
-                        relevant_records.append(record)
-            else:
-                relevant_records = records
-
+            match_records = CustomListRecordsIndex(records).search(
+                list_categories,
+                string,
+            )
             json_result = []
-            match_records = []
-            if relevant_records:
-                if string:
-                    for record in relevant_records:
-                        if string in record["entityIdentifier"]:
-                            match_records.append(record)
-                else:
-                    match_records = relevant_records
             if match_records:
                 siemplify.LOGGER.info(f"Found {len(match_records)} matching records")
                 json_result = match_records
@@ -0,0 +1,304 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import collections
+import glob
+import hashlib
+import heapq
+import json
+import math
+import os
+import time
+
+from soar_sdk.SiemplifyDataModel import CustomList
+
+ADD_ENTITIES_TO_CUSTOM_LIST_URL = "external/v1/sdk/AddEntitiesToCustomList?format=snake"
+REMOVE_ENTITIES_FROM_CUSTOM_LIST_URL = "external/v1/sdk/RemoveEntitiesFromCustomList?format=snake"
+DEFAULT_CHUNK_SIZE = 100
+SNAPSHOTS_FOLDER = "ListsCustomListSnapshots"
+SNAPSHOT_FILE_PREFIX = "custom_lists_snapshot_"
+DEFAULT_SNAPSHOT_MAX_AGE = 0
+
+
+def parse_identifier_list(value):
+    """Parse a JSON list or a comma separated string of identifiers.
+    :param value: {str} a JSON list of strings, or a comma separated string
+    :return: {list} the stripped identifiers
+    """
+    try:
+        identifiers = json.loads(value)
+    except (TypeError, ValueError):
+        identifiers = value.split(",")
+
+    if not isinstance(identifiers, list):
+        identifiers = [str(identifiers)]
+
+    return [str(identifier).strip() for identifier in identifiers]
+
+
+def parse_list_item(value):
+    """Parse a single list item, or a batch of items given as a JSON list.
+    :param value: {str} a list item string, or a JSON list of strings
+    :return: {list} the list items
+    """
+    try:
+        items = json.loads(value)
+    except (TypeError, ValueError):
+        return [value]
+
+    if isinstance(items, list):
+        return [str(item).strip() for item in items]
+
+    return [value]
+
+
+def chunks(items, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Split a list to consecutive chunks.
+    :param items: {list} the items to split
+    :param chunk_size: {int} the maximal size of a chunk
+    :return: {generator} lists of at most chunk_size items
+    """
+    for i in range(0, len(items), chunk_size):
+        yield items[i : i + chunk_size]
+
+
+class CustomListsManager:
+    """Bulk operations on the custom lists of the current environment.
+
+    The platform answers membership queries only with "any of these items is in the
+    list". Items are therefore checked a group at a time, and the first member of a
+    group that contains one is found by binary search, so a batch with few members
+    costs a few requests instead of one request per item. The group size follows the
+    share of members found so far, down to checking items one by one once members
+    are common. A group is only checked if the requests saved so far cover the cost
+    of searching it, so a batch never costs more than one request per item, plus one.
+    """
+
+    def __init__(self, siemplify, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.siemplify = siemplify
+        self.chunk_size = chunk_size
+        self.requests_count = 0
+
+    def get_custom_list_items(self, category, identifiers):
+        """Get custom list item objects of identifiers in a category.
+        :param category: {str} the custom list category
+        :param identifiers: {list} a list of strings
+        :return: {list} a list of CustomList objects
+        """
+        return [
+            CustomList(identifier, category, self.siemplify.environment)
+            for identifier in identifiers
+        ]
+
+    def find_in_custom_list(self, category, identifiers):
+        """Check which identifiers are in a custom list category.
+        :param category: {str} the custom list category
+        :param identifiers: {list} a list of strings
+        :return: {dict} identifier to whether it's in the category, in input order
+        """
+        unique_identifiers = list(dict.fromkeys(identifiers))
+        found = set()
+        checked_count = 0
+        # Requests saved so far, compared to checking every item on its own
+        saved_requests = 0
+        while checked_count < len(unique_identifiers):
+            group_size = self._get_group_size(
+                len(unique_identifiers) - checked_count,
+                checked_count,
+                len(found),
+                saved_requests,
+            )
+            group = unique_identifiers[checked_count : checked_count + group_size]
+            requests_count = self.requests_count
+            if not self._any_in_custom_list(category, group):
+                group_checked_count = len(group)
+            elif len(group) == 1:
+                found.add(group[0])
+                group_checked_count = 1
+            else:
+                member_index = self._find_first_member(category, group)
+                found.add(group[member_index])
+                # Items after the member are checked again with the following groups
+                group_checked_count = member_index + 1
+
+            checked_count += group_checked_count
+            saved_requests += group_checked_count - (self.requests_count - requests_count)
+
+        return {identifier: identifier in found for identifier in identifiers}
+
+    def add_to_custom_list(self, category, identifiers):
+        """Add identifiers to a custom list category.
+        :param category: {str} the custom list category
+        :param identifiers: {list} a list of strings
+        """
+        self._post_in_chunks(ADD_ENTITIES_TO_CUSTOM_LIST_URL, category, identifiers)
+        invalidate_records_snapshots(get_snapshots_folder(self.siemplify))
+
+    def remove_from_custom_list(self, category, identifiers):
+        """Remove identifiers from a custom list category.
+        :param category: {str} the custom list category
+        :param identifiers: {list} a list of strings
+        """
+        self._post_in_chunks(
+            REMOVE_ENTITIES_FROM_CUSTOM_LIST_URL,
+            category,
+            identifiers,
+        )
+        invalidate_records_snapshots(get_snapshots_folder(self.siemplify))
+
+    def _any_in_custom_list(self, category, identifiers):
+        self.requests_count += 1
+        return self.siemplify.any_entity_in_custom_list(
+            self.get_custom_list_items(category, identifiers),
+        )
+
+    def _get_group_size(self, unchecked_count, checked_count, members_count, saved_requests):
+        # The expected number of members among the unchecked items, from the share of
+        # members so far. It starts at one half, so items are checked one by one
+        # until members turn out to be rare.
+        expected_members = unchecked_count * (members_count + 1) / (checked_count + 2)
+        if unchecked_count <= 2 * expected_members - 2:
+            return 1
+
+        # Hwang's generalized binary splitting
+        group_size = 2 ** int(
+            math.log2((unchecked_count - expected_members + 1) / expected_members),
+        )
+        group_size = min(group_size, self.chunk_size, unchecked_count)
+        # Searching a group of 2^k items costs up to k requests more than checking
+        # its first item on its own
+        while group_size > 1 and math.ceil(math.log2(group_size)) > saved_requests + 1:
+            group_size //= 2
+
+        return group_size
+
+    def _find_first_member(self, category, identifiers):
+        # The identifiers contain a member, so once a prefix has none, the rest has
+        start, end = 0, len(identifiers)
+        while end - start > 1:
+            middle = (start + end) // 2
+            if self._any_in_custom_list(category, identifiers[start:middle]):
+                end = middle
+            else:
+                start = middle
+
+        return start
+
+    def _post_in_chunks(self, url, category, identifiers):
+        address = f"{self.siemplify.API_ROOT}/{url}"
+        for chunk in chunks(list(dict.fromkeys(identifiers)), self.chunk_size):
+            custom_list_items_data = [
+                cli.__dict__ for cli in self.get_custom_list_items(category, chunk)
+            ]
+            self.requests_count += 1
+            response = self.siemplify.session.post(address, json=custom_list_items_data)
+            self.siemplify.validate_siemplify_error(response)
+
+
+class CustomListRecordsIndex:
+    """Custom list records indexed by category."""
+
+    def __init__(self, records):
+        self.records = records
+        self._indexes_by_category = collections.defaultdict(list)
+        for index, record in enumerate(records):
+            self._indexes_by_category[record["category"]].append(index)
+
+    def search(self, categories=None, string=None):
+        """Search records by category and by a substring of their identifier.
+        :param categories: {list} categories to search in. All categories if empty
+        :param string: {str} a substring of the entity identifier. Any if empty
+        :return: {list} the matching records, in their original order
+        """
+        if categories:
+            indexes = heapq.merge(
+                *(
+                    self._indexes_by_category.get(category, [])
+                    for category in dict.fromkeys(categories)
+                ),
+            )
+            records = (self.records[index] for index in indexes)
+        else:
+            records = self.records
+
+        if string:
+            return [record for record in records if string in record["entityIdentifier"]]
+
+        return list(records)
+
+
+def get_snapshots_folder(siemplify):
+    """Get the folder of the custom list records snapshots.
+    The run folder of an action is specific to the action, so the snapshots are kept
+    in a folder that all the actions of the integration share.
+    :return: {str} the snapshots folder
+    """
+    return os.path.join(siemplify.RUN_FOLDER, SNAPSHOTS_FOLDER)
+
+
+def load_records_snapshot(siemplify, fetch_records, snapshot_key, max_age):
+    """Get custom list records from a snapshot in the snapshots folder, or fetch them.
+    The platform has no API to fetch only the changes since the last call, so stale
+    snapshots are replaced by a full download. Changes made other than through this
+    integration show up only once the snapshot is stale.
+    :param fetch_records: {callable} fetch the records from the platform
+    :param snapshot_key: {str} a key identifying the fetched records
+    :param max_age: {int} maximal snapshot age in seconds. 0 disables the snapshot
+    :return: {list} the custom list records
+    """
+    if max_age <= 0:
+        return _get_records_list(fetch_records())
+
+    snapshots_folder = get_snapshots_folder(siemplify)
+    snapshot_path = os.path.join(
+        snapshots_folder,
+        f"{SNAPSHOT_FILE_PREFIX}{hashlib.sha256(snapshot_key.encode()).hexdigest()}.json",
+    )
+    try:
+        with open(snapshot_path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        if time.time() - snapshot["fetched_at"] <= max_age:
+            siemplify.LOGGER.info("Using cached custom list records")
+            return snapshot["records"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    records = _get_records_list(fetch_records())
+    os.makedirs(snapshots_folder, exist_ok=True)
+    tmp_path = f"{snapshot_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"fetched_at": time.time(), "records": records}, f)
+    os.replace(tmp_path, snapshot_path)
+
+    return records
+
+
+def invalidate_records_snapshots(snapshots_folder):
+    """Delete all custom list records snapshots in a folder.
+    :param snapshots_folder: {str} the folder the snapshots are stored in
+    """
+    for snapshot_path in glob.glob(os.path.join(snapshots_folder, f"{SNAPSHOT_FILE_PREFIX}*")):
+        try:
+            os.remove(snapshot_path)
+        except FileNotFoundError:
+            pass
+
+
+def _get_records_list(records):
+    if isinstance(records, dict):
+        return records.get("custom_lists", [])
+
+    return records or []
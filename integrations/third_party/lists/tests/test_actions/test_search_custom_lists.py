@@ -0,0 +1,168 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import logging
+import pathlib
+from typing import Any
+
+import pytest
+
+from ...actions import AddStringToCustomList, SearchCustomLists
+
+
+class FakeResponse:
+    def raise_for_status(self) -> None:
+        pass
+
+
+class FakePlatform:
+    """Custom list records kept by a fake platform, shared by all action runs."""
+
+    def __init__(self) -> None:
+        self.records: list[dict[str, Any]] = []
+        self.fetches = 0
+
+    def post(self, url: str, json: list[dict[str, Any]]) -> FakeResponse:
+        assert "AddEntitiesToCustomList" in url
+        for item in json:
+            self.records.append(
+                {"entityIdentifier": item["identifier"], "category": item["category"]},
+            )
+
+        return FakeResponse()
+
+    def fetch_records(self, siemplify: FakeSiemplify) -> list[dict[str, Any]]:
+        self.fetches += 1
+        return [dict(record) for record in self.records]
+
+
+class FakeResult:
+    def __init__(self) -> None:
+        self.json_result = None
+
+    def add_result_json(self, json_result: Any) -> None:
+        self.json_result = json_result
+
+
+class FakeSiemplify:
+    """An action run. Every action has its own run folder under the shared RUN_FOLDER."""
+
+    API_ROOT = "https://soar.example.com/api"
+    LOGGER = logging.getLogger(__name__)
+
+    def __init__(
+        self,
+        run_root: pathlib.Path,
+        script_name: str,
+        parameters: dict[str, str],
+        platform: FakePlatform,
+    ) -> None:
+        self.RUN_FOLDER = str(run_root)
+        self.run_folder = str(run_root / "SiemplifyAction" / script_name)
+        self.parameters = parameters
+        self.environment = "Default Environment"
+        self.session = platform
+        self.result = FakeResult()
+        self.output = None
+
+    def extract_action_param(
+        self,
+        param_name: str,
+        default_value: Any = None,
+        input_type: type = str,
+        print_value: bool = False,
+    ) -> Any:
+        value = self.parameters.get(param_name)
+        if value is None or value == "":
+            return default_value
+
+        return input_type(value)
+
+    def validate_siemplify_error(self, response: FakeResponse) -> None:
+        response.raise_for_status()
+
+    def end(self, output_message: str, result_value: Any, status: int) -> None:
+        self.output = (output_message, result_value, status)
+
+
+@pytest.fixture
+def platform(monkeypatch: pytest.MonkeyPatch) -> FakePlatform:
+    platform = FakePlatform()
+    monkeypatch.setattr(SearchCustomLists, "get_traking_list_record", platform.fetch_records)
+    return platform
+
+
+def run_action(
+    monkeypatch: pytest.MonkeyPatch,
+    module: Any,
+    siemplify: FakeSiemplify,
+) -> FakeSiemplify:
+    monkeypatch.setattr(module, "SiemplifyAction", lambda: siemplify)
+    module.main()
+    return siemplify
+
+
+def search(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: pathlib.Path,
+    platform: FakePlatform,
+    cache_max_age: str,
+) -> list[dict[str, Any]] | None:
+    parameters = {"Categories": "allowlist", "Cache Max Age (Seconds)": cache_max_age}
+    siemplify = FakeSiemplify(tmp_path, "Lists_Search Custom Lists", parameters, platform)
+    return run_action(monkeypatch, SearchCustomLists, siemplify).result.json_result
+
+
+def add(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: pathlib.Path,
+    platform: FakePlatform,
+    list_item: str,
+) -> None:
+    parameters = {"Category": "allowlist", "ListItem": list_item}
+    siemplify = FakeSiemplify(tmp_path, "Lists_Add String to Custom List", parameters, platform)
+    run_action(monkeypatch, AddStringToCustomList, siemplify)
+
+
+def test_search_sees_items_added_by_another_action(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: pathlib.Path,
+    platform: FakePlatform,
+) -> None:
+    add(monkeypatch, tmp_path, platform, "1.1.1.1")
+    assert search(monkeypatch, tmp_path, platform, "300") == platform.records
+    assert search(monkeypatch, tmp_path, platform, "300") == platform.records
+    assert platform.fetches == 1
+
+    add(monkeypatch, tmp_path, platform, "2.2.2.2")
+    results = search(monkeypatch, tmp_path, platform, "300")
+
+    assert [r["entityIdentifier"] for r in results] == ["1.1.1.1", "2.2.2.2"]
+    assert platform.fetches == 2
+
+
+def test_search_is_not_cached_by_default(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: pathlib.Path,
+    platform: FakePlatform,
+) -> None:
+    add(monkeypatch, tmp_path, platform, "1.1.1.1")
+    search(monkeypatch, tmp_path, platform, "")
+    platform.records.append({"entityIdentifier": "3.3.3.3", "category": "allowlist"})
+    results = search(monkeypatch, tmp_path, platform, "")
+
+    assert [r["entityIdentifier"] for r in results] == ["1.1.1.1", "3.3.3.3"]
+    assert platform.fetches == 2
@@ -0,0 +1,101 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import os
+import pathlib
+import random
+from typing import Any
+
+import pytest
+
+from ...core.CustomListsManager import (
+    ADD_ENTITIES_TO_CUSTOM_LIST_URL,
+    REMOVE_ENTITIES_FROM_CUSTOM_LIST_URL,
+    SNAPSHOT_FILE_PREFIX,
+    CustomListsManager,
+    get_snapshots_folder,
+)
+
+
+class FakeSiemplify:
+    API_ROOT = "https://soar.example.com/api"
+    environment = "Default Environment"
+
+    def __init__(self, run_root: pathlib.Path, members: set[str] | None = None) -> None:
+        self.RUN_FOLDER = str(run_root)
+        self.members = members or set()
+        self.session = self
+        self.posts: list[tuple[str, list[dict[str, Any]]]] = []
+
+    def any_entity_in_custom_list(self, custom_list_items: list[Any]) -> bool:
+        return any(item.identifier in self.members for item in custom_list_items)
+
+    def post(self, url: str, json: list[dict[str, Any]]) -> None:
+        self.posts.append((url, json))
+
+    def validate_siemplify_error(self, response: None) -> None:
+        pass
+
+
+@pytest.mark.parametrize("members_ratio", [0, 0.01, 0.05, 0.2, 0.5, 1])
+def test_find_in_custom_list(tmp_path: pathlib.Path, members_ratio: float) -> None:
+    identifiers = [f"10.0.0.{i}" for i in range(500)]
+    rnd = random.Random(members_ratio)
+    members = {identifier for identifier in identifiers if rnd.random() < members_ratio}
+    manager = CustomListsManager(FakeSiemplify(tmp_path, members))
+
+    result = manager.find_in_custom_list("allowlist", identifiers)
+
+    assert result == {identifier: identifier in members for identifier in identifiers}
+    assert manager.requests_count <= len(identifiers) + 1
+    if members_ratio == 1:
+        assert manager.requests_count == len(identifiers)
+    if members_ratio <= 0.01:
+        assert manager.requests_count < len(identifiers) / 5
+
+
+def test_find_in_custom_list_keeps_duplicates(tmp_path: pathlib.Path) -> None:
+    manager = CustomListsManager(FakeSiemplify(tmp_path, {"b"}))
+
+    result = manager.find_in_custom_list("allowlist", ["a", "b", "a"])
+
+    assert list(result.items()) == [("a", False), ("b", True)]
+    assert manager.requests_count <= 2
+
+
+@pytest.mark.parametrize(
+    ("method", "url"),
+    [
+        ("add_to_custom_list", ADD_ENTITIES_TO_CUSTOM_LIST_URL),
+        ("remove_from_custom_list", REMOVE_ENTITIES_FROM_CUSTOM_LIST_URL),
+    ],
+)
+def test_update_custom_list_in_chunks(tmp_path: pathlib.Path, method: str, url: str) -> None:
+    siemplify = FakeSiemplify(tmp_path)
+    snapshots_folder = get_snapshots_folder(siemplify)
+    os.makedirs(snapshots_folder)
+    snapshot_path = os.path.join(snapshots_folder, f"{SNAPSHOT_FILE_PREFIX}all.json")
+    pathlib.Path(snapshot_path).write_text("{}")
+    identifiers = [f"host-{i}" for i in range(5)]
+    manager = CustomListsManager(siemplify, chunk_size=2)
+
+    getattr(manager, method)("allowlist", [*identifiers, identifiers[0]])
+
+    assert [post_url for post_url, _ in siemplify.posts] == [f"{siemplify.API_ROOT}/{url}"] * 3
+    assert [item["identifier"] for _, items in siemplify.posts for item in items] == identifiers
+    assert {item["category"] for _, items in siemplify.posts for item in items} == {"allowlist"}
+    assert manager.requests_count == 3
+    assert not os.path.exists(snapshot_path)
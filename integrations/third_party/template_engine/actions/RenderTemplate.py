@@ -15,14 +15,12 @@
 from __future__ import annotations
 
 import json
-from inspect import getmembers, isfunction
 
-from jinja2 import Environment
 from soar_sdk.ScriptResult import EXECUTION_STATE_COMPLETED, EXECUTION_STATE_FAILED
 from soar_sdk.SiemplifyAction import SiemplifyAction
 from soar_sdk.SiemplifyUtils import output_handler
 
-from ..core import JinjaFilters
+from ..core.TemplateRenderer import get_renderer, load_custom_filters
 
 # Example Consts:
 INTEGRATION_NAME = "TemplateEngine"
@@ -89,54 +87,30 @@ def main():
             status = EXECUTION_STATE_FAILED
             result_value = "Failed"
             output_message += "\n failure parsing JSON object."
-        jinja_env = Environment(
-            autoescape=True,
-            extensions=["jinja2.ext.do", "jinja2.ext.loopcontrols"],
-            trim_blocks=True,
-            lstrip_blocks=True,
-        )
-        filters = {
-            name: function
-            for name, function in getmembers(JinjaFilters)
-            if isfunction(function)
-        }
-
-        jinja_env.filters.update(filters)
-
+        renderer = get_renderer(siemplify.run_folder)
         try:
-            import CustomFilters
-
-            custom_filters = {
-                name: function
-                for name, function in getmembers(CustomFilters)
-                if isfunction(function)
-            }
-            jinja_env.filters.update(custom_filters)
+            renderer.add_filters(load_custom_filters())
         except Exception as e:
             siemplify.LOGGER.info("Unable to load CustomFilters")
             siemplify.LOGGER.info(e)
 
         if type(input_json) == list:
-            result_value = ""
-            if jinja:
-                template = jinja_env.from_string(jinja)
-            else:
-                template = jinja_env.from_string(template)
-            for entry in input_json:
-                if include_case_data:
+            if include_case_data:
+                for entry in input_json:
                     entry.update({"SiemplifyEvents": events})
                     entry.update({"SiemplifyEntities": entities})
-                result_value += template.render(entry, input_json=entry)
+            result_value = renderer.render_all(
+                jinja or template,
+                (dict(entry, input_json=entry) for entry in input_json),
+            )
+            if input_json:
                 output_message = "Successfully rendered the template."
         elif type(input_json) == dict:
             if include_case_data:
                 input_json.update({"SiemplifyEvents": events})
                 input_json.update({"SiemplifyEntities": entities})
                 print(input_json)
-            if jinja:
-                template = jinja_env.from_string(jinja)
-            else:
-                template = jinja_env.from_string(template)
+            template = renderer.get_template(jinja or template)
             result_value = template.render(input_json=input_json)
             output_message = "Successfully rendered the template."
         else:
@@ -15,14 +15,12 @@
 from __future__ import annotations
 
 import json
-from inspect import getmembers, isfunction
 
-from jinja2 import Environment
 from soar_sdk.ScriptResult import EXECUTION_STATE_COMPLETED, EXECUTION_STATE_FAILED
 from soar_sdk.SiemplifyAction import SiemplifyAction
 from soar_sdk.SiemplifyUtils import output_handler
 
-from ..core import JinjaFilters
+from ..core.TemplateRenderer import get_renderer, load_custom_filters
 
 # Example Consts:
 INTEGRATION_NAME = "TemplateEngine"
@@ -87,43 +85,22 @@ def main():
         if not isinstance(input_json, list):
             input_json = [input_json]
 
-        jinja_env = Environment(
-            autoescape=True,
-            extensions=["jinja2.ext.do", "jinja2.ext.loopcontrols"],
-            trim_blocks=True,
-            lstrip_blocks=True,
-        )
-        filters = {
-            name: function
-            for name, function in getmembers(JinjaFilters)
-            if isfunction(function)
-        }
-
-        jinja_env.filters.update(filters)
+        renderer = get_renderer(siemplify.run_folder)
         try:
-            import CustomFilters
-
-            custom_filters = {
-                name: function
-                for name, function in getmembers(CustomFilters)
-                if isfunction(function)
-            }
-            jinja_env.filters.update(custom_filters)
+            renderer.add_filters(load_custom_filters())
         except Exception as e:
             siemplify.LOGGER.info("Unable to load CustomFilters")
             siemplify.LOGGER.info(e)
 
-        result_value = ""
-
-        template = jinja_env.from_string(jinja)
-
-        outputArray = []
-
-        for entry in input_json:
-            siemplify.LOGGER.info(entry)
-            outputArray.append(template.render(entry, row=entry))
-
-        result_value = prefix + join.join(outputArray) + suffix
+        result_value = (
+            prefix
+            + renderer.render_all(
+                jinja,
+                (dict(entry, row=entry) for entry in input_json),
+                separator=join,
+            )
+            + suffix
+        )
 
         output_message = "Successfully rendered the template."
 
@@ -15,6 +15,8 @@
 from __future__ import annotations
 
 import datetime
+import functools
+import itertools
 import json
 import re
 import time
@@ -145,37 +147,61 @@ def is_in_list(val, in_list):
     return True if val in in_list else False
 
 
+REGEX_CACHE_SIZE = 512
+
+
 def _get_regex_flags(ignorecase=False):
     return re.IGNORECASE if ignorecase else 0
 
 
+@functools.lru_cache(maxsize=REGEX_CACHE_SIZE)
+def _compile_regex(pattern, flags=0):
+    return re.compile(pattern, flags)
+
+
+def _get_regex(pattern, ignorecase=False):
+    return _compile_regex(pattern, _get_regex_flags(ignorecase))
+
+
+def _findall_item(match):
+    """Get the item that re.findall would return for a match"""
+    groups = match.groups("")
+    if not groups:
+        return match.group(0)
+    if len(groups) == 1:
+        return groups[0]
+    return groups
+
+
 def regex_match(value, pattern, ignorecase=False):
     if not isinstance(value, six.string_types):
         value = str(value)
-    flags = _get_regex_flags(ignorecase)
-    return bool(re.match(pattern, value, flags))
+    return bool(_get_regex(pattern, ignorecase).match(value))
 
 
 def regex_replace(value, pattern, replacement, ignorecase=False):
     if not isinstance(value, six.string_types):
         value = str(value)
-    flags = _get_regex_flags(ignorecase)
-    regex = re.compile(pattern, flags)
-    return regex.sub(replacement, value)
+    return _get_regex(pattern, ignorecase).sub(replacement, value)
 
 
 def regex_search(value, pattern, ignorecase=False):
     if not isinstance(value, six.string_types):
         value = str(value)
-    flags = _get_regex_flags(ignorecase)
-    return bool(re.search(pattern, value, flags))
+    return bool(_get_regex(pattern, ignorecase).search(value))
 
 
 def regex_substring(value, pattern, result_index=0, ignorecase=False):
     if not isinstance(value, six.string_types):
         value = str(value)
-    flags = _get_regex_flags(ignorecase)
-    return re.findall(pattern, value, flags)[result_index]
+    regex = _get_regex(pattern, ignorecase)
+    if result_index < 0:
+        return regex.findall(value)[result_index]
+    # Stop scanning as soon as the requested match is found
+    match = next(itertools.islice(regex.finditer(value), result_index, None), None)
+    if match is None:
+        raise IndexError("list index out of range")
+    return _findall_item(match)
 
 
 def filter_datetime(date, fmt="%Y/%m/%d %H:%M:%S"):
@@ -0,0 +1,184 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A shared Jinja environment with prebuilt filters and compiled template caches.
+
+Templates are looked up by the SHA-256 of their source. Compiled templates are
+kept in memory for the lifetime of the process, and their bytecode is stored in
+the run folder so that later runs skip compilation as well.
+"""
+
+from __future__ import annotations
+
+import collections
+import functools
+import hashlib
+import os
+from inspect import getmembers, isfunction
+from types import ModuleType
+from typing import TYPE_CHECKING, Any
+
+from jinja2 import BaseLoader, Environment, FileSystemBytecodeCache, TemplateNotFound
+
+from . import JinjaFilters
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping
+
+    from jinja2 import Template
+
+BYTECODE_CACHE_DIR_NAME = "jinja_bytecode_cache"
+TEMPLATES_CACHE_SIZE = 400
+ENVIRONMENT_OPTIONS = {
+    "autoescape": True,
+    "extensions": ["jinja2.ext.do", "jinja2.ext.loopcontrols"],
+    "trim_blocks": True,
+    "lstrip_blocks": True,
+}
+
+
+def collect_filters(module: ModuleType) -> dict[str, Callable[..., Any]]:
+    """Collect the public functions of a module as Jinja filters.
+
+    Returns:
+        A mapping of function names to functions. Names starting with "_" are
+        helpers, and are left out.
+
+    """
+    return {
+        name: function
+        for name, function in getmembers(module)
+        if isfunction(function) and not name.startswith("_")
+    }
+
+
+FILTERS = collect_filters(JinjaFilters)
+
+
+@functools.cache
+def load_custom_filters() -> dict[str, Callable[..., Any]]:
+    """Load the user defined filters of the CustomFilters module.
+
+    Returns:
+        A mapping of function names to functions.
+
+    Raises:
+        ImportError: If there is no CustomFilters module.
+
+    """
+    import CustomFilters
+
+    return collect_filters(CustomFilters)
+
+
+class SourceHashLoader(BaseLoader):
+    """A loader of template sources registered under their SHA-256 hash.
+
+    A template name is derived from its content, so a loaded template never
+    becomes outdated. Only the most recently registered sources are kept.
+    """
+
+    def __init__(self, max_size: int = TEMPLATES_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self._sources: collections.OrderedDict[str, str] = collections.OrderedDict()
+
+    def add(self, source: str) -> str:
+        """Register a template source.
+
+        Returns:
+            The name to load the template with.
+
+        """
+        name = hashlib.sha256(source.encode()).hexdigest()
+        self._sources[name] = source
+        self._sources.move_to_end(name)
+        while len(self._sources) > self.max_size:
+            self._sources.popitem(last=False)
+
+        return name
+
+    def get_source(
+        self,
+        environment: Environment,
+        template: str,
+    ) -> tuple[str, str | None, Callable[[], bool]]:
+        source = self._sources.get(template)
+        if source is None:
+            raise TemplateNotFound(template)
+
+        return source, None, lambda: True
+
+
+class TemplateRenderer:
+    """Compile and render templates with the integration's filters."""
+
+    def __init__(self, bytecode_cache_dir: str | None = None) -> None:
+        self.loader = SourceHashLoader()
+        bytecode_cache = None
+        if bytecode_cache_dir is not None:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+
+        self.environment = Environment(
+            loader=self.loader,
+            bytecode_cache=bytecode_cache,
+            cache_size=TEMPLATES_CACHE_SIZE,
+            **ENVIRONMENT_OPTIONS,
+        )
+        self.environment.filters.update(FILTERS)
+
+    def add_filters(self, filters: Mapping[str, Callable[..., Any]]) -> None:
+        self.environment.filters.update(filters)
+
+    def get_template(self, source: str) -> Template:
+        """Get the compiled template of a template source.
+
+        Returns:
+            The compiled template, from the cache if it was compiled before.
+
+        """
+        return self.environment.get_template(self.loader.add(source))
+
+    def render_all(
+        self,
+        source: str,
+        contexts: Iterable[Mapping[str, Any]],
+        separator: str = "",
+    ) -> str:
+        """Render a template once for every context, and join the results.
+
+        Returns:
+            The rendered contexts, joined by the separator.
+
+        """
+        template = self.get_template(source)
+        return separator.join(template.render(context) for context in contexts)
+
+
+@functools.cache
+def get_renderer(run_folder: str | None = None) -> TemplateRenderer:
+    """Get the process wide renderer of a run folder.
+
+    Args:
+        run_folder: The integration's run folder. If provided, compiled templates
+            are stored in it and reused by later runs.
+
+    Returns:
+        A TemplateRenderer object.
+
+    """
+    bytecode_cache_dir = (
+        os.path.join(run_folder, BYTECODE_CACHE_DIR_NAME) if run_folder is not None else None
+    )
+    return TemplateRenderer(bytecode_cache_dir)
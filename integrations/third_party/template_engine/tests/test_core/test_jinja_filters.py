@@ -0,0 +1,52 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from ...core import JinjaFilters
+from ...core.TemplateRenderer import FILTERS
+
+VALUE = "user=alice id=7; user=Bob id=12; user=carol id=3"
+
+
+def test_private_helpers_are_not_filters() -> None:
+    assert "regex_substring" in FILTERS
+    assert not [name for name in FILTERS if name.startswith("_")]
+
+
+@pytest.mark.parametrize("ignorecase", [False, True])
+@pytest.mark.parametrize("pattern", [r"user=b\w+", r"id=\d+", r"user=(\w+) id=(\d+)", r"^user"])
+def test_regex_filters(pattern: str, ignorecase: bool) -> None:
+    regex = re.compile(pattern, re.IGNORECASE if ignorecase else 0)
+
+    assert JinjaFilters.regex_match(VALUE, pattern, ignorecase) == bool(regex.match(VALUE))
+    assert JinjaFilters.regex_search(VALUE, pattern, ignorecase) == bool(regex.search(VALUE))
+    assert JinjaFilters.regex_replace(VALUE, pattern, "x", ignorecase) == regex.sub("x", VALUE)
+
+
+@pytest.mark.parametrize("pattern", [r"id=\d+", r"id=(\d+)", r"user=(\w+) id=(\d+)"])
+@pytest.mark.parametrize("result_index", [0, 2, -1])
+def test_regex_substring(pattern: str, result_index: int) -> None:
+    expected = re.findall(pattern, VALUE)[result_index]
+
+    assert JinjaFilters.regex_substring(VALUE, pattern, result_index) == expected
+
+
+def test_regex_substring_out_of_range() -> None:
+    with pytest.raises(IndexError):
+        JinjaFilters.regex_substring(VALUE, r"id=\d+", 3)
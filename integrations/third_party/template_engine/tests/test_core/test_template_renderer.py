@@ -0,0 +1,70 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import pathlib
+
+import pytest
+from jinja2 import TemplateNotFound
+
+from ...core.TemplateRenderer import SourceHashLoader, TemplateRenderer
+
+
+def test_get_template_is_cached() -> None:
+    renderer = TemplateRenderer()
+
+    assert renderer.get_template("{{ a }}") is renderer.get_template("{{ a }}")
+
+
+def test_edited_template_is_compiled_again() -> None:
+    renderer = TemplateRenderer()
+
+    assert renderer.get_template("Hello {{ name }}").render(name="a") == "Hello a"
+    assert renderer.get_template("Bye {{ name }}").render(name="a") == "Bye a"
+    assert renderer.get_template("Hello {{ name }}").render(name="b") == "Hello b"
+
+
+def test_render_all() -> None:
+    contexts = [{"name": "a"}, {"name": "<b>"}]
+
+    assert TemplateRenderer().render_all("{{ name }}", contexts, ", ") == "a, &lt;b&gt;"
+
+
+def test_filters_are_registered() -> None:
+    renderer = TemplateRenderer()
+    renderer.add_filters({"shout": lambda value: f"{value.upper()}!"})
+
+    assert renderer.get_template("{{ name | shout }}").render(name="a") == "A!"
+    assert renderer.get_template("{{ 'a' | is_in_list(['a']) }}").render() == "True"
+
+
+def test_loader_keeps_recent_sources() -> None:
+    loader = SourceHashLoader(max_size=2)
+    names = [loader.add(source) for source in ("a", "b", "c")]
+    loader.add("b")
+    loader.add("d")
+
+    with pytest.raises(TemplateNotFound):
+        loader.get_source(None, names[0])
+    with pytest.raises(TemplateNotFound):
+        loader.get_source(None, names[2])
+    assert loader.get_source(None, names[1])[0] == "b"
+
+
+def test_bytecode_is_cached_in_folder(tmp_path: pathlib.Path) -> None:
+    TemplateRenderer(str(tmp_path)).get_template("{{ a }}")
+
+    assert list(tmp_path.iterdir())
+    assert TemplateRenderer(str(tmp_path)).get_template("{{ a }}").render(a=1) == "1"
@@ -15,6 +15,7 @@
 from __future__ import annotations
 
 import copy
+import functools
 import json
 import re
 
@@ -22,12 +23,12 @@ from soar_sdk.ScriptResult import EXECUTION_STATE_COMPLETED, EXECUTION_STATE_FAI
 from soar_sdk.SiemplifyAction import SiemplifyAction
 from soar_sdk.SiemplifyUtils import convert_dict_to_json_result_dict, output_handler
 
+from ..core.MultiPatternMatcher import MultiPatternMatcher
 
-def get_entity_object_by_identifier(siemplify, identifier):
-    for entity in siemplify.target_entities:
-        if identifier.lower() == entity.identifier.lower():
-            return entity
-    return None
+
+@functools.cache
+def compile_pattern(pattern):
+    return re.compile(pattern)
 
 
 @output_handler
@@ -49,6 +50,7 @@ def main():
             siemplify.parameters.get("IsCaseSensitive").lower() == "true"
         )
 
+        search_pattern = None
         for entity in siemplify.target_entities:
             try:
                 entity_fields_json = copy.deepcopy(fields_json)
@@ -56,8 +58,9 @@ def main():
                     item_results = []
                     # for event in siemplify.current_alert.security_events:
                     if item.get("RegexForFieldName"):
+                        field_name_pattern = compile_pattern(item.get("RegexForFieldName"))
                         for key in entity.additional_properties.keys():
-                            if re.search(item.get("RegexForFieldName"), key):
+                            if field_name_pattern.search(key):
                                 item_results.append(
                                     {
                                         "key": key,
@@ -77,70 +80,69 @@ def main():
                     item_results = [x for x in item_results if x["val"]]
 
                     if item.get("RegexForFieldValue"):
+                        field_value_pattern = compile_pattern(item.get("RegexForFieldValue"))
                         values_post_regex = []
                         for val in item_results:
-                            post_regex_val = re.findall(
-                                item.get("RegexForFieldValue"),
-                                val["val"],
+                            post_regex_val = field_value_pattern.findall(val["val"])
+                            values_post_regex.append(
+                                [{"key": item["FieldName"], "val": x} for x in post_regex_val],
                             )
-                            if isinstance(post_regex_val, list):
-                                values_post_regex.append(
-                                    [
-                                        {"key": item["FieldName"], "val": x}
-                                        for x in post_regex_val
-                                    ],
-                                )
-                            else:
-                                values_post_regex.append(
-                                    [{"key": item["FieldName"], "val": post_regex_val}],
-                                )
-                            # values_post_regex.append(post_regex_val)
                         item["ResultsToSearch"] = {"val_to_search": values_post_regex}
-                        # print(values_post_regex)
                     else:
                         item["ResultsToSearch"] = {"val_to_search": [item_results]}
                     item["ResultsToSearch"]["found_results"] = []
                     item["ResultsToSearch"]["num_of_results"] = 0
 
-                    # Prepare values to search in:
-                    regex_for_search_field = item.get("RegEx")
-                    if not regex_for_search_field:
-                        regex_for_search_field = ".*"
-                    for item in search_data_json:
-                        search_string = re.findall(regex_for_search_field, item["Data"])
-                        if isinstance(search_string, list):
-                            item["search_string"] = " ".join(search_string)
-                        else:
-                            item["search_string"] = search_string
+                    # The values are searched in the data extracted by the RegEx of the
+                    # last field config
+                    search_pattern = compile_pattern(item.get("RegEx") or ".*")
                 json_result[entity.identifier] = entity_fields_json
             except Exception:
                 failed_entities.append(entity.identifier)
                 raise
 
-        # # Prepare values to search in:
-        # regex_for_search_field = item.get("RegEx")
-        # if not regex_for_search_field:
-        #     regex_for_search_field = ".*"
-        # for item in search_data_json:
-        #     search_string = re.findall(regex_for_search_field, item["Data"])
-        #     if isinstance(search_string, list):
-        #         item["search_string"] = " ".join(search_string)
-        #     else:
-        #         item["search_string"] = search_string
+        # Prepare values to search in:
+        if search_pattern is not None:
+            for search_in_item in search_data_json:
+                search_in_item["search_string"] = " ".join(
+                    search_pattern.findall(search_in_item["Data"]),
+                )
 
         # Find matches!!
+        # Every search string is scanned once for all the values to search, and the
+        # values are then looked up in the set of values found in it.
+        def normalize(value):
+            return value if is_case_sensitive else value.lower()
+
+        values_to_search = [
+            normalize(val["val"])
+            for entity_data in json_result.values()
+            for item in entity_data
+            for vals in item["ResultsToSearch"]["val_to_search"]
+            for val in vals
+            if isinstance(val["val"], str)
+        ]
+        matcher = MultiPatternMatcher(values_to_search)
+        found_values = [
+            matcher.find_all(normalize(search_in_item.get("search_string")))
+            for search_in_item in search_data_json
+            if search_pattern is not None
+        ]
+
+        entities_by_identifier = {}
+        for entity in siemplify.target_entities:
+            entities_by_identifier.setdefault(entity.identifier.lower(), entity)
+
         for entity_id, entity_data in json_result.items():
             for item in entity_data:
                 for vals in item.get("ResultsToSearch", []).get("val_to_search", []):
-                    for search_in_item in search_data_json:
+                    for search_in_item, found in zip(search_data_json, found_values):
                         for val in vals:
                             if (
-                                is_case_sensitive
-                                and val["val"] in search_in_item.get("search_string")
-                            ) or (
-                                not is_case_sensitive
-                                and val["val"].lower()
-                                in search_in_item.get("search_string").lower()
+                                normalize(val["val"]) in found
+                                if isinstance(val["val"], str)
+                                else normalize(val["val"])
+                                in normalize(search_in_item.get("search_string"))
                             ):
                                 item.get("ResultsToSearch", [])["found_results"].append(
                                     {
@@ -155,15 +157,10 @@ def main():
                                     + item.get("ResultsToSearch", [])["num_of_results"]
                                 )
 
-                                ent = get_entity_object_by_identifier(
-                                    siemplify,
-                                    entity_id,
-                                )
+                                ent = entities_by_identifier.get(entity_id.lower())
                                 successfull_entities.append(ent)
                                 if enrich_key:
                                     ent.additional_properties[enrich_key] = True
-                            else:
-                                pass
 
         if enrich_key:
             siemplify.update_entities(successfull_entities)
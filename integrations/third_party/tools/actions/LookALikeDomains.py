@@ -14,11 +14,12 @@
 
 from __future__ import annotations
 
-import nltk
 from soar_sdk.ScriptResult import EXECUTION_STATE_COMPLETED
 from soar_sdk.SiemplifyAction import SiemplifyAction
 from soar_sdk.SiemplifyUtils import convert_dict_to_json_result_dict, output_handler
 
+from ..core.LookalikeDomains import LookalikeIndex
+
 ENV_DOMAIN_URL = "{}/external/v1/settings/GetDomainAliases?format=camel"
 THRESHOLD = 2
 
@@ -53,30 +54,46 @@ def main():
     status = EXECUTION_STATE_COMPLETED
     output_message = "output message :"
     result_value = "false"
+    check_homoglyphs = siemplify.extract_action_param(
+        "Check Homoglyphs",
+        input_type=bool,
+        default_value=False,
+        print_value=True,
+    )
     domains = get_domains(siemplify)
+    index = LookalikeIndex(domain["domain"] for domain in domains)
     updated_entities = []
     json_result = {}
     for entity in siemplify.target_entities:
         if entity.entity_type == "DOMAIN":
             json_result[entity.identifier] = {}
-            look_a_like_domains = []
-            for domain in domains:
-                distance = nltk.edit_distance(
-                    entity.identifier.lower(),
-                    domain["domain"].lower(),
-                )
-                if distance >= 1 and distance < 4:
-                    look_a_like_domains.append(domain["domain"])
-                    output_message += f"Domain {entity.identifier} is a look alike to {domain['domain']} with a score of {distance}.  \n"
-                    entity.is_suspicious = True
-                    entity.additional_properties["look_a_like_domain"] = domain[
-                        "domain"
-                    ]
-                    updated_entities.append(entity)
-                    result_value = "true"
-                json_result[entity.identifier]["look_a_like_domains"] = (
-                    look_a_like_domains
-                )
+            if not domains:
+                continue
+
+            matches = index.find(entity.identifier, homoglyphs=check_homoglyphs)
+            for match in matches:
+                if match.homoglyph:
+                    output_message += (
+                        f"Domain {entity.identifier} is a homoglyph look alike to "
+                        f"{match.domain}.  \n"
+                    )
+                else:
+                    output_message += (
+                        f"Domain {entity.identifier} is a look alike to {match.domain} "
+                        f"with a score of {match.distance}.  \n"
+                    )
+                entity.is_suspicious = True
+                entity.additional_properties["look_a_like_domain"] = match.domain
+                updated_entities.append(entity)
+                result_value = "true"
+
+            json_result[entity.identifier]["look_a_like_domains"] = [
+                match.domain for match in matches
+            ]
+            if check_homoglyphs:
+                json_result[entity.identifier]["homoglyph_domains"] = [
+                    match.domain for match in matches if match.homoglyph
+                ]
 
     count_updated_entities = len(updated_entities)
 
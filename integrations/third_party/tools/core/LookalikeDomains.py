@@ -0,0 +1,194 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import collections
+import dataclasses
+import unicodedata
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+MIN_LOOKALIKE_DISTANCE = 1
+MAX_LOOKALIKE_DISTANCE = 3
+
+# Characters that look alike, mapped to a shared representative. Multi character
+# sequences are replaced before single characters.
+HOMOGLYPH_SEQUENCES = (("rn", "m"), ("vv", "w"), ("cl", "d"))
+HOMOGLYPHS = str.maketrans({
+    "0": "o",
+    "1": "l",
+    "i": "l",
+    "|": "l",
+    "3": "e",
+    "5": "s",
+    "а": "a",  # Cyrillic a
+    "е": "e",  # Cyrillic ie
+    "о": "o",  # Cyrillic o
+    "р": "p",  # Cyrillic er
+    "с": "c",  # Cyrillic es
+    "у": "y",  # Cyrillic u
+    "х": "x",  # Cyrillic ha
+    "і": "l",  # Cyrillic byelorussian-ukrainian i
+    "ј": "j",  # Cyrillic je
+    "ѕ": "s",  # Cyrillic dze
+    "һ": "h",  # Cyrillic shha
+    "ο": "o",  # Greek omicron
+    "α": "a",  # Greek alpha
+    "ν": "v",  # Greek nu
+    "ρ": "p",  # Greek rho
+})
+
+
+def bounded_levenshtein(first: str, second: str, max_distance: int) -> int | None:
+    """Calculate the Levenshtein distance of two strings, up to a maximal distance.
+
+    Only a diagonal band of width 2 * max_distance + 1 is calculated, and the
+    calculation stops as soon as the distance is known to exceed the maximum.
+
+    Returns:
+        The distance, or None if it is larger than max_distance.
+
+    """
+    if first == second:
+        return 0
+
+    if len(first) > len(second):
+        first, second = second, first
+
+    if len(second) - len(first) > max_distance:
+        return None
+
+    out_of_band = max_distance + 1
+    previous = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, start=1):
+        current = [out_of_band] * (len(second) + 1)
+        current[0] = i
+        row_min = i
+        for j in range(max(1, i - max_distance), min(len(second), i + max_distance) + 1):
+            value = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (first_char != second[j - 1]),
+            )
+            current[j] = value
+            row_min = min(row_min, value)
+
+        if row_min > max_distance:
+            return None
+
+        previous = current
+
+    distance = previous[-1]
+    return distance if distance <= max_distance else None
+
+
+def homoglyph_skeleton(domain: str) -> str:
+    """Reduce a domain to a form shared by all of its homoglyph variants.
+
+    Returns:
+        The lower-cased, punycode decoded domain, with look alike characters replaced.
+
+    """
+    domain = domain.lower()
+    labels = []
+    for label in domain.split("."):
+        if label.startswith("xn--"):
+            try:
+                label = label.encode("ascii").decode("idna")
+            except UnicodeError:
+                pass
+        labels.append(label)
+
+    skeleton = unicodedata.normalize("NFKC", ".".join(labels)).translate(HOMOGLYPHS)
+    for sequence, replacement in HOMOGLYPH_SEQUENCES:
+        skeleton = skeleton.replace(sequence, replacement)
+
+    return skeleton
+
+
+@dataclasses.dataclass(slots=True)
+class LookalikeMatch:
+    domain: str
+    distance: int | None
+    homoglyph: bool = False
+
+
+class LookalikeIndex:
+    """Find look alike domains of a fixed list of domains.
+
+    Domains are bucketed by length, so only domains whose length is within the
+    maximal distance are compared, each with a bounded Levenshtein check.
+    """
+
+    def __init__(
+        self,
+        domains: Iterable[str],
+        min_distance: int = MIN_LOOKALIKE_DISTANCE,
+        max_distance: int = MAX_LOOKALIKE_DISTANCE,
+    ) -> None:
+        self.domains = list(domains)
+        self.min_distance = min_distance
+        self.max_distance = max_distance
+        self._by_length: collections.defaultdict[int, list[tuple[int, str]]] = (
+            collections.defaultdict(list)
+        )
+        self._by_skeleton: collections.defaultdict[str, list[int]] = collections.defaultdict(list)
+        for position, domain in enumerate(self.domains):
+            self._by_length[len(domain)].append((position, domain.lower()))
+            self._by_skeleton[homoglyph_skeleton(domain)].append(position)
+
+    def find(self, identifier: str, homoglyphs: bool = False) -> list[LookalikeMatch]:
+        """Find the look alike domains of an identifier.
+
+        Args:
+            identifier: The domain to find look alike domains of.
+            homoglyphs: Whether to also match domains that differ from the identifier
+                only by look alike characters, regardless of their edit distance.
+
+        Returns:
+            The matching domains, in the order they were given to the index.
+
+        """
+        identifier = identifier.lower()
+        matches: dict[int, LookalikeMatch] = {}
+        for length in range(
+            len(identifier) - self.max_distance, len(identifier) + self.max_distance + 1
+        ):
+            for position, domain in self._by_length.get(length, ()):
+                distance = bounded_levenshtein(identifier, domain, self.max_distance)
+                if distance is not None and distance >= self.min_distance:
+                    matches[position] = LookalikeMatch(self.domains[position], distance)
+
+        if homoglyphs:
+            for position in self._by_skeleton.get(homoglyph_skeleton(identifier), ()):
+                if self.domains[position].lower() == identifier:
+                    continue
+
+                if position in matches:
+                    matches[position].homoglyph = True
+                else:
+                    matches[position] = LookalikeMatch(
+                        self.domains[position],
+                        bounded_levenshtein(
+                            identifier,
+                            self.domains[position].lower(),
+                            len(identifier) + len(self.domains[position]),
+                        ),
+                        homoglyph=True,
+                    )
+
+        return [matches[position] for position in sorted(matches)]
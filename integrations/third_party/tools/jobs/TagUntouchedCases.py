@@ -14,12 +14,136 @@
 
 from __future__ import annotations
 
+import concurrent.futures
 import datetime
+import json
 
 from soar_sdk.SiemplifyJob import SiemplifyJob
 from soar_sdk.SiemplifyUtils import output_handler
 
 SCRIPT_NAME = "TagCasesBasedOnLastModifiedTime"
+MAX_RESULTS_PER_QUERY = 10000
+BATCH_SIZE = 100
+DEFAULT_MAX_CONCURRENT_REQUESTS = 5
+CHECKPOINT_KEY = "tag_untouched_cases_checkpoint"
+
+
+def get_case_ids(siemplify, update_time_from, update_time_to):
+    return siemplify.get_cases_ids_by_filter(
+        status="OPEN",
+        start_time_from_unix_time_in_ms=None,
+        start_time_to_unix_time_in_ms=None,
+        close_time_from_unix_time_in_ms=None,
+        close_time_to_unix_time_in_ms=None,
+        update_time_from_unix_time_in_ms=update_time_from,
+        update_time_to_unix_time_in_ms=update_time_to,
+        operator=None if update_time_from is None else "AND",
+        sort_by="START_TIME",
+        sort_order="DESC",
+        max_results=MAX_RESULTS_PER_QUERY,
+    )
+
+
+def iter_case_ids(siemplify, update_time_to):
+    """Get the IDs of all the open cases last updated before a time.
+    A query returns up to MAX_RESULTS_PER_QUERY cases, so update time ranges with more
+    cases are split in halves until every range is below the limit.
+    :param update_time_to: {int} Unix time in milliseconds
+    :return: {generator} The case IDs
+    """
+    seen = set()
+    windows = [(None, update_time_to)]
+    while windows:
+        update_time_from, window_end = windows.pop()
+        case_ids = get_case_ids(siemplify, update_time_from, window_end) or []
+        window_start = update_time_from or 0
+        if len(case_ids) >= MAX_RESULTS_PER_QUERY and window_end > window_start:
+            middle = (window_start + window_end) // 2
+            windows.append((middle + 1, window_end))
+            windows.append((window_start, middle))
+            continue
+
+        for case_id in case_ids:
+            if case_id not in seen:
+                seen.add(case_id)
+                yield case_id
+
+
+def load_checkpoint(siemplify, tags):
+    """Get where an interrupted run stopped.
+    :param tags: {list} The tags of the current run
+    :return: {dict} The "update_time_to" of the interrupted run and the
+        "last_case_id" it tagged, or None if there's nothing to resume
+    """
+    checkpoint = siemplify.get_scoped_job_context_property(CHECKPOINT_KEY)
+    if not checkpoint:
+        return None
+
+    try:
+        checkpoint = json.loads(checkpoint)
+    except ValueError:
+        return None
+
+    if not isinstance(checkpoint, dict) or checkpoint.get("tags") != tags:
+        return None
+
+    if not isinstance(checkpoint.get("update_time_to"), int):
+        return None
+
+    return checkpoint
+
+
+def save_checkpoint(siemplify, tags, update_time_to, last_case_id):
+    # Only a cursor is saved, as context properties are limited in size
+    siemplify.set_scoped_job_context_property(
+        CHECKPOINT_KEY,
+        json.dumps({
+            "tags": tags,
+            "update_time_to": update_time_to,
+            "last_case_id": last_case_id,
+        }),
+    )
+
+
+def clear_checkpoint(siemplify):
+    siemplify.set_scoped_job_context_property(CHECKPOINT_KEY, "")
+
+
+def get_untagged_case_ids(siemplify, update_time_to, last_case_id=None):
+    """Get the IDs of the cases to tag, in ascending order.
+    :param update_time_to: {int} Unix time in milliseconds
+    :param last_case_id: {int} The last case an interrupted run tagged, if any
+    :return: {list} The case IDs after the last tagged case
+    """
+    case_ids = sorted(iter_case_ids(siemplify, update_time_to), key=int)
+    if last_case_id is None:
+        return case_ids
+
+    return [case_id for case_id in case_ids if int(case_id) > last_case_id]
+
+
+def tag_cases(siemplify, case_ids, tags, max_concurrent_requests, update_time_to):
+    """Tag cases in batches with concurrent requests, saving a checkpoint after every batch.
+    :param case_ids: {list} The IDs of the cases to tag, in ascending order
+    :param tags: {list} The tags to add to every case
+    :param max_concurrent_requests: {int} Maximal number of concurrent tag requests
+    :param update_time_to: {int} The update time the cases were queried with
+    """
+
+    def tag_case(case_id):
+        for tag in tags:
+            siemplify.add_tag(tag=tag, case_id=case_id, alert_identifier=None)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrent_requests) as executor:
+        for i in range(0, len(case_ids), BATCH_SIZE):
+            batch = case_ids[i : i + BATCH_SIZE]
+            list(executor.map(tag_case, batch))
+            save_checkpoint(siemplify, tags, update_time_to, int(batch[-1]))
+            siemplify.LOGGER.info(
+                f"Tagged {min(i + BATCH_SIZE, len(case_ids))} of {len(case_ids)} cases",
+            )
+
+    clear_checkpoint(siemplify)
 
 
 @output_handler
@@ -28,35 +152,34 @@ def main():
     siemplify.script_name = SCRIPT_NAME  # In order to use the SiemplifyLogger, you must assign a name to the script.
     maxTime = siemplify.parameters.get("Unmodified Time")
     tags = siemplify.parameters.get("Tags")
+    max_concurrent_requests = int(
+        siemplify.parameters.get("Max Concurrent Requests") or DEFAULT_MAX_CONCURRENT_REQUESTS,
+    )
 
     siemplify.LOGGER.info("----------------- Main - Started -----------------")
     try:
-        timeNow = datetime.datetime.now()
-        update_time_to = timeNow - datetime.timedelta(hours=int(maxTime))
-
-        case_ids = siemplify.get_cases_ids_by_filter(
-            status="OPEN",
-            start_time_from_unix_time_in_ms=None,
-            start_time_to_unix_time_in_ms=None,
-            close_time_from_unix_time_in_ms=None,
-            close_time_to_unix_time_in_ms=None,
-            update_time_from_unix_time_in_ms=None,
-            update_time_to_unix_time_in_ms=update_time_to.timestamp() * 1000,
-            operator=None,
-            sort_by="START_TIME",
-            sort_order="DESC",
-            max_results=10000,
-        )
+        tags_list = []
+        tags_list.extend(t.strip() for t in tags.split(","))
+        tags_string = ", ".join(tags_list)
+
+        checkpoint = load_checkpoint(siemplify, tags_list)
+        if checkpoint:
+            update_time_to = checkpoint["update_time_to"]
+            last_case_id = checkpoint.get("last_case_id")
+            siemplify.LOGGER.info(
+                f"Resuming an interrupted run after case {last_case_id}",
+            )
+        else:
+            timeNow = datetime.datetime.now()
+            update_time_to = int(
+                (timeNow - datetime.timedelta(hours=int(maxTime))).timestamp() * 1000,
+            )
+            last_case_id = None
 
+        case_ids = get_untagged_case_ids(siemplify, update_time_to, last_case_id)
         if len(case_ids):
-            siemplify.LOGGER.info(f"The following cases will be affected: {case_ids}")
-            tags_list = []
-            tags_list.extend(t.strip() for t in tags.split(","))
-            tags_string = ", ".join(tags_list)
-
-            for cid in case_ids:
-                for tag in tags_list:
-                    siemplify.add_tag(tag=tag, case_id=cid, alert_identifier=None)
+            siemplify.LOGGER.info(f"{len(case_ids)} cases will be affected")
+            tag_cases(siemplify, case_ids, tags_list, max_concurrent_requests, update_time_to)
 
             siemplify.LOGGER.info(
                 f"Successfully Tagged {len(case_ids)} cases with tags: {tags_string}",
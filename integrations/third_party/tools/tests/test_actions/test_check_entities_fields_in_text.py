@@ -0,0 +1,33 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+from ...core.MultiPatternMatcher import MultiPatternMatcher
+
+
+def test_multi_pattern_matcher_finds_overlapping_patterns() -> None:
+    matcher = MultiPatternMatcher(["he", "she", "his", "hers", "xyz"])
+
+    assert matcher.find_all("ushers") == {"he", "she", "hers"}
+    assert matcher.find_all("this") == {"his"}
+    assert matcher.find_all("") == set()
+
+
+def test_multi_pattern_matcher_is_equivalent_to_substring_check() -> None:
+    patterns = ["a", "ab", "bab", "abc", "c", "ca", "", "aab"]
+    text = "xabcabab caab"
+    matcher = MultiPatternMatcher(patterns)
+
+    assert matcher.find_all(text) == {p for p in patterns if p in text}
@@ -0,0 +1,49 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+from ...core.LookalikeDomains import LookalikeIndex, bounded_levenshtein, homoglyph_skeleton
+
+
+def test_bounded_levenshtein() -> None:
+    assert bounded_levenshtein("google.com", "google.com", 3) == 0
+    assert bounded_levenshtein("google.com", "gooogle.com", 3) == 1
+    assert bounded_levenshtein("kitten", "sitting", 3) == 3
+    assert bounded_levenshtein("kitten", "sitting", 2) is None
+    assert bounded_levenshtein("a.com", "abcde.com", 3) is None
+
+
+def test_homoglyph_skeleton() -> None:
+    assert homoglyph_skeleton("0utl00k.com") == homoglyph_skeleton("outlook.com")
+    assert homoglyph_skeleton("rnicrosoft.com") == homoglyph_skeleton("microsoft.com")
+    assert homoglyph_skeleton("xn--ggle-55da.com") == homoglyph_skeleton("google.com")
+    assert homoglyph_skeleton("example.com") != homoglyph_skeleton("google.com")
+
+
+def test_lookalike_index_keeps_domains_order() -> None:
+    index = LookalikeIndex(["outlook.com", "google.com", "goggle.com", "example.org"])
+
+    matches = index.find("GOOGLE.COM")
+
+    assert [(m.domain, m.distance) for m in matches] == [("goggle.com", 1)]
+
+
+def test_lookalike_index_homoglyphs() -> None:
+    index = LookalikeIndex(["outlook.com", "microsoft.com"])
+
+    assert index.find("rnicr0s0ft.c0m") == []
+    matches = index.find("rnicr0s0ft.c0m", homoglyphs=True)
+
+    assert [(m.domain, m.distance, m.homoglyph) for m in matches] == [("microsoft.com", 5, True)]
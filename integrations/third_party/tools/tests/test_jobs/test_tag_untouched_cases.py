@@ -0,0 +1,193 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import datetime
+import logging
+import threading
+import time
+
+import pytest
+
+from ...jobs import TagUntouchedCases
+
+HOUR_IN_MS = 60 * 60 * 1000
+MAX_CONTEXT_PROPERTY_LENGTH = 1000
+
+
+class MaximumContextLengthException(Exception):
+    pass
+
+
+class FakePlatform:
+    """Open cases and the job context kept by a fake platform, shared by all job runs."""
+
+    def __init__(self, cases_count: int) -> None:
+        now = int(datetime.datetime.now().timestamp() * 1000)
+        # Case IDs ascend with the update time, one second apart, all two days old
+        self.update_times = {
+            case_id: now - 2 * 24 * HOUR_IN_MS + case_id * 1000
+            for case_id in range(1, cases_count + 1)
+        }
+        self.tags: dict[int, list[str]] = {}
+        self.context: dict[str, str] = {}
+        self.queries = 0
+        self.fail_on_case_id = None
+        self.active_requests = 0
+        self.max_active_requests = 0
+        self._lock = threading.Lock()
+
+    def get_cases_ids_by_filter(
+        self,
+        update_time_from_unix_time_in_ms: int | None,
+        update_time_to_unix_time_in_ms: int,
+        max_results: int,
+        **kwargs,
+    ) -> list[int]:
+        self.queries += 1
+        update_time_from = update_time_from_unix_time_in_ms or 0
+        case_ids = [
+            case_id
+            for case_id, update_time in self.update_times.items()
+            if update_time_from <= update_time <= update_time_to_unix_time_in_ms
+        ]
+        return sorted(case_ids, reverse=True)[:max_results]
+
+    def add_tag(self, tag: str, case_id: int, alert_identifier: str | None) -> None:
+        if case_id == self.fail_on_case_id:
+            raise RuntimeError("The platform is unavailable")
+
+        with self._lock:
+            self.active_requests += 1
+            self.max_active_requests = max(self.max_active_requests, self.active_requests)
+
+        time.sleep(0.001)
+        with self._lock:
+            self.active_requests -= 1
+            self.tags.setdefault(case_id, []).append(tag)
+
+
+class FakeSiemplifyJob:
+    LOGGER = logging.getLogger(__name__)
+
+    def __init__(self, platform: FakePlatform, parameters: dict[str, str]) -> None:
+        self.platform = platform
+        self.parameters = parameters
+        self.script_name = None
+        self.ended = False
+
+    def get_cases_ids_by_filter(self, **kwargs) -> list[int]:
+        return self.platform.get_cases_ids_by_filter(**kwargs)
+
+    def add_tag(self, **kwargs) -> None:
+        self.platform.add_tag(**kwargs)
+
+    def get_scoped_job_context_property(self, property_key: str) -> str | None:
+        return self.platform.context.get(property_key)
+
+    def set_scoped_job_context_property(self, property_key: str, property_value: str) -> None:
+        if len(property_value) > MAX_CONTEXT_PROPERTY_LENGTH:
+            raise MaximumContextLengthException(property_key)
+
+        self.platform.context[property_key] = property_value
+
+    def end_script(self) -> None:
+        self.ended = True
+
+
+@pytest.fixture
+def run_job(monkeypatch: pytest.MonkeyPatch):
+    def run(platform: FakePlatform, parameters: dict[str, str]) -> FakeSiemplifyJob:
+        siemplify = FakeSiemplifyJob(platform, parameters)
+        monkeypatch.setattr(TagUntouchedCases, "SiemplifyJob", lambda: siemplify)
+        TagUntouchedCases.main()
+        return siemplify
+
+    return run
+
+
+PARAMETERS = {"Unmodified Time": "24", "Tags": "Untouched, Stale"}
+
+
+def test_all_cases_are_tagged_concurrently(run_job) -> None:
+    platform = FakePlatform(cases_count=250)
+    run_job(platform, {**PARAMETERS, "Max Concurrent Requests": "4"})
+
+    assert sorted(platform.tags) == list(range(1, 251))
+    assert all(tags == ["Untouched", "Stale"] for tags in platform.tags.values())
+    assert 1 < platform.max_active_requests <= 4
+    assert platform.context[TagUntouchedCases.CHECKPOINT_KEY] == ""
+
+
+def test_update_time_windows_are_split_when_a_query_is_full(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(TagUntouchedCases, "MAX_RESULTS_PER_QUERY", 10)
+    platform = FakePlatform(cases_count=95)
+    siemplify = FakeSiemplifyJob(platform, PARAMETERS)
+
+    case_ids = list(
+        TagUntouchedCases.iter_case_ids(
+            siemplify,
+            int(datetime.datetime.now().timestamp() * 1000),
+        ),
+    )
+
+    assert sorted(case_ids) == list(range(1, 96))
+    assert len(case_ids) == len(set(case_ids))
+    assert platform.queries > 10
+
+
+def test_checkpoint_is_small_for_many_cases(run_job) -> None:
+    platform = FakePlatform(cases_count=5000)
+    run_job(platform, PARAMETERS)
+
+    assert len(platform.tags) == 5000
+
+
+def test_interrupted_run_is_resumed(monkeypatch: pytest.MonkeyPatch, run_job) -> None:
+    monkeypatch.setattr(TagUntouchedCases, "BATCH_SIZE", 10)
+    platform = FakePlatform(cases_count=35)
+    platform.fail_on_case_id = 25
+
+    with pytest.raises(RuntimeError):
+        run_job(platform, PARAMETERS)
+
+    assert platform.context[TagUntouchedCases.CHECKPOINT_KEY]
+    assert all(case_id in platform.tags for case_id in range(1, 21))
+
+    # Cases that are updated after the interrupted run started are still left out
+    platform.update_times[36] = int(datetime.datetime.now().timestamp() * 1000) - 25 * HOUR_IN_MS
+    platform.fail_on_case_id = None
+    tagged_before = {case_id: list(tags) for case_id, tags in platform.tags.items()}
+    run_job(platform, PARAMETERS)
+
+    assert sorted(platform.tags) == list(range(1, 37))
+    for case_id in range(1, 21):
+        assert platform.tags[case_id] == tagged_before[case_id]
+    assert platform.context[TagUntouchedCases.CHECKPOINT_KEY] == ""
+
+
+def test_checkpoint_of_other_tags_is_ignored(run_job) -> None:
+    platform = FakePlatform(cases_count=5)
+    TagUntouchedCases.save_checkpoint(
+        FakeSiemplifyJob(platform, PARAMETERS),
+        ["Other"],
+        0,
+        3,
+    )
+    run_job(platform, PARAMETERS)
+
+    assert sorted(platform.tags) == list(range(1, 6))
@@ -17,6 +17,7 @@ from __future__ import annotations
 from . import (
     aiohttp,
     common,
+    history,
     logger,
     platform,
     request,
@@ -28,6 +29,7 @@ from . import (
 __all__: list[str] = [
     "aiohttp",
     "common",
+    "history",
     "logger",
     "platform",
     "request",
@@ -17,7 +17,6 @@ from __future__ import annotations
 import dataclasses
 import re
 import urllib.parse
-from collections import UserList
 from typing import TYPE_CHECKING, Any, Generic, SupportsIndex, TypeVar
 
 import aiohttp
@@ -25,6 +24,7 @@ from TIPCommon.base.utils import is_native, nativemethod
 
 from integration_testing.aiohttp.response import MockClientResponse
 from integration_testing.custom_types import NO_RESPONSE, Product, Request, RouteFunction, UrlPath
+from integration_testing.history import RequestHistory, RetentionPolicy
 from integration_testing.request import HttpMethod, MockRequest
 
 if TYPE_CHECKING:
@@ -43,16 +43,20 @@ class HistoryRecord(Generic[Request, Response]):
     response: Response
 
 
-class HistoryRecordsList(UserList[HistoryRecord[Request, Response]]):
-    def __init__(self, *history_records: HistoryRecord) -> None:
+class HistoryRecordsList(RequestHistory[HistoryRecord[Request, Response]]):
+    def __init__(
+        self,
+        *history_records: HistoryRecord,
+        policy: RetentionPolicy | None = None,
+    ) -> None:
         if not all(isinstance(el, HistoryRecord) for el in history_records):
             msg: str = "List items must be of type HistoryRecord"
             raise TypeError(msg)
 
-        super().__init__(history_records)
+        super().__init__(*history_records, policy=policy)
 
     def __copy__(self) -> HistoryRecordsList:
-        return HistoryRecordsList(*self)
+        return HistoryRecordsList(*self, policy=self.policy)
 
     def __getitem__(
         self,
@@ -88,11 +92,14 @@ class MockClientSession(aiohttp.ClientSession, Generic[Request, Response, Produc
         self,
         *args: Any,  # noqa: ANN401
         mock_product: Product | None = None,
+        history_policy: RetentionPolicy | None = None,
         **kwargs: Any,  # noqa: ANN401
     ) -> None:
         super().__init__(*args, **kwargs)
         self._default_headers: SingleJson = {}
-        self.request_history: HistoryRecordsList[HistoryRecord] = HistoryRecordsList()
+        self.request_history: HistoryRecordsList[HistoryRecord] = HistoryRecordsList(
+            policy=history_policy
+        )
         self.routes: Routes = {
             HttpMethod.GET.value: {},
             HttpMethod.DELETE.value: {},
@@ -14,13 +14,13 @@
 
 from __future__ import annotations
 
-import copy
+import collections
 import json
 import os
 import pathlib
 import sys
 import time
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import yaml
 from OverflowManager import OverflowManager, OverflowManagerSettings
@@ -41,7 +41,7 @@ from TIPCommon.data_models import (
 from .platform.external_context import ExternalContextRow
 
 if TYPE_CHECKING:
-    from collections.abc import Collection, Iterable
+    from collections.abc import Collection, Iterable, MutableMapping
 
     from TIPCommon.types import Entity, SingleJson
 
@@ -76,6 +76,10 @@ VALID_DEF_SUFFIXES: Collection[str] = (
     BUILT_DEF_SUFFIX,
 )
 
+# Parsed definition files, keyed by resolved path. Each entry holds the file's
+# (mtime_ns, size) signature at parse time so edits on disk invalidate it.
+_DEF_FILE_CACHE: dict[pathlib.Path, tuple[tuple[int, int], SingleJson]] = {}
+
 
 def create_case_comment(  # noqa: PLR0913, PLR0917
     comment: str,
@@ -303,6 +307,12 @@ def use_live_api() -> bool:
 def get_def_file_content(def_file_path: str | pathlib.Path | None) -> SingleJson:
     """Get the content of a def file.
 
+    Notes:
+        Parsed files are cached for the lifetime of the process and re-read only
+        when their modification time or size changes. The returned dictionary is a
+        shallow copy of the cached content, so nested values are shared between
+        calls and must not be mutated.
+
     Returns:
         the contents of an integration's definition file as a dictionary.
 
@@ -321,10 +331,29 @@ def get_def_file_content(def_file_path: str | pathlib.Path | None) -> SingleJson
         msg: str = f"The provided config file {def_file_path} path is not a json file!"
         raise ValueError(msg)
 
-    if def_file_path.suffix == BUILT_DEF_SUFFIX:
-        return yaml.safe_load(def_file_path.read_text(encoding="utf-8"))
+    return dict(_load_def_file(def_file_path))
+
+
+def clear_def_file_cache() -> None:
+    """Clear the process-wide cache of parsed definition files."""
+    _DEF_FILE_CACHE.clear()
+
+
+def _load_def_file(def_file_path: pathlib.Path) -> SingleJson:
+    key: pathlib.Path = def_file_path.resolve()
+    stat: os.stat_result = key.stat()
+    signature: tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+
+    cached: tuple[tuple[int, int], SingleJson] | None = _DEF_FILE_CACHE.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
 
-    return json.loads(def_file_path.read_text(encoding="utf-8"))
+    content: str = key.read_text(encoding="utf-8")
+    parsed: SingleJson = (
+        yaml.safe_load(content) if key.suffix == BUILT_DEF_SUFFIX else json.loads(content)
+    )
+    _DEF_FILE_CACHE[key] = (signature, parsed)
+    return parsed
 
 
 def set_sys_argv(args: list[str]) -> None:
@@ -369,7 +398,7 @@ def set_is_test_run_to_true() -> None:
 
 
 def _set_default_connector_params(params: list[SingleJson]) -> list[SingleJson]:
-    p: list[SingleJson] = copy.deepcopy(params)
+    p: list[SingleJson] = list(params)
     param_names: set[str] = {param["Name"] for param in params}
 
     if "PythonProcessTimeout" not in param_names:
@@ -415,7 +444,8 @@ def _create_connector_parameters(
 
     """
     results: list[ConnectorParameter] = []
-    for parameter in def_parameters:
+    for def_parameter in def_parameters:
+        parameter: MutableMapping[str, Any] = _overlay(def_parameter)
         parameter["param_name"] = parameter["Name"]
         parameter["param_value"] = params.get(
             parameter["Name"],
@@ -441,7 +471,8 @@ def _create_job_parameters(
 
     """
     results: list[JobParameter] = []
-    for parameter in def_parameters:
+    for def_parameter in def_parameters:
+        parameter: MutableMapping[str, Any] = _overlay(def_parameter)
         parameter["name"] = parameter["Name"]
         parameter["value"] = params.get(parameter["Name"], parameter["DefaultValue"])
         parameter["isMandatory"] = parameter["IsMandatory"]
@@ -452,6 +483,16 @@ def _create_job_parameters(
     return results
 
 
+def _overlay(parameter: SingleJson) -> MutableMapping[str, Any]:
+    """Create a copy-on-write view over a (possibly cached) definition parameter.
+
+    Returns:
+        A mapping that reads through to `parameter` and keeps its own writes.
+
+    """
+    return collections.ChainMap({}, parameter)
+
+
 def get_request_payload(
     request: MockRequest,
     keys: Iterable[str] | None = None,
@@ -0,0 +1,231 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import collections
+import dataclasses
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Generic, Protocol, SupportsIndex, TypeVar, overload
+
+from .request import HttpMethod
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from .request import MockRequest
+
+
+class _Record(Protocol):
+    @property
+    def request(self) -> MockRequest: ...
+
+
+Record = TypeVar("Record", bound=_Record)
+RouteKey = tuple[HttpMethod, str]
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class RetentionPolicy:
+    """Control which request history records a mocked session keeps.
+
+    Per-method and per-path call counts are always kept for every request,
+    regardless of the policy. The policy only affects the stored records.
+
+    Attributes:
+        max_records: Keep only the latest N records (ring buffer). None is unbounded
+        sample_every: Keep only every Nth request's record
+        keep_records: Whether to keep records at all. If False only counts are kept
+
+    """
+
+    max_records: int | None = None
+    sample_every: int = 1
+    keep_records: bool = True
+
+    def __post_init__(self) -> None:
+        msg: str
+        if self.max_records is not None and self.max_records < 1:
+            msg = f"max_records must be a positive number, got {self.max_records}"
+            raise ValueError(msg)
+
+        if self.sample_every < 1:
+            msg = f"sample_every must be a positive number, got {self.sample_every}"
+            raise ValueError(msg)
+
+    @classmethod
+    def ring_buffer(cls, max_records: int) -> RetentionPolicy:
+        """Keep only the latest `max_records` records.
+
+        Returns:
+            A RetentionPolicy object.
+
+        """
+        return cls(max_records=max_records)
+
+    @classmethod
+    def sampling(cls, sample_every: int, max_records: int | None = None) -> RetentionPolicy:
+        """Keep the record of every `sample_every`th request.
+
+        Returns:
+            A RetentionPolicy object.
+
+        """
+        return cls(max_records=max_records, sample_every=sample_every)
+
+    @classmethod
+    def counts_only(cls) -> RetentionPolicy:
+        """Keep no records, only the call counts.
+
+        Returns:
+            A RetentionPolicy object.
+
+        """
+        return cls(keep_records=False)
+
+
+class RequestHistory(Sequence[Record], Generic[Record]):
+    """A request history store with a retention policy and route indexes.
+
+    The store behaves like a read-only sequence of the retained records, and keeps
+    call counts by method and URL path so count assertions run in constant time.
+    """
+
+    def __init__(self, *history_records: Record, policy: RetentionPolicy | None = None) -> None:
+        self.policy: RetentionPolicy = policy if policy is not None else RetentionPolicy()
+        self._records: collections.deque[Record] = collections.deque(maxlen=self.policy.max_records)
+        self._records_by_route: collections.defaultdict[RouteKey, collections.deque[Record]] = (
+            collections.defaultdict(collections.deque)
+        )
+        self._route_counts: collections.Counter[RouteKey] = collections.Counter()
+        self._method_counts: collections.Counter[HttpMethod] = collections.Counter()
+        self._path_counts: collections.Counter[str] = collections.Counter()
+        self._total_count: int = 0
+        self.extend(history_records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[Record]:
+        return iter(self._records)
+
+    @overload
+    def __getitem__(self, item: SupportsIndex) -> Record: ...
+
+    @overload
+    def __getitem__(self, item: slice) -> list[Record]: ...
+
+    def __getitem__(self, item: SupportsIndex | slice) -> Record | list[Record]:
+        if isinstance(item, slice):
+            return list(self._records)[item]
+
+        return self._records[item]
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(total_count={self._total_count},"
+            f" retained={len(self)}, policy={self.policy})"
+        )
+
+    @property
+    def total_count(self) -> int:
+        """The number of requests recorded, including ones whose records were dropped."""
+        return self._total_count
+
+    def append(self, record: Record) -> None:
+        """Count a record and store it according to the retention policy."""
+        key: RouteKey = _route_key(record)
+        self._total_count += 1
+        self._route_counts[key] += 1
+        self._method_counts[key[0]] += 1
+        self._path_counts[key[1]] += 1
+
+        if not self.policy.keep_records or (self._total_count - 1) % self.policy.sample_every:
+            return
+
+        if self._records.maxlen is not None and len(self._records) == self._records.maxlen:
+            evicted: Record = self._records[0]
+            self._records_by_route[_route_key(evicted)].popleft()
+
+        self._records.append(record)
+        self._records_by_route[key].append(record)
+
+    def extend(self, records: Iterable[Record]) -> None:
+        """Append multiple records."""
+        for record in records:
+            self.append(record)
+
+    def clear(self) -> None:
+        """Clear all records and counts."""
+        self._records.clear()
+        self._records_by_route.clear()
+        self._route_counts.clear()
+        self._method_counts.clear()
+        self._path_counts.clear()
+        self._total_count = 0
+
+    def call_count(self, method: HttpMethod | str | None = None, path: str | None = None) -> int:
+        """Get the number of requests made with a method and/or to a URL path.
+
+        Args:
+            method: The request's HTTP method. If None, any method is counted
+            path: The request's URL path. If None, any path is counted
+
+        Returns:
+            The number of matching requests, including dropped records.
+
+        """
+        if method is None and path is None:
+            return self._total_count
+
+        if method is None:
+            return self._path_counts[path]
+
+        if path is None:
+            return self._method_counts[HttpMethod(method)]
+
+        return self._route_counts[HttpMethod(method), path]
+
+    def records_for(self, method: HttpMethod | str, path: str) -> list[Record]:
+        """Get the retained records of requests with a method to a URL path.
+
+        Returns:
+            A list of the matching records, oldest first.
+
+        """
+        return list(self._records_by_route.get((HttpMethod(method), path), ()))
+
+    def assert_call_count(
+        self,
+        expected: int,
+        method: HttpMethod | str | None = None,
+        path: str | None = None,
+    ) -> None:
+        """Assert that a route was called exactly `expected` times.
+
+        Raises:
+            RuntimeError: If the number of matching requests is not `expected`.
+
+        """
+        actual: int = self.call_count(method, path)
+        if actual != expected:
+            msg: str = (
+                f"Expected {expected} requests with method {method!r} to path {path!r},"
+                f" but {actual} were made."
+            )
+            raise RuntimeError(msg)
+
+
+def _route_key(record: _Record) -> RouteKey:
+    return record.request.method, record.request.url.path
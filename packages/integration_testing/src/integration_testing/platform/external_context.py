@@ -17,6 +17,7 @@ from __future__ import annotations
 import dataclasses
 from typing import TYPE_CHECKING, Generic, TypeVar
 
+import SiemplifyUtils
 from TIPCommon.data_models import DatabaseContextType
 from TIPCommon.utils import none_to_default_value
 
@@ -29,16 +30,57 @@ _T = TypeVar("_T")
 
 _KEY_GROUP_SEPARATOR: str = "␝"
 
+PLATFORM_MAX_VALUE_SIZE: int = SiemplifyUtils.MAXIMUM_PROPERTY_VALUE
+
+
+class PropertyValueTooLargeError(Exception):
+    """Raised when a script writes a context value larger than the size limit.
+
+    The platform raises a plain Exception with the same message, so tests can match
+    either of them with `pytest.raises(Exception, match="Exceeded maximum ...")`.
+    """
+
+
+@dataclasses.dataclass(slots=True)
+class ContextIOStats:
+    reads: int = 0
+    writes: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+
+    def __add__(self, other: ContextIOStats) -> ContextIOStats:
+        return ContextIOStats(
+            reads=self.reads + other.reads,
+            writes=self.writes + other.writes,
+            bytes_read=self.bytes_read + other.bytes_read,
+            bytes_written=self.bytes_written + other.bytes_written,
+        )
+
 
 class MockExternalContext(Generic[_T]):
-    __slots__: tuple[str] = ("_rows",)
+    __slots__: tuple[str, ...] = ("_io_stats", "_rows", "max_value_size")
+
+    def __init__(
+        self,
+        rows: list[ExternalContextRow[_T]] | None = None,
+        *,
+        max_value_size: int | None = None,
+    ) -> None:
+        """Initialize the external context.
+
+        Args:
+            rows: Initial rows to set in the context
+            max_value_size: The maximal length of a value scripts can write. Use
+                PLATFORM_MAX_VALUE_SIZE to mimic the platform. If None, there is no limit
 
-    def __init__(self, rows: list[ExternalContextRow[_T]] | None = None) -> None:
+        """
         rows: list[ExternalContextRow[_T]] = none_to_default_value(rows, [])
         self._rows: SingleJson = {
             _create_key(r.context_type, r.identifier, r.property_key): r.property_value
             for r in rows
         }
+        self._io_stats: dict[ExternalContextRowKey, ContextIOStats] = {}
+        self.max_value_size: int | None = max_value_size
 
     def __contains__(self, item: _T) -> bool:
         return (
@@ -54,6 +96,41 @@ class MockExternalContext(Generic[_T]):
     def number_of_rows(self) -> int:
         return len(self._rows)
 
+    @property
+    def io_stats(self) -> dict[ExternalContextRowKey, ContextIOStats]:
+        """Read and write counts of script calls, per row key."""
+        return dict(self._io_stats)
+
+    @property
+    def total_io_stats(self) -> ContextIOStats:
+        """Read and write counts of script calls, summed over all row keys."""
+        return sum(self._io_stats.values(), ContextIOStats())
+
+    def get_io_stats(self, row: ExternalContextRow[_T] | ExternalContextRowKey) -> ContextIOStats:
+        """Get the read and write counts of a single row.
+
+        Returns:
+            The row's ContextIOStats. If the row was never accessed, all counts are 0
+
+        """
+        key: ExternalContextRowKey = _create_row_key(
+            row.context_type,
+            row.identifier,
+            row.property_key,
+        )
+        return self._io_stats.get(key, ContextIOStats())
+
+    def reset_io_stats(self) -> MockExternalContext[_T]:
+        """Reset all read and write counts.
+
+        Returns:
+            Self
+
+        """
+        self._io_stats.clear()
+
+        return self
+
     def has_row(self, row: ExternalContextRow[_T] | ExternalContextRowKey) -> bool:
         """Check whether a row is in the context.
 
@@ -96,7 +173,13 @@ class MockExternalContext(Generic[_T]):
 
         """
         key: str = _create_key(context_type, identifier, property_key)
-        return self._rows.get(key)
+        value: _T | None = self._rows.get(key)
+
+        stats: ContextIOStats = self._get_or_create_io_stats(context_type, identifier, property_key)
+        stats.reads += 1
+        stats.bytes_read += _value_size_in_bytes(value)
+
+        return value
 
     def set_row_value(
         self,
@@ -113,10 +196,21 @@ class MockExternalContext(Generic[_T]):
             property_key: The property key of the row to set
             property_value: The property value of the row to set
 
+        Raises:
+            PropertyValueTooLargeError: If the value exceeds `max_value_size`
+
         """
+        if self.max_value_size is not None and len(str(property_value)) > self.max_value_size:
+            msg: str = f"Exceeded maximum property value size: {self.max_value_size}"
+            raise PropertyValueTooLargeError(msg)
+
         key: str = _create_key(context_type, identifier, property_key)
         self._rows[key] = property_value
 
+        stats: ContextIOStats = self._get_or_create_io_stats(context_type, identifier, property_key)
+        stats.writes += 1
+        stats.bytes_written += _value_size_in_bytes(property_value)
+
     def delete_row(
         self,
         context_type: DatabaseContextType,
@@ -214,6 +308,37 @@ class MockExternalContext(Generic[_T]):
 
         return self
 
+    def _get_or_create_io_stats(
+        self,
+        context_type: int | DatabaseContextType,
+        identifier: str,
+        property_key: str,
+    ) -> ContextIOStats:
+        key: ExternalContextRowKey = _create_row_key(context_type, identifier, property_key)
+        stats: ContextIOStats | None = self._io_stats.get(key)
+        if stats is None:
+            stats = self._io_stats[key] = ContextIOStats()
+
+        return stats
+
+
+def _create_row_key(
+    context_type: int | DatabaseContextType,
+    identifier: str,
+    property_key: str,
+) -> ExternalContextRowKey:
+    return ExternalContextRowKey(DatabaseContextType(context_type), identifier, property_key)
+
+
+def _value_size_in_bytes(value: object) -> int:
+    if value is None:
+        return 0
+
+    if isinstance(value, bytes):
+        return len(value)
+
+    return len(str(value).encode("utf-8"))
+
 
 def _create_key(context_type: int | DatabaseContextType, identifier: str, property_key: str) -> str:
     if isinstance(context_type, DatabaseContextType):
@@ -25,6 +25,7 @@ from TIPCommon.base.interfaces import Session
 from TIPCommon.base.utils import is_native, nativemethod
 
 from integration_testing.custom_types import NO_RESPONSE, Product, Request, RouteFunction, UrlPath
+from integration_testing.history import RequestHistory, RetentionPolicy
 from integration_testing.request import HttpMethod, MockRequest
 
 from .response import MockResponse
@@ -46,14 +47,26 @@ class HistoryRecord(Generic[Request, Response]):
 
 
 class MockSession(requests.Session, Session[Response], Generic[Request, Response, Product]):
-    def __init__(self, mock_product: Product | None = None) -> None:
-        """Initialize the session."""
+    def __init__(
+        self,
+        mock_product: Product | None = None,
+        *,
+        history_policy: RetentionPolicy | None = None,
+    ) -> None:
+        """Initialize the session.
+
+        Args:
+            mock_product: The mocked product the routes act on
+            history_policy: The retention policy of the request history.
+                By default, all records are kept
+
+        """
         super().__init__()
         self.verify: bool = True
         self.headers: SingleJson = {}
         self.adapters: OrderedDict = OrderedDict()
         self.stream: bool = False
-        self.request_history: list[HistoryRecord] = []
+        self.request_history: RequestHistory[HistoryRecord] = RequestHistory(policy=history_policy)
         self.routes: Routes = {
             HttpMethod.GET.value: {},
             HttpMethod.DELETE.value: {},
@@ -277,6 +277,60 @@ class TestGetConfigFileJson:
         with pytest.raises(ValueError, match="path is not a json file"):
             _ = common.get_def_file_content(path)
 
+    def test_parsed_content_is_cached_until_the_file_changes(
+        self,
+        tmp_path: pathlib.Path,
+    ) -> None:
+        path: pathlib.Path = tmp_path / "cached.json"
+        path.write_text(json.dumps({"Parameters": [{"Name": "a"}]}), encoding="utf-8")
+
+        first: dict[str, list[dict[str, str]]] = common.get_def_file_content(path)
+        second: dict[str, list[dict[str, str]]] = common.get_def_file_content(path)
+
+        assert first == second
+        assert first is not second
+        assert first["Parameters"] is second["Parameters"]
+
+        path.write_text(json.dumps({"Parameters": [{"Name": "bb"}]}), encoding="utf-8")
+        changed: dict[str, list[dict[str, str]]] = common.get_def_file_content(path)
+
+        assert changed["Parameters"] == [{"Name": "bb"}]
+
+    def test_clear_def_file_cache_forces_a_reparse(self, tmp_path: pathlib.Path) -> None:
+        path: pathlib.Path = tmp_path / "cached.json"
+        path.write_text(json.dumps({"k": "v"}), encoding="utf-8")
+        first: dict[str, str] = common.get_def_file_content(path)
+
+        common.clear_def_file_cache()
+        second: dict[str, str] = common.get_def_file_content(path)
+
+        assert first == second
+        assert first is not second
+
+
+class TestDefParametersAreNotMutated:
+    def test_connector_params_do_not_change_the_cached_def(self) -> None:
+        before: list[dict[str, str]] = json.loads(
+            json.dumps(common.get_def_file_content(CONNECTOR_DEF)["Parameters"])
+        )
+
+        _ = common.prepare_connector_params(CONNECTOR_DEF, {"Username": "v1"})
+        _ = common.prepare_connector_params(CONNECTOR_DEF, {"Username": "v2"})
+
+        assert common.get_def_file_content(CONNECTOR_DEF)["Parameters"] == before
+
+    def test_job_params_do_not_change_the_cached_def(self) -> None:
+        before: list[dict[str, str]] = json.loads(
+            json.dumps(common.get_def_file_content(JOB_DEF)["Parameters"])
+        )
+
+        first: list[JobParameter] = common.prepare_job_params(JOB_DEF, {"Username": "v1"})
+        second: list[JobParameter] = common.prepare_job_params(JOB_DEF, {"Username": "v2"})
+
+        assert common.get_def_file_content(JOB_DEF)["Parameters"] == before
+        assert {p.value for p in first if p.name == "Username"} == {"v1"}
+        assert {p.value for p in second if p.name == "Username"} == {"v2"}
+
 
 class TestSetSysArgv:
     def test_value_is_set(self) -> None:
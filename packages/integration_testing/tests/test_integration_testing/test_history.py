@@ -0,0 +1,122 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import dataclasses
+import urllib.parse
+
+import pytest
+
+from integration_testing.history import RequestHistory, RetentionPolicy
+from integration_testing.request import HttpMethod, MockRequest
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class Record:
+    request: MockRequest
+    response: None = None
+
+
+def _record(method: HttpMethod, path: str) -> Record:
+    return Record(
+        MockRequest(
+            method=method,
+            url=urllib.parse.urlparse(f"https://localhost{path}"),
+            headers={},
+            args=(),
+            kwargs={},
+        )
+    )
+
+
+class TestRetentionPolicy:
+    def test_default_policy_keeps_all_records(self) -> None:
+        history: RequestHistory[Record] = RequestHistory()
+
+        for _ in range(100):
+            history.append(_record(HttpMethod.GET, "/a"))
+
+        assert len(history) == 100
+        assert history.total_count == 100
+
+    def test_ring_buffer_keeps_only_latest_records(self) -> None:
+        history: RequestHistory[Record] = RequestHistory(policy=RetentionPolicy.ring_buffer(3))
+
+        for i in range(10):
+            history.append(_record(HttpMethod.GET, f"/{i}"))
+
+        assert len(history) == 3
+        assert [r.request.url.path for r in history] == ["/7", "/8", "/9"]
+        assert history.total_count == 10
+        assert history.records_for(HttpMethod.GET, "/0") == []
+        assert len(history.records_for(HttpMethod.GET, "/9")) == 1
+
+    def test_sampling_keeps_every_nth_record(self) -> None:
+        history: RequestHistory[Record] = RequestHistory(policy=RetentionPolicy.sampling(4))
+
+        for i in range(10):
+            history.append(_record(HttpMethod.POST, f"/{i}"))
+
+        assert [r.request.url.path for r in history] == ["/0", "/4", "/8"]
+        assert history.call_count(HttpMethod.POST) == 10
+
+    def test_counts_only_keeps_no_records(self) -> None:
+        history: RequestHistory[Record] = RequestHistory(policy=RetentionPolicy.counts_only())
+
+        history.append(_record(HttpMethod.GET, "/a"))
+        history.append(_record(HttpMethod.GET, "/a"))
+
+        assert len(history) == 0
+        assert history.call_count(HttpMethod.GET, "/a") == 2
+
+    def test_invalid_policy_raises_value_error(self) -> None:
+        with pytest.raises(ValueError, match="max_records"):
+            RetentionPolicy(max_records=0)
+
+        with pytest.raises(ValueError, match="sample_every"):
+            RetentionPolicy(sample_every=0)
+
+
+class TestCallCount:
+    def test_counts_by_method_and_path(self) -> None:
+        history: RequestHistory[Record] = RequestHistory(
+            _record(HttpMethod.GET, "/a"),
+            _record(HttpMethod.GET, "/b"),
+            _record(HttpMethod.POST, "/a"),
+            _record(HttpMethod.GET, "/a"),
+        )
+
+        assert history.call_count() == 4
+        assert history.call_count(HttpMethod.GET) == 3
+        assert history.call_count("POST") == 1
+        assert history.call_count(path="/a") == 3
+        assert history.call_count(HttpMethod.GET, "/a") == 2
+        assert history.call_count(HttpMethod.DELETE, "/a") == 0
+
+    def test_assert_call_count(self) -> None:
+        history: RequestHistory[Record] = RequestHistory(_record(HttpMethod.GET, "/a"))
+
+        history.assert_call_count(1, HttpMethod.GET, "/a")
+        with pytest.raises(RuntimeError, match="Expected 2 requests"):
+            history.assert_call_count(2, HttpMethod.GET, "/a")
+
+    def test_clear_resets_records_and_counts(self) -> None:
+        history: RequestHistory[Record] = RequestHistory(_record(HttpMethod.GET, "/a"))
+
+        history.clear()
+
+        assert len(history) == 0
+        assert history.call_count() == 0
+        assert history.records_for(HttpMethod.GET, "/a") == []
@@ -18,9 +18,11 @@ import pytest
 from TIPCommon.data_models import DatabaseContextType
 
 from integration_testing.platform.external_context import (
+    ContextIOStats,
     ExternalContextRow,
     ExternalContextRowKey,
     MockExternalContext,
+    PropertyValueTooLargeError,
 )
 
 
@@ -240,3 +242,71 @@ class TestMethods:
         ec.drop()
 
         assert ec.number_of_rows == 0
+
+
+class TestSizeLimit:
+    def test_value_within_limit_is_set(self, ec_row_key: ExternalContextRowKey) -> None:
+        ec: MockExternalContext = MockExternalContext(max_value_size=5)
+
+        ec.set_row_value(ec_row_key.context_type, ec_row_key.identifier, "key", "12345")
+
+        assert ec.number_of_rows == 1
+
+    def test_value_above_limit_raises_and_is_not_set(
+        self,
+        ec_row_key: ExternalContextRowKey,
+    ) -> None:
+        ec: MockExternalContext = MockExternalContext(max_value_size=5)
+
+        with pytest.raises(Exception, match="Exceeded maximum property value size: 5") as e:
+            ec.set_row_value(ec_row_key.context_type, ec_row_key.identifier, "key", "123456")
+
+        assert e.type is PropertyValueTooLargeError
+        assert ec.number_of_rows == 0
+
+    def test_initial_rows_are_not_limited(self, ec_row: ExternalContextRow[str]) -> None:
+        ec: MockExternalContext = MockExternalContext([ec_row], max_value_size=1)
+
+        assert ec.has_row(ec_row) is True
+
+
+class TestIOStats:
+    def test_reads_and_writes_are_counted_per_key(
+        self,
+        ec_row_key: ExternalContextRowKey,
+    ) -> None:
+        ec: MockExternalContext = MockExternalContext()
+        context_type: DatabaseContextType = ec_row_key.context_type
+
+        ec.set_row_value(context_type, ec_row_key.identifier, ec_row_key.property_key, "abc")
+        ec.set_row_value(context_type, ec_row_key.identifier, ec_row_key.property_key, "de")
+        ec.get_row_value(context_type, ec_row_key.identifier, ec_row_key.property_key)
+        ec.get_row_value(context_type, ec_row_key.identifier, "missing")
+
+        assert ec.get_io_stats(ec_row_key) == ContextIOStats(
+            reads=1,
+            writes=2,
+            bytes_read=2,
+            bytes_written=5,
+        )
+        assert ec.total_io_stats == ContextIOStats(
+            reads=2,
+            writes=2,
+            bytes_read=2,
+            bytes_written=5,
+        )
+        assert len(ec.io_stats) == 2
+
+    def test_initial_rows_are_not_counted(self, ec_row: ExternalContextRow[str]) -> None:
+        ec: MockExternalContext = MockExternalContext([ec_row])
+
+        assert ec.total_io_stats == ContextIOStats()
+        assert ec.get_io_stats(ec_row) == ContextIOStats()
+
+    def test_reset_io_stats(self, ec_row: ExternalContextRow[str]) -> None:
+        ec: MockExternalContext = MockExternalContext([ec_row])
+        ec.get_row_value(ec_row.context_type, ec_row.identifier, ec_row.property_key)
+
+        ec.reset_io_stats()
+
+        assert ec.io_stats == {}